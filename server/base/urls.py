@@ -18,8 +18,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from formsbuilder.views import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("formsbuilder.urls")),
     path("api/accounts/", include("accounts.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -0,0 +1,111 @@
+"""Compare the sync (WSGI) and async (ASGI) submission endpoints under load.
+
+Both applications are driven in-process, on one process, by the same
+closed-loop clients: each client sends its next submission as soon as the
+previous one is answered. ASGI requests run on the event loop; WSGI
+requests run on a pool of ``--threads`` worker threads, like a threaded
+WSGI server. Latencies include the time a request waits for a worker.
+
+The benchmark writes to the configured database (a throwaway template that
+is deleted afterwards); point ``DB_ENGINE``/``DB_NAME`` at PostgreSQL for
+numbers that mean anything. Without a broker, run it with
+``CELERY_TASK_ALWAYS_EAGER=True``. From the ``server`` directory::
+
+    python -m benchmarks.bench_async_submit [--clients 1000] [--requests 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "base.settings")
+os.environ.setdefault("FORMSBUILDER_RATE_LIMITS_ENABLED", "False")
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+
+from benchmarks.drivers import asgi_caller, run_clients, wsgi_caller  # noqa: E402
+from formsbuilder.models import FormField, FormTemplate  # noqa: E402
+
+BODY = json.dumps({"name": "Ada", "email": "ada@example.com"}).encode()
+
+
+def create_template():
+    user, _ = get_user_model().objects.get_or_create(
+        username="bench", defaults={"email": "bench@example.com"}
+    )
+    template = FormTemplate.objects.create(name="Submit benchmark", created_by=user)
+    for order, name in enumerate(["name", "email"]):
+        FormField.objects.create(
+            form_template=template,
+            field_name=name,
+            label=name.title(),
+            widget_type=name if name == "email" else "text",
+            is_required=True,
+            order=order,
+        )
+    return template
+
+
+def report(name, elapsed, latencies, failures):
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{name:<6} {len(latencies) / elapsed:9,.0f} req/s "
+        f"p50 {statistics.median(latencies) * 1000:8.1f} ms "
+        f"p99 {p99 * 1000:8.1f} ms  {failures} failed"
+    )
+
+
+async def benchmark(args, path):
+    wsgi = wsgi_caller(get_wsgi_application(), "POST", path, BODY)
+    asgi = asgi_caller(
+        get_asgi_application(),
+        "POST",
+        path.replace("/submit/", "/submit-async/"),
+        BODY,
+    )
+    loop = asyncio.get_running_loop()
+    print(
+        f"{args.clients} clients x {args.requests} submissions, "
+        f"WSGI on {args.threads} threads"
+    )
+    with ThreadPoolExecutor(args.threads) as pool:
+        await loop.run_in_executor(pool, wsgi)  # warm the schema caches
+        report(
+            "wsgi",
+            *await run_clients(
+                args.clients,
+                args.requests,
+                lambda: loop.run_in_executor(pool, wsgi),
+                201,
+            ),
+        )
+    await asgi()
+    report("asgi", *await run_clients(args.clients, args.requests, asgi, 201))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    template = create_template()
+    try:
+        path = f"/api/form-templates/{template.slug}/submit/"
+        asyncio.run(benchmark(args, path))
+    finally:
+        template.delete()
+
+
+if __name__ == "__main__":
+    main()
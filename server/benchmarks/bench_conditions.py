@@ -0,0 +1,107 @@
+"""Compare the compiled conditions engine with the viewset's legacy methods.
+
+Run from the ``server`` directory::
+
+    python -m benchmarks.bench_conditions [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "base.settings")
+django.setup()
+
+from formsbuilder.conditions import compile_rule, evaluate_rules  # noqa: E402
+from formsbuilder.models import FormField  # noqa: E402
+from formsbuilder.views import FormTemplateViewSet  # noqa: E402
+
+RULES = {
+    "reason": {
+        "action": "show",
+        "conditions": [{"field": "attending", "operator": "equals", "value": "no"}],
+    },
+    "discount": {
+        "action": "show",
+        "logicalOperator": "and",
+        "conditions": [
+            {"field": "age", "operator": "greater_than_or_equals", "value": "65"},
+            {"field": "country", "operator": "not_equals", "value": "KE"},
+            {"field": "member_id", "operator": "is_not_empty"},
+        ],
+    },
+    "referral": {
+        "action": "hide",
+        "logicalOperator": "or",
+        "conditions": [
+            {"field": "source", "operator": "contains", "value": "ads"},
+            {"field": "age", "operator": "less_than", "value": 18},
+        ],
+    },
+}
+
+
+def make_rows(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        row = {
+            "attending": rng.choice(["yes", "no"]),
+            "age": str(rng.randint(10, 90)),
+            "country": rng.choice(["KE", "UG", "TZ"]),
+            "source": rng.choice(["google-ads", "friend", "newsletter"]),
+        }
+        if rng.random() < 0.3:
+            row["member_id"] = str(rng.randint(1, 10_000))
+        rows.append(row)
+    return rows
+
+
+def legacy(fields, rows):
+    view = FormTemplateViewSet()
+    return {
+        name: [view._should_validate_field(field, row) for row in rows]
+        for name, field in fields.items()
+    }
+
+
+def compiled(rules, rows):
+    return {name: [rule.evaluate(row) for row in rows] for name, rule in rules.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    fields = {name: FormField(conditional_logic=logic) for name, logic in RULES.items()}
+    rules = {name: compile_rule(logic) for name, logic in RULES.items()}
+
+    expected = legacy(fields, rows)
+    assert compiled(rules, rows) == expected
+    assert evaluate_rules(rules, rows) == expected
+
+    cases = {
+        "legacy _should_validate_field": lambda: legacy(fields, rows),
+        "compiled Rule.evaluate": lambda: compiled(rules, rows),
+        "compiled evaluate_rules (batch)": lambda: evaluate_rules(rules, rows),
+    }
+    evaluations = args.rows * len(RULES)
+    baseline = None
+    print(f"{evaluations} rule evaluations, best of {args.repeat}")
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print(
+            f"{name:<34} {best * 1000:9.2f} ms "
+            f"{evaluations / best:12,.0f} evals/s {baseline / best:6.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Micro-benchmarks of the API's hot spots.
+
+* the legacy conditional-logic methods (``_evaluate_condition``,
+  ``_should_validate_field``) and the compiled rule that replaced them;
+* ``FormTemplateSerializer`` on templates with 10, 100 and 1000 fields,
+  and a page of ``FormSubmissionSerializer``, each against its fast path
+  (``formsbuilder.representations``);
+* rendering that page and a 1000-field template with DRF's ``JSONRenderer``
+  and with ``FastJSONRenderer``;
+* creating a submission, through ``submit_form`` and with the ORM alone.
+
+Everything runs in a throwaway test database created next to the
+configured one (SQLite by default; set ``DB_ENGINE``/``DB_NAME`` for
+PostgreSQL). From the ``server`` directory::
+
+    python -m benchmarks.bench_micro [--fields 10 100 1000] [-k serializer]
+        [--json report.json]
+
+Compare two reports with ``python -m benchmarks.compare``.
+"""
+
+import argparse
+import random
+
+from benchmarks import harness
+
+harness.setup()
+
+from django.db import transaction  # noqa: E402
+from django.db.models import Prefetch  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from benchmarks.bench_conditions import RULES, make_rows  # noqa: E402
+from benchmarks.data import (  # noqa: E402
+    create_submissions,
+    create_template,
+    make_submission,
+)
+from formsbuilder.conditions import compile_rule  # noqa: E402
+from formsbuilder.models import (  # noqa: E402
+    FormField,
+    FormFieldOption,
+    FormSubmission,
+    FormTemplate,
+)
+from formsbuilder.renderers import FastJSONRenderer  # noqa: E402
+from formsbuilder.representations import (  # noqa: E402
+    represent_submissions,
+    represent_templates,
+    submission_rows,
+    template_rows,
+)
+from formsbuilder.serializers import (  # noqa: E402
+    FormSubmissionSerializer,
+    FormTemplateSerializer,
+)
+from formsbuilder.views import FormTemplateViewSet  # noqa: E402
+
+
+def condition_cases(args):
+    view = FormTemplateViewSet()
+    row = make_rows(1, seed=1)[0]
+    logic = RULES["discount"]
+    field = FormField(conditional_logic=logic)
+    condition = logic["conditions"][0]
+    rule = compile_rule(logic)
+    yield "conditions/_evaluate_condition", lambda: view._evaluate_condition(
+        condition, row
+    )
+    yield "conditions/_should_validate_field", lambda: view._should_validate_field(
+        field, row
+    )
+    yield "conditions/compiled Rule.evaluate", lambda: rule.evaluate(row)
+
+
+def serializer_cases(args):
+    for size in args.fields:
+        # Loaded the way FormTemplateViewSet.retrieve loads it; both cases
+        # include their queries.
+        templates = FormTemplate.objects.filter(pk=create_template(size).pk)
+        prefetched = templates.select_related("created_by").prefetch_related(
+            Prefetch(
+                "fields__options",
+                queryset=FormFieldOption.objects.order_by("order", "id"),
+            )
+        )
+        yield f"serializer/FormTemplateSerializer[{size} fields]", lambda: (
+            FormTemplateSerializer(prefetched.get()).data
+        )
+        yield f"serializer/fast template[{size} fields]", lambda: (
+            represent_templates(list(template_rows(templates)))
+        )
+
+    template = create_template(10, name="Submissions page")
+    create_submissions(template, 10, args.page)
+    submissions = FormSubmission.objects.filter(form_template=template).order_by(
+        "-submitted_at", "-id"
+    )
+    page = args.page
+    yield f"serializer/FormSubmissionSerializer[{page} rows]", lambda: (
+        FormSubmissionSerializer(
+            submissions.select_related("submitted_by", "template_version").defer(
+                "template_version__schema"
+            )[:page],
+            many=True,
+        ).data
+    )
+    yield f"serializer/fast submissions[{page} rows]", lambda: (
+        represent_submissions(list(submission_rows(submissions)[:page]))
+    )
+
+
+def renderer_cases(args):
+    size = max(args.fields)
+    template = create_template(size, name="Renderer benchmark")
+    create_submissions(template, 10, args.page)
+    documents = {
+        f"template[{size} fields]": represent_templates(
+            list(template_rows(FormTemplate.objects.filter(pk=template.pk)))
+        )[0],
+        f"submissions[{args.page} rows]": represent_submissions(
+            list(
+                submission_rows(FormSubmission.objects.filter(form_template=template))[
+                    : args.page
+                ]
+            )
+        ),
+    }
+    for name, data in documents.items():
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            yield f"renderer/{type(renderer).__name__} {name}", (
+                lambda renderer=renderer, data=data: renderer.render(data)
+            )
+
+
+def submission_cases(args):
+    size = 20
+    template = create_template(size, name="Submission benchmark")
+    payload = make_submission(size, random.Random(0))
+    factory = APIRequestFactory()
+    submit_form = FormTemplateViewSet.as_view({"post": "submit_form"})
+    path = f"/api/form-templates/{template.slug}/submit/"
+
+    def submit():
+        request = factory.post(path, payload, format="json")
+        response = submit_form(request, pk=template.slug)
+        assert response.status_code == 201, response.data
+
+    def create():
+        with transaction.atomic():
+            FormSubmission.objects.create(
+                form_template=template,
+                submission_data=payload,
+                ip_address="127.0.0.1",
+            )
+
+    yield f"submission/submit_form[{size} fields]", submit
+    yield "submission/ORM create", create
+
+
+SUITES = [condition_cases, serializer_cases, renderer_cases, submission_cases]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--fields", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--page", type=int, default=500, help="submissions per page")
+    parser.add_argument("-k", dest="keyword", help="only run names containing this")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    timer = harness.Timer(rounds=args.rounds, min_time=args.min_time)
+    results = {}
+    with harness.throwaway_database():
+        for suite in SUITES:
+            for name, function in suite(args):
+                if args.keyword and args.keyword not in name:
+                    continue
+                results[name] = timer(function)
+                harness.print_result(name, results[name])
+        if args.json:
+            harness.write_report(args.json, "micro", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Diff two benchmark reports written with ``--json``.
+
+Compares the median time of every benchmark present in both reports and
+exits with status 1 when any got slower by more than ``--threshold``
+percent, so it can gate a CI job::
+
+    python -m benchmarks.compare before.json after.json [--threshold 10]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.harness import format_time
+
+
+def load(path):
+    return json.loads(Path(path).read_text())
+
+
+def compare(before, after, threshold):
+    """Print the comparison; returns the names that regressed."""
+    regressions = []
+    print(
+        f"before {before['machine_info'].get('commit')} "
+        f"({before['machine_info'].get('database')}), "
+        f"after {after['machine_info'].get('commit')} "
+        f"({after['machine_info'].get('database')})"
+    )
+    for name, result in after["benchmarks"].items():
+        previous = before["benchmarks"].get(name)
+        if previous is None:
+            print(f"{name:<48} {format_time(result['median'])}  (new)")
+            continue
+        change = (result["median"] - previous["median"]) / previous["median"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:<48} {format_time(previous['median'])} -> "
+            f"{format_time(result['median'])} {change:+7.1f}%{flag}"
+        )
+    for name in before["benchmarks"].keys() - after["benchmarks"].keys():
+        print(f"{name:<48} (removed)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if compare(load(args.before), load(args.after), args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
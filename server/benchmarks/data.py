@@ -0,0 +1,95 @@
+"""Synthetic form templates and submissions for the benchmarks."""
+
+import random
+
+from django.contrib.auth import get_user_model
+
+from formsbuilder.models import FormField, FormFieldOption, FormSubmission, FormTemplate
+
+CHOICES = ["red", "green", "blue"]
+
+# Cycled through to give templates a realistic mix of validators.
+WIDGETS = ["text", "email", "number", "select", "textarea"]
+
+
+def bench_user():
+    user, _ = get_user_model().objects.get_or_create(
+        username="bench", defaults={"email": "bench@example.com"}
+    )
+    return user
+
+
+def create_template(field_count, name=None):
+    """A template with ``field_count`` fields.
+
+    Every select has three options, and every fifth field is only shown
+    when the select before it is ``red``, so submissions exercise the
+    conditional logic too.
+    """
+    template = FormTemplate.objects.create(
+        name=name or f"Benchmark {field_count} fields", created_by=bench_user()
+    )
+    fields = FormField.objects.bulk_create(
+        FormField(
+            form_template=template,
+            field_name=f"field_{index}",
+            label=f"Field {index}",
+            widget_type=WIDGETS[index % len(WIDGETS)],
+            is_required=index % 3 == 0,
+            order=index,
+            conditional_logic=_rule(index),
+        )
+        for index in range(field_count)
+    )
+    FormFieldOption.objects.bulk_create(
+        FormFieldOption(form_field=field, value=value, label=value.title(), order=order)
+        for field in fields
+        if field.widget_type == "select"
+        for order, value in enumerate(CHOICES)
+    )
+    # bulk_create skips the signals that bump the template's version.
+    template.save(update_fields=["updated_at"])
+    return template
+
+
+def _rule(index):
+    if index % len(WIDGETS) != 4:
+        return {}
+    # The field before is a select.
+    return {
+        "action": "show",
+        "conditions": [
+            {"field": f"field_{index - 1}", "operator": "equals", "value": "red"}
+        ],
+    }
+
+
+def make_submission(field_count, rng):
+    """A valid submission for a ``create_template(field_count)`` template."""
+    data = {}
+    for index in range(field_count):
+        widget = WIDGETS[index % len(WIDGETS)]
+        if widget == "email":
+            data[f"field_{index}"] = f"user{rng.randint(1, 10_000)}@example.com"
+        elif widget == "number":
+            data[f"field_{index}"] = rng.randint(0, 100)
+        elif widget == "select":
+            data[f"field_{index}"] = rng.choice(CHOICES)
+        else:
+            data[f"field_{index}"] = f"answer {rng.randint(1, 10_000)}"
+    return data
+
+
+def create_submissions(template, field_count, count, seed=0, batch_size=1000):
+    rng = random.Random(seed)
+    FormSubmission.objects.bulk_create(
+        (
+            FormSubmission(
+                form_template=template,
+                submission_data=make_submission(field_count, rng),
+                ip_address="127.0.0.1",
+            )
+            for _ in range(count)
+        ),
+        batch_size=batch_size,
+    )
@@ -0,0 +1,112 @@
+"""Drive the WSGI and ASGI applications in-process, without a server.
+
+``wsgi_caller`` and ``asgi_caller`` turn a request into a callable that
+sends it and returns the response status. ``run_clients`` runs closed-loop
+clients: each sends its next request as soon as the previous one is
+answered. WSGI requests run on a thread pool, like a threaded WSGI server,
+so their latencies include the time spent waiting for a worker.
+"""
+
+import asyncio
+import io
+import time
+
+
+def _headers(body, headers):
+    headers = dict(headers or {})
+    if body:
+        headers.setdefault("content-type", "application/json")
+        headers["content-length"] = str(len(body))
+    return headers
+
+
+def _split_path(path):
+    path, _, query_string = path.partition("?")
+    return path, query_string
+
+
+def wsgi_caller(application, method, path, body=b"", headers=None):
+    headers = _headers(body, headers)
+    path, query_string = _split_path(path)
+
+    def call():
+        status = []
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query_string,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "REMOTE_ADDR": "127.0.0.1",
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.url_scheme": "http",
+            "wsgi.errors": io.StringIO(),
+        }
+        for name, value in headers.items():
+            key = name.upper().replace("-", "_")
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                key = f"HTTP_{key}"
+            environ[key] = value
+        response = application(environ, lambda code, headers: status.append(code))
+        b"".join(response)
+        response.close()
+        return int(status[0].split()[0])
+
+    return call
+
+
+def asgi_caller(application, method, path, body=b"", headers=None):
+    headers = [
+        (name.lower().encode(), value.encode())
+        for name, value in _headers(body, headers).items()
+    ]
+    path, query_string = _split_path(path)
+
+    async def call():
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query_string.encode(),
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("localhost", 80),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        status = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.Future()  # no disconnect until the response is sent
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        await application(scope, receive, send)
+        return status[0]
+
+    return call
+
+
+async def run_clients(clients, requests, call, expected_status):
+    """Returns the elapsed time, every latency and the number of failures."""
+    latencies = []
+    failures = 0
+
+    async def client():
+        nonlocal failures
+        for _ in range(requests):
+            started = time.perf_counter()
+            status = await call()
+            latencies.append(time.perf_counter() - started)
+            failures += status != expected_status
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return time.perf_counter() - started, latencies, failures
@@ -0,0 +1,183 @@
+"""Shared plumbing for the benchmark suite.
+
+``setup()`` configures Django the way the test runner does (``DEBUG`` off,
+in-memory email, eager Celery tasks), and ``throwaway_database()`` creates
+and migrates a test database next to the configured one, SQLite or
+PostgreSQL, and drops it afterwards, so benchmarks never touch real data.
+
+``Timer`` measures a callable in the manner of pytest-benchmark: it
+calibrates how many calls make one round, then reports statistics over the
+rounds. Results go into a JSON report (``write_report``) that
+``benchmarks.compare`` diffs between commits.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "base.settings")
+# Notifications run inline instead of needing a broker.
+os.environ.setdefault("CELERY_TASK_ALWAYS_EAGER", "True")
+# Every request comes from one client; measure the API, not its rate limits.
+os.environ.setdefault("FORMSBUILDER_RATE_LIMITS_ENABLED", "False")
+
+REPORT_VERSION = 1
+
+
+def setup():
+    django.setup()
+
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment(debug=False)
+
+
+@contextmanager
+def throwaway_database():
+    from django.db import connection
+    from django.test.utils import setup_databases, teardown_databases
+
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            # A file rather than shared-cache memory, which fails concurrent
+            # writes from the load generator's threads with "table is locked".
+            connection.settings_dict["TEST"]["NAME"] = str(
+                Path(directory) / "bench.sqlite3"
+            )
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={"default"}
+        )
+        try:
+            yield
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+
+class Timer:
+    """Time ``function`` over ``rounds`` rounds of calibrated iterations.
+
+    A round runs ``function`` enough times to last at least ``min_time``
+    seconds; the statistics are per call.
+    """
+
+    def __init__(self, rounds=5, min_time=0.05, warmup=1):
+        self.rounds = rounds
+        self.min_time = min_time
+        self.warmup = warmup
+
+    def _calibrate(self, function):
+        iterations = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                function()
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.min_time:
+                return iterations
+            iterations *= 10 if elapsed < self.min_time / 10 else 2
+
+    def __call__(self, function):
+        for _ in range(self.warmup):
+            function()
+        iterations = self._calibrate(function)
+        timings = []
+        for _ in range(self.rounds):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                function()
+            timings.append((time.perf_counter() - started) / iterations)
+        return summarize(
+            timings, iterations=iterations, peak_memory=peak_memory(function)
+        )
+
+
+def peak_memory(function):
+    """Peak bytes allocated (and not yet freed) during one call."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(timings, **extra):
+    """Statistics of per-call ``timings`` (seconds)."""
+    ordered = sorted(timings)
+    mean = statistics.fmean(ordered)
+    return {
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": mean,
+        "median": statistics.median(ordered),
+        "stddev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "ops": 1 / mean if mean else None,
+        "rounds": len(ordered),
+        **extra,
+    }
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine_info():
+    from django.db import connection
+
+    return {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "platform": platform.platform(),
+    }
+
+
+def write_report(path, suite, results):
+    """Write ``results`` (``{name: statistics}``) as a JSON report."""
+    report = {
+        "version": REPORT_VERSION,
+        "suite": suite,
+        "machine_info": machine_info(),
+        "benchmarks": results,
+    }
+    Path(path).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def print_result(name, result):
+    print(
+        f"{name:<48} median {format_time(result['median'])} "
+        f"min {format_time(result['min'])} "
+        f"stddev {format_time(result['stddev'])}"
+        f"  peak {result['peak_memory'] / 1024:9,.0f} KiB"
+    )
@@ -0,0 +1,132 @@
+"""Scripted load against the WSGI and ASGI applications, in-process.
+
+Creates a synthetic template with ``--fields`` fields and ``--submissions``
+stored submissions in a throwaway test database (see
+``benchmarks.harness``), then runs each scenario with ``--clients``
+closed-loop clients sending ``--requests`` requests each:
+
+* ``submit``: ``POST .../submit/`` (and ``.../submit-async/`` under ASGI);
+* ``template``: ``GET`` the template definition;
+* ``submissions``: ``GET`` the first page of its submissions.
+
+Under WSGI requests run on ``--threads`` worker threads; under ASGI on the
+event loop. From the ``server`` directory::
+
+    python -m benchmarks.loadgen [--interface wsgi asgi] [--json report.json]
+
+Compare two reports with ``python -m benchmarks.compare``.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import harness
+
+harness.setup()
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+
+from benchmarks.data import (  # noqa: E402
+    create_submissions,
+    create_template,
+    make_submission,
+)
+from benchmarks.drivers import asgi_caller, run_clients, wsgi_caller  # noqa: E402
+
+SCENARIOS = ["submit", "template", "submissions"]
+
+
+def requests_for(scenario, interface, template, body):
+    """``(name, method, path, body, expected status)`` of a scenario."""
+    base = f"/api/form-templates/{template.slug}"
+    if scenario == "submit":
+        yield f"{interface}/submit", "POST", f"{base}/submit/", body, 201
+        if interface == "asgi":
+            yield "asgi/submit-async", "POST", f"{base}/submit-async/", body, 201
+    elif scenario == "template":
+        yield f"{interface}/template", "GET", f"{base}/", b"", 200
+    elif scenario == "submissions":
+        yield f"{interface}/submissions", "GET", f"{base}/submissions/", b"", 200
+
+
+def summarize(elapsed, latencies, failures):
+    latencies.sort()
+    return harness.summarize(
+        latencies,
+        requests=len(latencies),
+        failures=failures,
+        throughput=len(latencies) / elapsed,
+        p90=harness.percentile(latencies, 0.90),
+        p99=harness.percentile(latencies, 0.99),
+    )
+
+
+async def run(args, template, body):
+    applications = {"wsgi": get_wsgi_application(), "asgi": get_asgi_application()}
+    loop = asyncio.get_running_loop()
+    results = {}
+    with ThreadPoolExecutor(args.threads) as pool:
+        for interface in args.interface:
+            for scenario in args.scenario:
+                for name, method, path, data, expected in requests_for(
+                    scenario, interface, template, body
+                ):
+                    if interface == "wsgi":
+                        wsgi = wsgi_caller(applications["wsgi"], method, path, data)
+
+                        def call(wsgi=wsgi):
+                            return loop.run_in_executor(pool, wsgi)
+
+                    else:
+                        call = asgi_caller(applications["asgi"], method, path, data)
+                    await call()  # warm the caches
+                    results[name] = summarize(
+                        *await run_clients(args.clients, args.requests, call, expected)
+                    )
+                    report(name, results[name])
+    return results
+
+
+def report(name, result):
+    print(
+        f"{name:<22} {result['throughput']:9,.0f} req/s "
+        f"p50 {result['median'] * 1000:8.1f} ms "
+        f"p99 {result['p99'] * 1000:8.1f} ms  {result['failures']} failed"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--interface", nargs="+", choices=["wsgi", "asgi"], default=["wsgi", "asgi"]
+    )
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--fields", type=int, default=20)
+    parser.add_argument("--submissions", type=int, default=1000)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    with harness.throwaway_database():
+        template = create_template(args.fields)
+        create_submissions(template, args.fields, args.submissions)
+        body = json.dumps(make_submission(args.fields, random.Random(0))).encode()
+        print(
+            f"{args.clients} clients x {args.requests} requests, "
+            f"{args.fields} fields, {args.submissions} stored submissions"
+        )
+        results = asyncio.run(run(args, template, body))
+        if args.json:
+            harness.write_report(args.json, "load", results)
+
+
+if __name__ == "__main__":
+    main()
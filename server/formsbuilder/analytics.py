@@ -0,0 +1,319 @@
+"""Hourly and daily submission rollups.
+
+``fold_new_submissions`` (run by Celery beat) reads the submissions added
+since the last run, by primary key from a ``RollupCheckpoint`` high-water
+mark, and folds them into ``SubmissionRollup`` buckets: a submission count
+per bucket plus, for every choice and number field of the template, per
+option counts or the count/sum/min/max of the submitted numbers. Each
+submission is read exactly once, so charts are served from a few hundred
+bucket rows instead of the raw ``submission_data`` JSON.
+
+Buckets are aligned on UTC hours and days. Rollups are append-only: deleting
+submissions does not take them back out of the charts.
+"""
+
+import math
+from collections import defaultdict
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from formsbuilder.models import (
+    FieldRollup,
+    FormField,
+    FormSubmission,
+    RollupCheckpoint,
+    SubmissionRollup,
+)
+
+CHECKPOINT_NAME = "submissions"
+
+CHOICE_WIDGETS = ("select", "radio", "multi_select", "checkbox")
+NUMBER_WIDGETS = ("number",)
+CHOICE = "choice"
+NUMBER = "number"
+
+
+def bucket_start(moment, granularity):
+    """Truncate ``moment`` to the start of its UTC hour or day."""
+    moment = moment.astimezone(dt_timezone.utc).replace(
+        minute=0, second=0, microsecond=0
+    )
+    if granularity == SubmissionRollup.DAY:
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def _choice_keys(value):
+    values = value if isinstance(value, list) else [value]
+    for item in values:
+        if item is None or item == "":
+            continue
+        if isinstance(item, bool):
+            yield "true" if item else "false"
+        elif isinstance(item, (str, int, float)):
+            yield str(item)
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _add_value(field_rollup, kind, value):
+    if kind == CHOICE:
+        counts = field_rollup.option_counts
+        for key in _choice_keys(value):
+            counts[key] = counts.get(key, 0) + 1
+        return
+    number = _number(value)
+    if number is None:
+        return
+    field_rollup.value_count += 1
+    field_rollup.value_sum += number
+    if field_rollup.value_min is None or number < field_rollup.value_min:
+        field_rollup.value_min = number
+    if field_rollup.value_max is None or number > field_rollup.value_max:
+        field_rollup.value_max = number
+
+
+def _combine(target, source):
+    """Fold the aggregates of ``source`` into ``target``."""
+    counts = target.option_counts
+    for key, count in source.option_counts.items():
+        counts[key] = counts.get(key, 0) + count
+    target.value_count += source.value_count
+    target.value_sum += source.value_sum
+    for attr, pick in (("value_min", min), ("value_max", max)):
+        values = [
+            value
+            for value in (getattr(target, attr), getattr(source, attr))
+            if value is not None
+        ]
+        setattr(target, attr, pick(values) if values else None)
+
+
+def _new_field_rollup(field_name):
+    return FieldRollup(
+        field_name=field_name,
+        option_counts={},
+        value_count=0,
+        value_sum=0.0,
+        value_min=None,
+        value_max=None,
+    )
+
+
+def _tracked_fields(template_ids):
+    """``{template_id: [(field_name, kind)]}`` for the aggregated fields."""
+    tracked = defaultdict(list)
+    fields = FormField.objects.filter(
+        form_template_id__in=template_ids,
+        widget_type__in=CHOICE_WIDGETS + NUMBER_WIDGETS,
+    ).values_list("form_template_id", "field_name", "widget_type")
+    for template_id, field_name, widget_type in fields:
+        kind = NUMBER if widget_type in NUMBER_WIDGETS else CHOICE
+        tracked[template_id].append((field_name, kind))
+    return tracked
+
+
+def _aggregate(rows):
+    """Aggregate submission rows in memory, keyed by bucket."""
+    tracked = _tracked_fields({row[1] for row in rows})
+    counts = defaultdict(int)
+    fields = defaultdict(dict)
+    for _, template_id, submitted_at, data in rows:
+        data = data if isinstance(data, dict) else {}
+        template_fields = tracked.get(template_id, ())
+        for granularity, _ in SubmissionRollup.GRANULARITIES:
+            key = (template_id, granularity, bucket_start(submitted_at, granularity))
+            counts[key] += 1
+            bucket_fields = fields[key]
+            for field_name, kind in template_fields:
+                if field_name not in data:
+                    continue
+                field_rollup = bucket_fields.get(field_name)
+                if field_rollup is None:
+                    field_rollup = bucket_fields[field_name] = _new_field_rollup(
+                        field_name
+                    )
+                _add_value(field_rollup, kind, data[field_name])
+    return counts, fields
+
+
+def _merge(counts, fields):
+    """Add the in-memory aggregates to the stored buckets."""
+    existing = {
+        (rollup.form_template_id, rollup.granularity, rollup.bucket_start): rollup
+        for rollup in SubmissionRollup.objects.select_for_update().filter(
+            form_template_id__in={key[0] for key in counts},
+            bucket_start__in={key[2] for key in counts},
+        )
+    }
+    rollups, new_rollups, changed_rollups = {}, [], []
+    for key, count in counts.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            template_id, granularity, start = key
+            rollup = SubmissionRollup(
+                form_template_id=template_id,
+                granularity=granularity,
+                bucket_start=start,
+                submission_count=count,
+            )
+            new_rollups.append(rollup)
+        else:
+            rollup.submission_count += count
+            changed_rollups.append(rollup)
+        rollups[key] = rollup
+    SubmissionRollup.objects.bulk_create(new_rollups)
+    SubmissionRollup.objects.bulk_update(changed_rollups, ["submission_count"])
+
+    stored = {
+        (field_rollup.rollup_id, field_rollup.field_name): field_rollup
+        for field_rollup in FieldRollup.objects.select_for_update().filter(
+            rollup__in=changed_rollups
+        )
+    }
+    new_fields, changed_fields = [], []
+    for key, bucket_fields in fields.items():
+        rollup = rollups[key]
+        for field_name, aggregate in bucket_fields.items():
+            field_rollup = stored.get((rollup.pk, field_name))
+            if field_rollup is None:
+                aggregate.rollup = rollup
+                new_fields.append(aggregate)
+            else:
+                _combine(field_rollup, aggregate)
+                changed_fields.append(field_rollup)
+    FieldRollup.objects.bulk_create(new_fields)
+    FieldRollup.objects.bulk_update(
+        changed_fields,
+        ["option_counts", "value_count", "value_sum", "value_min", "value_max"],
+    )
+
+
+@transaction.atomic
+def _fold_batch(batch_size, settled_before):
+    checkpoint, _ = RollupCheckpoint.objects.select_for_update().get_or_create(
+        name=CHECKPOINT_NAME
+    )
+    rows = list(
+        FormSubmission.objects.filter(pk__gt=checkpoint.last_submission_id)
+        .order_by("pk")
+        .values_list("pk", "form_template_id", "submitted_at", "submission_data")[
+            :batch_size
+        ]
+    )
+    # Stop at the first submission that is too recent: a concurrent
+    # transaction may still commit a lower id, and the high-water mark must
+    # not move past it.
+    for index, row in enumerate(rows):
+        if row[2] >= settled_before:
+            del rows[index:]
+            break
+    if not rows:
+        return 0
+
+    _merge(*_aggregate(rows))
+    checkpoint.last_submission_id = rows[-1][0]
+    checkpoint.save(update_fields=["last_submission_id", "updated_at"])
+    return len(rows)
+
+
+def fold_new_submissions(batch_size=None, settle_seconds=None):
+    """Fold every settled submission past the high-water mark into rollups.
+
+    Returns the number of submissions folded.
+    """
+    batch_size = batch_size or settings.FORMSBUILDER_ROLLUP_BATCH_SIZE
+    if settle_seconds is None:
+        settle_seconds = settings.FORMSBUILDER_ROLLUP_SETTLE_SECONDS
+    settled_before = timezone.now() - timedelta(seconds=settle_seconds)
+
+    folded = 0
+    while True:
+        count = _fold_batch(batch_size, settled_before)
+        folded += count
+        if count < batch_size:
+            return folded
+
+
+def _field_summary(field_rollup):
+    if field_rollup.option_counts:
+        return {"options": field_rollup.option_counts}
+    count = field_rollup.value_count
+    return {
+        "count": count,
+        "sum": field_rollup.value_sum,
+        "min": field_rollup.value_min,
+        "max": field_rollup.value_max,
+        "mean": field_rollup.value_sum / count if count else None,
+    }
+
+
+def get_template_analytics(form_template, granularity, since=None, until=None):
+    """Serve the stored buckets of a template, oldest first.
+
+    At most ``FORMSBUILDER_ANALYTICS_MAX_BUCKETS`` buckets are returned (the
+    most recent ones); ``totals`` sums the returned buckets.
+    """
+    rollups = SubmissionRollup.objects.filter(
+        form_template=form_template, granularity=granularity
+    )
+    if since is not None:
+        rollups = rollups.filter(bucket_start__gte=bucket_start(since, granularity))
+    if until is not None:
+        rollups = rollups.filter(bucket_start__lt=until)
+    rollups = list(
+        rollups.order_by("-bucket_start").prefetch_related(
+            Prefetch(
+                "field_rollups", queryset=FieldRollup.objects.order_by("field_name")
+            )
+        )[: settings.FORMSBUILDER_ANALYTICS_MAX_BUCKETS]
+    )
+    rollups.reverse()
+
+    buckets = []
+    total_submissions = 0
+    totals = {}
+    for rollup in rollups:
+        total_submissions += rollup.submission_count
+        bucket_fields = {}
+        for field_rollup in rollup.field_rollups.all():
+            bucket_fields[field_rollup.field_name] = _field_summary(field_rollup)
+            total = totals.get(field_rollup.field_name)
+            if total is None:
+                total = totals[field_rollup.field_name] = _new_field_rollup(
+                    field_rollup.field_name
+                )
+            _combine(total, field_rollup)
+        buckets.append(
+            {
+                "bucket_start": rollup.bucket_start,
+                "submission_count": rollup.submission_count,
+                "fields": bucket_fields,
+            }
+        )
+
+    checkpoint = RollupCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+    return {
+        "granularity": granularity,
+        "folded_through_submission": (
+            checkpoint.last_submission_id if checkpoint else 0
+        ),
+        "buckets": buckets,
+        "totals": {
+            "submission_count": total_submissions,
+            "fields": {name: _field_summary(total) for name, total in totals.items()},
+        },
+    }
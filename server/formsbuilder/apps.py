@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FormsbuilderConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "formsbuilder"
+
+    def ready(self):
+        from formsbuilder import signals  # noqa: F401
@@ -0,0 +1,195 @@
+"""ASGI-native views.
+
+``submit_form`` accepts the same requests and returns the same responses as
+``FormTemplateViewSet.submit_form``, without holding a worker thread while
+it waits on the cache or the database. DRF viewsets are synchronous, so
+this is a plain Django async view; it still authenticates with the same
+JWT access tokens. Under WSGI it works too, with Django running it in a
+private event loop per request, so the viewset remains the one to use there.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import Http404, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from formsbuilder.fastjson import loads
+from formsbuilder.idempotency import (
+    REPLAYED_HEADER,
+    KeyReused,
+    acache_response,
+    afind_response,
+    ahas_cached_response,
+    invalid_key_body,
+    key_reused_body,
+    keyed_provisional_id,
+    remember_response,
+    request_digest,
+    request_key,
+)
+from formsbuilder.metrics import timed
+from formsbuilder.models import FormSubmission
+from formsbuilder.ratelimits import acheck_submission_rate
+from formsbuilder.replicas import aremember_write, client_key
+from formsbuilder.schema import aget_form_schema
+from formsbuilder.tasks import notify_form_submissions
+from formsbuilder.views import accepted_body, payload_too_large, submission_error
+from formsbuilder.writebehind import buffer_submission, write_behind_enabled
+
+authenticator = JWTAuthentication()
+
+
+async def _authenticate(request):
+    """The user of the request's JWT, ``None`` when anonymous."""
+    if authenticator.get_header(request) is None:
+        return None
+    # Token validation is pure Python; fetching the user is an ORM query.
+    result = await sync_to_async(authenticator.authenticate)(request)
+    return result[0] if result is not None else None
+
+
+@sync_to_async
+def _store_submission(schema, form_data, user, ip_address, loop, key, digest):
+    # The submission, its counters (see formsbuilder.signals) and its
+    # idempotency key commit together, which needs a transaction and so the
+    # synchronous ORM. Returns the response body, or ``None`` when a
+    # concurrent attempt with the same key committed first.
+    try:
+        with timed("insert"), transaction.atomic():
+            form_submission = FormSubmission.objects.create(
+                form_template_id=schema.template_id,
+                template_version_id=schema.template_version_id,
+                submission_data=form_data,
+                submitted_by=user,
+                ip_address=ip_address,
+            )
+            body = {
+                "message": "Form submitted successfully",
+                "submission_id": form_submission.id,
+            }
+            if key is not None:
+                remember_response(schema.template_id, key, digest, 201, body)
+            with timed("notify"):
+                notify_form_submissions(schema.template_id, [form_submission.id], loop)
+    except IntegrityError:
+        if key is None:
+            raise
+        return None
+    return body
+
+
+async def _replay(schema, key, digest):
+    """The response to replay for a retried keyed request, or ``None``."""
+    try:
+        replay = await afind_response(schema.template_id, key, digest)
+    except KeyReused:
+        return JsonResponse(key_reused_body(), status=422)
+    if replay is None:
+        return None
+    status_code, body = replay
+    response = JsonResponse(body, status=status_code)
+    response[REPLAYED_HEADER] = "true"
+    return response
+
+
+def _parse_error(exc):
+    return JsonResponse({"detail": f"JSON parse error - {exc}"}, status=400)
+
+
+@csrf_exempt
+@require_POST
+async def submit_form(request, pk):
+    # Checked before anything touches the cache, the database or the body.
+    if payload_too_large(request, settings.FORMSBUILDER_MAX_SUBMISSION_BYTES):
+        return JsonResponse(
+            {
+                "message": "Submission too large",
+                "max_bytes": settings.FORMSBUILDER_MAX_SUBMISSION_BYTES,
+            },
+            status=413,
+        )
+    try:
+        key = request_key(request)
+    except ValueError as exc:
+        return JsonResponse(invalid_key_body(exc), status=400)
+
+    try:
+        user = await _authenticate(request)
+    except AuthenticationFailed as exc:
+        # Shaped like DRF's response to the same failure.
+        data = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+        response = JsonResponse(data, status=401)
+        response["WWW-Authenticate"] = authenticator.authenticate_header(request)
+        return response
+
+    try:
+        with timed("schema"):
+            schema = await aget_form_schema(pk)
+    except Http404:
+        return JsonResponse({"detail": "Not found."}, status=404)
+
+    # A retry whose response is cached stores nothing, so it takes no
+    # tokens; any other keyed request is rate-limited like the rest.
+    if key is None or not await ahas_cached_response(schema.template_id, key):
+        wait = await acheck_submission_rate(
+            schema, request.META.get("REMOTE_ADDR"), user.pk if user else None
+        )
+        if wait is not None:
+            # Shaped like DRF's response to a throttled request.
+            throttled = Throttled(wait)
+            response = JsonResponse({"detail": throttled.detail}, status=429)
+            response["Retry-After"] = str(throttled.wait)
+            return response
+
+    with timed("validate"):
+        try:
+            form_data = loads(request.body or b"{}")
+        except ValueError as exc:
+            return _parse_error(exc)
+        if key is not None:
+            digest = request_digest(form_data)
+            replay = await _replay(schema, key, digest)
+            if replay is not None:
+                return replay
+        error = submission_error(schema, form_data)
+    if error is not None:
+        return JsonResponse(error, status=400)
+
+    if write_behind_enabled():
+        # The buffer does blocking I/O but never touches the ORM.
+        with timed("buffer"):
+            provisional_id = await sync_to_async(
+                buffer_submission, thread_sensitive=False
+            )(
+                schema,
+                form_data,
+                user.pk if user else None,
+                request.META.get("REMOTE_ADDR"),
+                key and keyed_provisional_id(schema.template_id, key),
+            )
+        body = accepted_body(provisional_id)
+        if key is not None:
+            await acache_response(schema.template_id, key, digest, 202, body)
+        return JsonResponse(body, status=202)
+
+    ip_address = request.META.get("REMOTE_ADDR")
+    body = await _store_submission(
+        schema,
+        form_data,
+        user,
+        ip_address,
+        asyncio.get_running_loop(),
+        key,
+        None if key is None else digest,
+    )
+    if body is None:
+        # A concurrent attempt with the same key committed first.
+        return await _replay(schema, key, digest)
+    await aremember_write(client_key(user, ip_address))
+    return JsonResponse(body, status=201)
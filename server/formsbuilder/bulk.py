@@ -0,0 +1,125 @@
+"""Bulk, diff-based writes of a template's fields and options.
+
+``sync_template_fields`` replaces the fields of a template with an already
+validated ``fields_data`` payload. Incoming fields are matched to existing
+ones by ``id`` and then by ``field_name`` (options by ``id`` and then by
+``value``), so unchanged rows keep their primary keys and only the real
+inserts, updates and deletes reach the database, each as a single bulk query.
+"""
+
+from django.db import transaction
+
+from formsbuilder.models import FormField, FormFieldOption
+from formsbuilder.schema import deferred_template_changes
+
+FIELD_ATTRS = (
+    "field_name",
+    "label",
+    "widget_type",
+    "placeholder",
+    "help_text",
+    "is_required",
+    "order",
+    "widget_config",
+    "validation_rules",
+    "conditional_logic",
+)
+
+OPTION_ATTRS = ("value", "label", "order")
+
+
+def _with_defaults(model, attrs, data):
+    """Fill attributes missing from ``data`` with the model defaults.
+
+    A sync replaces the whole field list, so an omitted attribute means
+    "reset", exactly as it did when fields were deleted and recreated.
+    """
+    return {
+        attr: data[attr] if attr in data else model._meta.get_field(attr).get_default()
+        for attr in attrs
+    }
+
+
+def _assign(instance, values):
+    changed = False
+    for attr, value in values.items():
+        if getattr(instance, attr) != value:
+            setattr(instance, attr, value)
+            changed = True
+    return changed
+
+
+def _match(instance_id, key, by_id, by_key, matched):
+    instance = by_id.get(instance_id) or by_key.get(key)
+    if instance is None or instance.pk in matched:
+        return None
+    matched.add(instance.pk)
+    return instance
+
+
+def sync_template_fields(form_template, fields_data):
+    """Make ``form_template``'s fields and options match ``fields_data``."""
+    with transaction.atomic(), deferred_template_changes(form_template.pk):
+        existing = list(form_template.fields.prefetch_related("options"))
+        fields_by_id = {field.pk: field for field in existing}
+        fields_by_name = {field.field_name: field for field in existing}
+        kept_fields = set()
+
+        new_fields, changed_fields, option_plan = [], [], []
+        for field_data in fields_data:
+            values = _with_defaults(FormField, FIELD_ATTRS, field_data)
+            field = _match(
+                field_data.get("id"),
+                values["field_name"],
+                fields_by_id,
+                fields_by_name,
+                kept_fields,
+            )
+            if field is None:
+                field = FormField(form_template=form_template, **values)
+                new_fields.append(field)
+            elif _assign(field, values):
+                changed_fields.append(field)
+            option_plan.append((field, field_data.get("options") or []))
+
+        stale_fields = [field.pk for field in existing if field.pk not in kept_fields]
+        if stale_fields:
+            FormField.objects.filter(pk__in=stale_fields).delete()
+        if new_fields:
+            FormField.objects.bulk_create(new_fields)
+        if changed_fields:
+            FormField.objects.bulk_update(changed_fields, FIELD_ATTRS)
+
+        new_options, changed_options, stale_options = [], [], []
+        for field, options_data in option_plan:
+            current = list(field.options.all()) if field.pk in kept_fields else []
+            options_by_id = {option.pk: option for option in current}
+            options_by_value = {option.value: option for option in current}
+            kept_options = set()
+
+            for option_data in options_data:
+                values = _with_defaults(FormFieldOption, OPTION_ATTRS, option_data)
+                option = _match(
+                    option_data.get("id"),
+                    values["value"],
+                    options_by_id,
+                    options_by_value,
+                    kept_options,
+                )
+                if option is None:
+                    new_options.append(FormFieldOption(form_field=field, **values))
+                elif _assign(option, values):
+                    changed_options.append(option)
+
+            stale_options.extend(
+                option.pk for option in current if option.pk not in kept_options
+            )
+
+        if stale_options:
+            FormFieldOption.objects.filter(pk__in=stale_options).delete()
+        if new_options:
+            FormFieldOption.objects.bulk_create(new_options)
+        if changed_options:
+            FormFieldOption.objects.bulk_update(changed_options, OPTION_ATTRS)
+
+    return form_template
@@ -0,0 +1,278 @@
+"""Compiled conditional-logic engine.
+
+A field's ``conditional_logic`` JSON is compiled once into a small
+expression tree:
+
+    {
+        "action": "show",             # or "hide"
+        "logicalOperator": "and",     # or "or"
+        "conditions": [
+            {"field": "country", "operator": "equals", "value": "KE"},
+            {                         # groups nest to any depth
+                "logicalOperator": "or",
+                "conditions": [
+                    {"field": "age", "operator": "greater_than", "value": 30},
+                    {"field": "vip", "operator": "is_not_empty"},
+                ],
+            },
+        ],
+    }
+
+Operators are resolved through dispatch tables and constants are coerced to
+``str``/``float`` at compile time, so evaluating a rule only touches the
+submitted values. ``Rule.evaluate_batch`` and ``evaluate_rules`` evaluate a
+rule (set) over many submissions at once, column by column, coercing each
+submitted value at most once per batch.
+
+The operator semantics are those of
+``FormTemplateViewSet._evaluate_condition`` and ``_should_validate_field``,
+which remain the reference implementation.
+"""
+
+import operator
+
+PRESENCE = "presence"
+STRING = "string"
+NUMERIC = "numeric"
+
+
+def _is_empty(present, value):
+    return not present or value in (None, "")
+
+
+def _is_not_empty(present, value):
+    return present and value not in (None, "")
+
+
+def _contains(field_value, value):
+    return value in field_value
+
+
+def _not_contains(field_value, value):
+    return value not in field_value
+
+
+OPERATORS = {
+    "is_empty": (PRESENCE, _is_empty),
+    "is_not_empty": (PRESENCE, _is_not_empty),
+    "equals": (STRING, operator.eq),
+    "not_equals": (STRING, operator.ne),
+    "contains": (STRING, _contains),
+    "not_contains": (STRING, _not_contains),
+    "greater_than": (NUMERIC, operator.gt),
+    "less_than": (NUMERIC, operator.lt),
+    "greater_than_or_equals": (NUMERIC, operator.ge),
+    "less_than_or_equals": (NUMERIC, operator.le),
+}
+
+LOGICAL_OPERATORS = {"and": all, "or": any}
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+class Columns:
+    """Column-oriented view of a batch of submissions.
+
+    Each column (presence flags, raw, ``str`` and ``float`` values) is
+    computed on first use and shared by every condition on that field.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._raw = {}
+        self._str = {}
+        self._float = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def raw(self, field):
+        column = self._raw.get(field)
+        if column is None:
+            missing = self._MISSING
+            column = self._raw[field] = [row.get(field, missing) for row in self.rows]
+        return column
+
+    def present(self, field):
+        missing = self._MISSING
+        return [value is not missing for value in self.raw(field)]
+
+    def strings(self, field):
+        column = self._str.get(field)
+        if column is None:
+            missing = self._MISSING
+            column = self._str[field] = [
+                None if value is missing else str(value) for value in self.raw(field)
+            ]
+        return column
+
+    def floats(self, field):
+        column = self._float.get(field)
+        if column is None:
+            missing = self._MISSING
+            column = self._float[field] = [
+                None if value is missing else _to_float(value)
+                for value in self.raw(field)
+            ]
+        return column
+
+
+class Condition:
+    """Leaf node: one ``{"field", "operator", "value"}`` comparison."""
+
+    __slots__ = ("field", "operator", "kind", "compare", "str_value", "num_value")
+
+    def __init__(self, field, operator_name, value=None):
+        self.field = field
+        self.operator = operator_name
+        self.kind, self.compare = OPERATORS.get(operator_name, (None, None))
+        self.str_value = str(value) if value is not None else ""
+        self.num_value = _to_float(value) if value is not None else 0.0
+
+    def evaluate(self, data):
+        kind = self.kind
+        if kind is STRING:
+            return self.field in data and self.compare(
+                str(data[self.field]), self.str_value
+            )
+        if kind is NUMERIC:
+            if self.num_value is None or self.field not in data:
+                return False
+            num_field = _to_float(data[self.field])
+            return num_field is not None and self.compare(num_field, self.num_value)
+        if kind is PRESENCE:
+            present = self.field in data
+            return self.compare(present, data[self.field] if present else None)
+        return False  # Unknown operator
+
+    def evaluate_batch(self, columns):
+        kind = self.kind
+        compare = self.compare
+        if kind is STRING:
+            str_value = self.str_value
+            return [
+                value is not None and compare(value, str_value)
+                for value in columns.strings(self.field)
+            ]
+        if kind is NUMERIC:
+            num_value = self.num_value
+            if num_value is None:
+                return [False] * len(columns)
+            return [
+                value is not None and compare(value, num_value)
+                for value in columns.floats(self.field)
+            ]
+        if kind is PRESENCE:
+            return [
+                compare(present, value if present else None)
+                for present, value in zip(
+                    columns.present(self.field), columns.raw(self.field)
+                )
+            ]
+        return [False] * len(columns)
+
+    def __repr__(self):
+        return f"<Condition {self.field} {self.operator} {self.str_value!r}>"
+
+
+class Group:
+    """Inner node: children combined with ``and`` (``all``) or ``or`` (``any``)."""
+
+    __slots__ = ("combine", "children")
+
+    def __init__(self, combine, children):
+        self.combine = combine
+        self.children = tuple(children)
+
+    def evaluate(self, data):
+        return self.combine(child.evaluate(data) for child in self.children)
+
+    def evaluate_batch(self, columns):
+        if not self.children:
+            return [self.combine(())] * len(columns)
+        results = [child.evaluate_batch(columns) for child in self.children]
+        return [self.combine(values) for values in zip(*results)]
+
+    def __repr__(self):
+        return f"<Group {self.combine.__name__} {list(self.children)}>"
+
+
+class Rule:
+    """A compiled ``conditional_logic`` document.
+
+    ``evaluate`` answers "should this field be validated for this
+    submission", exactly like ``_should_validate_field``.
+    """
+
+    __slots__ = ("action", "expression")
+
+    def __init__(self, action=None, expression=None):
+        self.action = action
+        self.expression = expression
+
+    def evaluate(self, data):
+        if self.expression is None:
+            return True
+        if self.action == "show":
+            return self.expression.evaluate(data)
+        return not self.expression.evaluate(data)
+
+    def evaluate_batch(self, rows):
+        columns = rows if isinstance(rows, Columns) else Columns(rows)
+        if self.expression is None:
+            return [True] * len(columns)
+        results = self.expression.evaluate_batch(columns)
+        if self.action == "show":
+            return results
+        return [not result for result in results]
+
+    def __repr__(self):
+        return f"<Rule {self.action} {self.expression!r}>"
+
+
+ALWAYS = Rule()
+
+
+def _combinator(node):
+    logical_operator = str(node.get("logicalOperator", "and")).lower()
+    # Anything other than "and" has always meant "or".
+    return LOGICAL_OPERATORS.get(logical_operator, any)
+
+
+def compile_expression(node):
+    """Compile a condition or a (nested) group of conditions."""
+    if "conditions" in node:
+        return Group(
+            _combinator(node),
+            [compile_expression(child) for child in node.get("conditions") or []],
+        )
+    return Condition(node.get("field"), node.get("operator"), node.get("value"))
+
+
+def compile_rule(conditional_logic):
+    """Compile a field's ``conditional_logic`` into a ``Rule``."""
+    conditional_logic = conditional_logic or {}
+    if not conditional_logic.get("conditions"):
+        return ALWAYS
+
+    action = str(conditional_logic.get("action", "show")).lower()
+    if action not in ("show", "hide"):
+        return ALWAYS
+    return Rule(action, compile_expression(conditional_logic))
+
+
+def evaluate_rules(rules, rows):
+    """Evaluate a ``{name: Rule}`` set against many submission dicts.
+
+    Returns ``{name: [bool, ...]}`` with one result per row. Submitted values
+    are coerced once per batch and shared by every rule.
+    """
+    columns = Columns(rows)
+    return {name: rule.evaluate_batch(columns) for name, rule in rules.items()}
@@ -0,0 +1,74 @@
+"""HTTP caching of the public form definition (``retrieve``) responses.
+
+The template version from ``formsbuilder.schema`` (its ``updated_at``, bumped
+by every template, field and option change) identifies the exact JSON a
+definition renders to. It gives a strong ``ETag`` and a ``Last-Modified``
+date without touching the database once the schema cache is warm, and it
+keys the server-side cache of the rendered bytes, so stale entries are never
+served and need no invalidation.
+
+The creator's username is part of the definition but does not bump the
+version; a renamed creator shows up with the next template change.
+"""
+
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from formsbuilder.metrics import record_cache
+
+CACHE_PREFIX = "formsbuilder:definition"
+
+# Bump when the serialized shape of a definition changes, so clients and
+# CDNs holding the old ETag fetch the new representation.
+DEFINITION_FORMAT = 1
+
+
+def _content_key(template_id, version):
+    return f"{CACHE_PREFIX}:{DEFINITION_FORMAT}:{template_id}:{version}"
+
+
+def definition_etag(template_id, version):
+    digest = hashlib.md5(
+        f"{DEFINITION_FORMAT}:{template_id}:{version}".encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def definition_last_modified(version):
+    """``Last-Modified`` as a POSIX timestamp (whole seconds)."""
+    return int(datetime.fromisoformat(version).timestamp())
+
+
+def get_cached_definition(template_id, version):
+    content = cache.get(_content_key(template_id, version))
+    record_cache("definition", content is not None)
+    return content
+
+
+def cache_definition(template_id, version, content):
+    cache.set(
+        _content_key(template_id, version),
+        content,
+        settings.FORMSBUILDER_SCHEMA_CACHE_TIMEOUT,
+    )
+
+
+def set_definition_headers(response, template_id, version):
+    """Add the validators and CDN-friendly caching headers to ``response``."""
+    response["ETag"] = definition_etag(template_id, version)
+    response["Last-Modified"] = http_date(definition_last_modified(version))
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=settings.FORMSBUILDER_DEFINITION_MAX_AGE,
+        s_maxage=settings.FORMSBUILDER_DEFINITION_SHARED_MAX_AGE,
+        stale_while_revalidate=settings.FORMSBUILDER_DEFINITION_STALE_WHILE_REVALIDATE,
+    )
+    patch_vary_headers(response, ["Accept"])
+    return response
@@ -0,0 +1,81 @@
+"""JSON encoding and decoding with the fastest backend available.
+
+``FORMSBUILDER_JSON_BACKEND`` picks the backend: ``orjson`` (needs the
+package), ``json`` (the standard library) or ``auto``, the default, which
+uses orjson when it is installed. Either way ``dumps`` produces what DRF's
+``JSONRenderer`` does with its default settings: compact UTF-8 with
+``U+2028``/``U+2029`` escaped, datetimes in ISO 8601 with ``Z`` for UTC,
+``Decimal`` as a number, and dates, times, UUIDs and lazy strings through
+DRF's own encoder.
+
+orjson only handles 64-bit integers: documents with longer ones are encoded
+and decoded by the standard library instead, so they round-trip exactly.
+"""
+
+import json
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.json import strict_constant
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+AUTO = "auto"
+ORJSON = "orjson"
+STDLIB = "json"
+
+_encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+# A number orjson might not hold (or a long digit run inside a string,
+# which costs nothing but the fallback).
+_LONG_INTEGER = re.compile(rb"\d{19}")
+
+if orjson is not None:
+    # Datetimes go through DRF's encoder, which writes "Z" rather than
+    # "+00:00" and keeps each value's own offset.
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def json_backend():
+    backend = settings.FORMSBUILDER_JSON_BACKEND
+    if backend == AUTO:
+        return ORJSON if orjson is not None else STDLIB
+    if backend == ORJSON and orjson is None:
+        raise ImproperlyConfigured(
+            "FORMSBUILDER_JSON_BACKEND is 'orjson' but orjson is not installed"
+        )
+    if backend not in (ORJSON, STDLIB):
+        raise ImproperlyConfigured(f"Unknown FORMSBUILDER_JSON_BACKEND {backend!r}")
+    return backend
+
+
+def dumps(data):
+    """``data`` as compact JSON bytes."""
+    content = None
+    if json_backend() == ORJSON:
+        try:
+            content = orjson.dumps(
+                data, default=_encoder.default, option=_ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            pass  # e.g. an integer beyond 64 bits; the encoder decides
+    if content is None:
+        content = _encoder.encode(data).encode()
+    # Keep the output a strict JavaScript subset, as DRF does.
+    return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+        b"\xe2\x80\xa9", b"\\u2029"
+    )
+
+
+def loads(content):
+    """Parse JSON ``bytes`` (UTF-8); raises ``ValueError`` when invalid.
+
+    ``NaN`` and ``Infinity`` are invalid, as they are for DRF's parser.
+    """
+    if json_backend() == ORJSON and not _LONG_INTEGER.search(content):
+        return orjson.loads(content)
+    return json.loads(content, parse_constant=strict_constant)
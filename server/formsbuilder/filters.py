@@ -0,0 +1,333 @@
+"""Database-side filtering of submissions by their answers.
+
+Filters use the conditional-logic vocabulary of ``formsbuilder.conditions``
+and are translated into JSON lookups on ``FormSubmission.submission_data``,
+so they run in the database on every backend:
+
+    {
+        "logicalOperator": "and",
+        "conditions": [
+            {"field": "country", "operator": "equals", "value": "KE"},
+            {"field": "age", "operator": "greater_than", "value": 30},
+        ],
+    }
+
+On PostgreSQL ``equals``/``not_equals`` become ``@>`` containment and the
+presence operators ``?`` key tests, both served by the GIN index on
+``submission_data``. Fields whose ``widget_config`` has ``"indexed": true``
+get per-field indexes from ``sync_submission_indexes``, and their filters
+use the indexed expression: ``numeric_value`` for numeric comparisons, and
+``text_value`` for ``equals`` on fields that are not numbers. Other backends
+evaluate the same expressions without those indexes.
+"""
+
+import hashlib
+import json
+
+from django.db import connection, connections
+from django.db.models import Case, FloatField, Index, Q, Value, When
+from django.db.models.fields.json import KeyTextTransform, KeyTransform
+from django.db.models.functions import Cast, Coalesce, StrIndex
+from django.db.models.lookups import Regex
+
+from formsbuilder.conditions import LOGICAL_OPERATORS, NUMERIC, OPERATORS, Condition
+from formsbuilder.models import FormField, FormSubmission
+from formsbuilder.partitions import is_partitioned
+
+NUMBER_PATTERN = r"^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$"
+INDEX_PREFIX = "fsub"
+
+# JSON answers whose ``->>`` text (NULL, ``true``/``1``) differs from the
+# ``str()`` the conditional-logic engine compares.
+PYTHON_TEXT = {"None": None, "True": True, "False": False}
+
+NUMERIC_LOOKUPS = {
+    "greater_than": "gt",
+    "less_than": "lt",
+    "greater_than_or_equals": "gte",
+    "less_than_or_equals": "lte",
+}
+
+
+class FilterError(ValueError):
+    """A filter document that cannot be translated."""
+
+
+def text_value(field_name):
+    """The answer to ``field_name`` as text (``submission_data ->> field``)."""
+    return KeyTextTransform(field_name, "submission_data")
+
+
+def numeric_value(field_name):
+    """The answer to ``field_name`` as a float; ``NULL`` when not numeric.
+
+    Never fails on non-numeric answers, unlike a bare cast.
+    """
+    return Case(
+        When(
+            Regex(text_value(field_name), Value(NUMBER_PATTERN)),
+            then=Cast(text_value(field_name), FloatField()),
+        ),
+        default=None,
+        output_field=FloatField(),
+    )
+
+
+def _json_candidates(value):
+    """JSON values whose ``str()`` equals ``str(value)``, as ``equals`` compares."""
+    text = str(value)
+    candidates = [text]
+    if text in PYTHON_TEXT:
+        candidates.append(PYTHON_TEXT[text])
+    else:
+        for parse in (int, float):
+            try:
+                number = parse(text)
+            except ValueError:
+                continue
+            if str(number) == text:
+                candidates.append(number)
+                break
+    return candidates
+
+
+def _present(field_name):
+    return Q(submission_data__has_key=field_name)
+
+
+def _nothing():
+    return Q(pk__in=[])
+
+
+class _Translation:
+    """Translates a conditions document into a ``Q`` and the aliases it uses."""
+
+    def __init__(self, max_conditions, containment, text_indexed=()):
+        self.max_conditions = max_conditions
+        self.containment = containment
+        self.text_indexed = text_indexed
+        self.conditions = 0
+        self.aliases = {}
+        self._answers = {}
+
+    def alias(self, expression):
+        name = f"_filter_{len(self.aliases)}"
+        self.aliases[name] = expression
+        return name
+
+    def answer_is(self, field_name, value):
+        """``submission_data[field_name]`` equals the JSON ``value``."""
+        name = self._answers.get(field_name)
+        if name is None:
+            name = self._answers[field_name] = self.alias(
+                KeyTransform(field_name, "submission_data")
+            )
+        return Q(**{name: value})
+
+    def equals(self, field_name, value):
+        q = Q()
+        for candidate in _json_candidates(value):
+            if self.containment:
+                q |= Q(submission_data__contains={field_name: candidate})
+            else:
+                q |= self.answer_is(field_name, candidate)
+        return q
+
+    def blank(self, field_name):
+        return self.answer_is(field_name, None) | self.answer_is(field_name, "")
+
+    def contains(self, field_name, value):
+        """``value in str(answer)``, for an answer that is present."""
+        # Coalesce keeps the position non-NULL, so a negation stays two-valued.
+        name = self.alias(
+            StrIndex(Coalesce(text_value(field_name), Value("")), Value(value))
+        )
+        q = (
+            Q(**{f"{name}__gt": 0})
+            & ~self.answer_is(field_name, True)
+            & ~self.answer_is(field_name, False)
+        )
+        for text, constant in PYTHON_TEXT.items():
+            if value in text:
+                q |= self.answer_is(field_name, constant)
+        return q
+
+    def condition(self, node):
+        field_name = node.get("field")
+        if not isinstance(field_name, str) or not field_name:
+            raise FilterError("Each condition needs a field name.")
+        if node.get("operator") not in OPERATORS:
+            raise FilterError(f"Unknown operator: {node.get('operator')}")
+        # Coerce the constant exactly as the conditional-logic engine does.
+        condition = Condition(field_name, node["operator"], node.get("value"))
+        operator_name = condition.operator
+
+        if operator_name == "is_empty":
+            return ~_present(field_name) | self.blank(field_name)
+        if operator_name == "is_not_empty":
+            return _present(field_name) & ~self.blank(field_name)
+        if operator_name == "equals":
+            if (
+                field_name in self.text_indexed
+                and condition.str_value not in PYTHON_TEXT
+            ):
+                # ``->>`` text is ``str()`` of the answer except for those
+                # constants, and this is the expression the index is built on.
+                name = self.alias(text_value(field_name))
+                return Q(**{name: condition.str_value})
+            return _present(field_name) & self.equals(field_name, condition.str_value)
+        if operator_name == "not_equals":
+            return _present(field_name) & ~self.equals(field_name, condition.str_value)
+
+        if condition.kind is NUMERIC:
+            if condition.num_value is None:
+                return _nothing()
+            name = self.alias(numeric_value(field_name))
+            lookup = NUMERIC_LOOKUPS[operator_name]
+            return Q(**{f"{name}__{lookup}": condition.num_value})
+
+        # contains / not_contains compare case-sensitively, like ``str in str``.
+        if not condition.str_value:
+            return _present(field_name) if operator_name == "contains" else _nothing()
+        contains = self.contains(field_name, condition.str_value)
+        if operator_name == "contains":
+            return _present(field_name) & contains
+        return _present(field_name) & ~contains
+
+    def translate(self, node):
+        if isinstance(node, list):
+            node = {"logicalOperator": "and", "conditions": node}
+        if not isinstance(node, dict):
+            raise FilterError("Conditions must be JSON objects.")
+        if "conditions" not in node:
+            self.conditions += 1
+            if self.conditions > self.max_conditions:
+                raise FilterError(
+                    f"A filter may have at most {self.max_conditions} conditions."
+                )
+            return self.condition(node)
+
+        children = node.get("conditions") or []
+        if not isinstance(children, list):
+            raise FilterError("conditions must be a list.")
+        logical_operator = str(node.get("logicalOperator", "and")).lower()
+        if logical_operator not in LOGICAL_OPERATORS:
+            raise FilterError(f"Unknown logicalOperator: {logical_operator}")
+        if logical_operator == "and":
+            q = Q()
+            for child in children:
+                q &= self.translate(child)
+            return q
+        q = _nothing()
+        for child in children:
+            q |= self.translate(child)
+        return q
+
+
+def filter_submissions(queryset, document, max_conditions=20, template_id=None):
+    """Filter a ``FormSubmission`` queryset with a conditions document.
+
+    ``document`` is a conditions group (or a list of conditions, combined
+    with ``and``). Raises ``FilterError`` when it cannot be translated.
+    Pass the ``template_id`` the queryset is limited to so that conditions
+    on its indexed fields use their per-field indexes.
+    """
+    # ``@>`` is what the GIN index serves; backends without JSON containment
+    # (SQLite) compare the extracted values instead.
+    containment = connections[queryset.db].features.supports_json_field_contains
+    text_indexed = set()
+    if template_id is not None and connections[queryset.db].vendor == "postgresql":
+        text_indexed = {
+            field_name
+            for field_name, kind in _indexed_fields(template_id)
+            if kind == "text"
+        }
+    translation = _Translation(max_conditions, containment, text_indexed)
+    q = translation.translate(document)
+    if translation.aliases:
+        queryset = queryset.alias(**translation.aliases)
+    return queryset.filter(q)
+
+
+def parse_filter(raw):
+    """Parse the ``filter`` query parameter."""
+    try:
+        return json.loads(raw)
+    except ValueError as exc:
+        raise FilterError(f"filter is not valid JSON: {exc}") from exc
+
+
+def _index_name(template_id, field_name, kind):
+    digest = hashlib.md5(
+        f"{field_name}:{kind}".encode(), usedforsecurity=False
+    ).hexdigest()[:10]
+    return f"{INDEX_PREFIX}_{template_id}_{digest}"
+
+
+def _indexed_fields(template_id):
+    """``(field name, "number" or "text")`` of a template's ``indexed`` fields."""
+    fields = FormField.objects.filter(
+        form_template_id=template_id, widget_config__indexed=True
+    ).values_list("field_name", "widget_type")
+    return [
+        (field_name, "number" if widget_type == "number" else "text")
+        for field_name, widget_type in fields
+    ]
+
+
+def indexed_field_indexes(template_id):
+    """The expression indexes wanted for a template's ``indexed`` fields.
+
+    Partial on the template, so each index only holds its own submissions.
+    Number fields get the ``numeric_value`` expression, which numeric
+    comparisons filter on; others the text, which ``equals`` filters on.
+    """
+    indexes = []
+    for field_name, kind in _indexed_fields(template_id):
+        expression = (
+            numeric_value(field_name) if kind == "number" else text_value(field_name)
+        )
+        indexes.append(
+            Index(
+                expression,
+                name=_index_name(template_id, field_name, kind),
+                condition=Q(form_template_id=template_id),
+            )
+        )
+    return indexes
+
+
+def sync_submission_indexes(template_id):
+    """Create and drop per-field expression indexes of a template.
+
+    PostgreSQL only: indexes are built ``CONCURRENTLY``, so this must run
+    outside a transaction (it does, from a Celery task). PostgreSQL cannot
+    index a partitioned table concurrently; once ``formsbuilder.partitions``
+    has converted the table, indexes are built in place. Returns the names
+    of the indexes created and dropped.
+    """
+    if connection.vendor != "postgresql":
+        return {"created": [], "dropped": []}
+
+    wanted = {index.name: index for index in indexed_field_indexes(template_id)}
+    prefix = f"{INDEX_PREFIX}_{template_id}_"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE tablename = %s AND starts_with(indexname, %s)",
+            [FormSubmission._meta.db_table, prefix],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+
+    created = sorted(set(wanted) - existing)
+    dropped = sorted(existing - set(wanted))
+    concurrently = not is_partitioned()
+    drop = "DROP INDEX CONCURRENTLY" if concurrently else "DROP INDEX"
+    with connection.schema_editor(atomic=False) as schema_editor:
+        for name in dropped:
+            schema_editor.execute(f"{drop} IF EXISTS {schema_editor.quote_name(name)}")
+        for name in created:
+            schema_editor.add_index(
+                FormSubmission, wanted[name], concurrently=concurrently
+            )
+    return {"created": created, "dropped": dropped}
@@ -0,0 +1,200 @@
+"""Idempotent submissions keyed by the client's ``Idempotency-Key`` header.
+
+A client that retries a submission with the same key gets the response of
+the first attempt back, with ``Idempotent-Replayed: true``, instead of a
+second submission and a second notification. Keys are scoped to a form.
+
+* ``submit`` and ``submit-batch`` store the key in ``IdempotencyKey`` in the
+  same transaction as the submissions. Its unique constraint makes two
+  concurrent attempts with one key write once: the second one's INSERT
+  fails and it replays the first one's response.
+* With write-behind (``formsbuilder.writebehind``) nothing is written while
+  the request is served; the key instead determines the provisional id, and
+  the flush already writes each provisional id once.
+
+Responses are also cached for ``FORMSBUILDER_IDEMPOTENCY_CACHE_TIMEOUT``
+seconds, so a retry usually costs no query, and the rows are purged after
+``FORMSBUILDER_IDEMPOTENCY_KEY_RETENTION`` seconds. Only successful
+responses are remembered: a rejected submission can be corrected and sent
+again with the same key. Reusing a key for a different body is an error.
+"""
+
+import hashlib
+import json
+import uuid
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from formsbuilder.metrics import record_cache
+from formsbuilder.models import FlushedSubmission, IdempotencyKey
+from formsbuilder.replicas import primary_reads
+
+CACHE_PREFIX = "formsbuilder:idempotency"
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+PROVISIONAL_NAMESPACE = uuid.UUID("6f1d0c8e-2a4b-4c47-9a39-5d0f8e0b7c21")
+
+
+class KeyReused(Exception):
+    """The key was already used for a different request body."""
+
+
+def request_key(request):
+    """The request's ``Idempotency-Key``, or ``None``.
+
+    Raises ``ValueError`` when the header is present but unusable.
+    """
+    key = request.headers.get(HEADER)
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+        raise ValueError(f"{HEADER} must be 1 to {MAX_KEY_LENGTH} printable characters")
+    return key
+
+
+def invalid_key_body(exc):
+    """The 400 response body for an unusable ``Idempotency-Key``."""
+    return {"message": "Invalid idempotency key", "detail": str(exc)}
+
+
+def key_reused_body():
+    """The 422 response body for a key reused with a different body."""
+    return {
+        "message": "Idempotency key reused",
+        "detail": f"This {HEADER} was already used for a different request.",
+    }
+
+
+def request_digest(data):
+    content = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def keyed_provisional_id(template_id, key):
+    """The write-behind provisional id of a keyed submission."""
+    return str(uuid.uuid5(PROVISIONAL_NAMESPACE, f"{template_id}:{key}"))
+
+
+def _cache_key(template_id, key):
+    # Keys are arbitrary client text; hash them into a cache-safe name.
+    return f"{CACHE_PREFIX}:{template_id}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def _replay(entry, digest):
+    stored_digest, status_code, body = entry
+    if stored_digest != digest:
+        raise KeyReused
+    return status_code, body
+
+
+@primary_reads()
+def _stored_entry(template_id, key):
+    return (
+        IdempotencyKey.objects.filter(form_template_id=template_id, key=key)
+        .values_list("request_digest", "status_code", "response")
+        .first()
+    )
+
+
+def has_cached_response(template_id, key):
+    """Whether a response to ``key`` is cached; one cache lookup, no query.
+
+    Lets a retry skip the rate limits before anything else is done for it.
+    """
+    return cache.get(_cache_key(template_id, key)) is not None
+
+
+async def ahas_cached_response(template_id, key):
+    """Async ``has_cached_response`` for ASGI views."""
+    return await cache.aget(_cache_key(template_id, key)) is not None
+
+
+def find_response(template_id, key, digest):
+    """``(status code, body)`` of the first request with ``key``, or ``None``.
+
+    Raises ``KeyReused`` when that request had a different body.
+    """
+    entry = cache.get(_cache_key(template_id, key))
+    record_cache("idempotency", entry is not None)
+    if entry is None:
+        entry = _stored_entry(template_id, key)
+        if entry is None:
+            return None
+        cache_response(template_id, key, *entry)
+    return _replay(entry, digest)
+
+
+async def afind_response(template_id, key, digest):
+    """Async ``find_response`` for ASGI views."""
+    entry = await cache.aget(_cache_key(template_id, key))
+    record_cache("idempotency", entry is not None)
+    if entry is None:
+        with primary_reads():
+            entry = (
+                await IdempotencyKey.objects.filter(
+                    form_template_id=template_id, key=key
+                )
+                .values_list("request_digest", "status_code", "response")
+                .afirst()
+            )
+        if entry is None:
+            return None
+        await acache_response(template_id, key, *entry)
+    return _replay(entry, digest)
+
+
+def cache_response(template_id, key, digest, status_code, body):
+    cache.set(
+        _cache_key(template_id, key),
+        (digest, status_code, body),
+        settings.FORMSBUILDER_IDEMPOTENCY_CACHE_TIMEOUT,
+    )
+
+
+async def acache_response(template_id, key, digest, status_code, body):
+    await cache.aset(
+        _cache_key(template_id, key),
+        (digest, status_code, body),
+        settings.FORMSBUILDER_IDEMPOTENCY_CACHE_TIMEOUT,
+    )
+
+
+def remember_response(template_id, key, digest, status_code, body):
+    """Record the response to a keyed request, in the caller's transaction.
+
+    Raises ``IntegrityError`` when another request with the same key got
+    there first; ``find_response`` then returns that request's response.
+    """
+    IdempotencyKey.objects.create(
+        form_template_id=template_id,
+        key=key,
+        request_digest=digest,
+        status_code=status_code,
+        response=body,
+    )
+    transaction.on_commit(
+        partial(cache_response, template_id, key, digest, status_code, body)
+    )
+
+
+def purge_idempotency_keys():
+    """Delete keys older than the retention period; returns how many.
+
+    The provisional ids the write-behind flush recorded as written are
+    purged with them: a keyed retry maps to the same provisional id, so they
+    must be remembered at least as long as the key.
+    """
+    cutoff = timezone.now() - timedelta(
+        seconds=settings.FORMSBUILDER_IDEMPOTENCY_KEY_RETENTION
+    )
+    FlushedSubmission.objects.filter(flushed_at__lt=cutoff).delete()
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from formsbuilder.writebehind import (
+    SpoolBuffer,
+    get_submission_buffer,
+    write_behind_enabled,
+)
+
+
+class Command(BaseCommand):
+    help = "Writes buffered (write-behind) submissions to the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Flush until the buffer is empty, then exit",
+        )
+
+    def handle(self, *args, **options):
+        if not write_behind_enabled():
+            raise CommandError("FORMSBUILDER_WRITE_BEHIND is not enabled.")
+        buffer = get_submission_buffer()
+        batch_size = settings.FORMSBUILDER_WRITE_BEHIND_BATCH_SIZE
+        max_latency = settings.FORMSBUILDER_WRITE_BEHIND_MAX_LATENCY
+        total = 0
+        while True:
+            written = buffer.flush(batch_size, max_latency)
+            total += written
+            if options["once"] and not written:
+                break
+            if isinstance(buffer, SpoolBuffer) and not options["once"]:
+                # The spool is drained in one go; wait for the next group.
+                time.sleep(max_latency)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {total} submissions"))
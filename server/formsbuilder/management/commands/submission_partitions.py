@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from formsbuilder.filters import sync_submission_indexes
+from formsbuilder.models import FormField
+from formsbuilder.partitions import (
+    PartitioningError,
+    archive_partitions,
+    convert_to_partitioned,
+    ensure_partitions,
+    list_partitions,
+    rehydrate_partition,
+)
+
+
+def month(value):
+    try:
+        return datetime.strptime(value, "%Y-%m").replace(tzinfo=timezone.utc)
+    except ValueError as exc:
+        raise CommandError(f"Expected a month as YYYY-MM, got {value!r}") from exc
+
+
+class Command(BaseCommand):
+    help = "Partitions submissions by month and archives old partitions"
+
+    def add_arguments(self, parser):
+        subcommands = parser.add_subparsers(dest="action", required=True)
+        convert = subcommands.add_parser(
+            "convert", help="Convert the submissions table to monthly partitions"
+        )
+        convert.add_argument("--months-ahead", type=int)
+        ensure = subcommands.add_parser(
+            "ensure", help="Create the partitions of the coming months"
+        )
+        ensure.add_argument("--months-ahead", type=int)
+        subcommands.add_parser("list", help="List the attached monthly partitions")
+        archive = subcommands.add_parser(
+            "archive", help="Archive every month before the given one"
+        )
+        archive.add_argument("--before", type=month, required=True)
+        archive.add_argument("--directory")
+        rehydrate = subcommands.add_parser(
+            "rehydrate", help="Attach an archived month again"
+        )
+        rehydrate.add_argument("path")
+
+    def handle(self, *args, **options):
+        try:
+            getattr(self, options["action"])(options)
+        except PartitioningError as exc:
+            raise CommandError(str(exc)) from exc
+
+    def convert(self, options):
+        created = convert_to_partitioned(options["months_ahead"])
+        template_ids = set(
+            FormField.objects.filter(widget_config__indexed=True).values_list(
+                "form_template_id", flat=True
+            )
+        )
+        for template_id in template_ids:
+            sync_submission_indexes(template_id)
+        self.stdout.write(
+            self.style.SUCCESS(f"Submissions partitioned into {len(created)} months")
+        )
+
+    def ensure(self, options):
+        created = ensure_partitions(options["months_ahead"])
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partitions"))
+
+    def list(self, options):
+        for name, start, end in list_partitions():
+            self.stdout.write(f"{name}\t{start:%Y-%m-%d}\t{end:%Y-%m-%d}")
+
+    def archive(self, options):
+        for path in archive_partitions(options["before"], options["directory"]):
+            self.stdout.write(self.style.SUCCESS(f"Archived {path}"))
+
+    def rehydrate(self, options):
+        restored = rehydrate_partition(options["path"])
+        self.stdout.write(self.style.SUCCESS(f"Restored {restored} submissions"))
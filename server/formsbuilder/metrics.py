@@ -0,0 +1,350 @@
+"""Request-level performance metrics in the Prometheus text format.
+
+``RequestMetricsMiddleware`` (``formsbuilder.middleware``) keeps a
+``RequestTimings`` for the request being served and, once the response is
+ready, records it against the request's route name (e.g.
+``form-template-submit-form``):
+
+* the request latency, and the request and response body sizes;
+* the number of database queries and the time spent in them, counted by
+  an execute wrapper on every connection;
+* the time spent in named phases: ``serialize`` (DRF serializers, see
+  ``TimedSerializerMixin``) and whatever code wraps in ``timed()``, such as
+  ``schema``, ``validate``, ``insert`` and ``notify`` in ``submit_form``;
+* cache hits and misses reported with ``record_cache()``.
+
+The metrics are kept in this process and rendered by ``render()`` for the
+``/metrics`` endpoint, so every worker process is scraped on its own.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value) if value != float("inf") else "+Inf"
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        """``(name, ((label, value), ...), value)`` for every sample."""
+        raise NotImplementedError
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, tuple(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(float(bound) for bound in buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts, then the sum and count of observations.
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in values:
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, state):
+                cumulative += bucket
+                yield f"{self.name}_bucket", labels + (("le", bound),), cumulative
+            yield f"{self.name}_bucket", labels + (("le", "+Inf"),), state[-1]
+            yield f"{self.name}_sum", labels, state[-2]
+            yield f"{self.name}_count", labels, state[-1]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+REQUESTS = registry.register(
+    Counter(
+        "formsbuilder_requests_total",
+        "Requests served, by route, method and status code.",
+        ("view", "method", "status"),
+    )
+)
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "formsbuilder_request_duration_seconds",
+        "Time to produce the response, by route and method.",
+        ("view", "method"),
+    )
+)
+PHASE_DURATION = registry.register(
+    Histogram(
+        "formsbuilder_request_phase_duration_seconds",
+        "Time a request spent in a phase (db, serialize, schema, ...).",
+        ("view", "phase"),
+    )
+)
+DB_QUERIES = registry.register(
+    Histogram(
+        "formsbuilder_db_queries_per_request",
+        "Database queries made by one request.",
+        ("view",),
+        QUERY_BUCKETS,
+    )
+)
+CACHE_REQUESTS = registry.register(
+    Counter(
+        "formsbuilder_cache_requests_total",
+        "Cache lookups made while serving requests, by cache and result.",
+        ("view", "cache", "result"),
+    )
+)
+RATE_LIMITED = registry.register(
+    Counter(
+        "formsbuilder_rate_limited_total",
+        "Submissions refused by a rate limit, by the scope that refused them.",
+        ("scope",),
+    )
+)
+REQUEST_SIZE = registry.register(
+    Histogram(
+        "formsbuilder_request_size_bytes",
+        "Request body sizes.",
+        ("view",),
+        SIZE_BUCKETS,
+    )
+)
+RESPONSE_SIZE = registry.register(
+    Histogram(
+        "formsbuilder_response_size_bytes",
+        "Response body sizes (streamed responses are not counted).",
+        ("view",),
+        SIZE_BUCKETS,
+    )
+)
+
+
+class RequestTimings:
+    """What one request spent its time on."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.phases = {}
+        self.queries = 0
+        self.cache = {}
+        self._active = set()
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def elapsed(self):
+        return perf_counter() - self.started
+
+
+_current = ContextVar("formsbuilder_request_timings", default=None)
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def measure_request():
+    """Collect ``RequestTimings`` for the code run in this context."""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in this context to the current request's ``phase``.
+
+    Nested uses of the same phase are counted once.
+    """
+    timings = _current.get()
+    if timings is None or phase in timings._active:
+        yield
+        return
+    timings._active.add(phase)
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, perf_counter() - start)
+        timings._active.discard(phase)
+
+
+def record_cache(name, hit):
+    """Count a lookup in cache ``name`` against the current request."""
+    timings = _current.get()
+    if timings is not None:
+        key = (name, "hit" if hit else "miss")
+        timings.cache[key] = timings.cache.get(key, 0) + 1
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.add("db", perf_counter() - start)
+
+
+def instrument_connection(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def instrument_connections():
+    """Install ``record_query`` on this thread's connections.
+
+    Connections opened later, in any thread, get it from the
+    ``connection_created`` signal.
+    """
+    for connection in connections.all():
+        instrument_connection(connection)
+
+
+connection_created.connect(instrument_connection)
+
+
+def record_request(timings, view, method, status, request_size, response_size):
+    duration = timings.elapsed()
+    REQUESTS.inc(view=view, method=method, status=status)
+    REQUEST_DURATION.observe(duration, view=view, method=method)
+    DB_QUERIES.observe(timings.queries, view=view)
+    for phase, seconds in timings.phases.items():
+        PHASE_DURATION.observe(seconds, view=view, phase=phase)
+    for (name, result), count in timings.cache.items():
+        CACHE_REQUESTS.inc(count, view=view, cache=name, result=result)
+    REQUEST_SIZE.observe(request_size, view=view)
+    if response_size is not None:
+        RESPONSE_SIZE.observe(response_size, view=view)
+    return duration
+
+
+def server_timing(timings, duration):
+    """The ``Server-Timing`` header value for a finished request."""
+    entries = [f"total;dur={duration * 1000:.2f}"]
+    for phase, seconds in timings.phases.items():
+        entry = f"{phase};dur={seconds * 1000:.2f}"
+        if phase == "db":
+            entry += f';desc="{timings.queries} queries"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+def render():
+    return registry.render()
+
+
+class TimedSerializerMixin:
+    """Count the time a serializer spends (de)serializing as ``serialize``."""
+
+    def to_representation(self, instance):
+        with timed("serialize"):
+            return super().to_representation(instance)
+
+    def run_validation(self, *args, **kwargs):
+        with timed("serialize"):
+            return super().run_validation(*args, **kwargs)
@@ -0,0 +1,70 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from formsbuilder.metrics import (
+    instrument_connections,
+    measure_request,
+    record_request,
+    server_timing,
+)
+
+
+def _route_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.url_name or match.view_name
+
+
+def _request_size(request):
+    try:
+        return int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return 0
+
+
+class RequestMetricsMiddleware:
+    """Record latency, queries, phases and sizes of every request.
+
+    See ``formsbuilder.metrics``. Put it first in ``MIDDLEWARE`` so the
+    latency covers the other middleware too. With
+    ``FORMSBUILDER_SERVER_TIMING`` the response also gets a
+    ``Server-Timing`` header breaking the time down by phase.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.FORMSBUILDER_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        instrument_connections()
+        with measure_request() as timings:
+            response = self.get_response(request)
+        return self._record(request, response, timings)
+
+    async def __acall__(self, request):
+        with measure_request() as timings:
+            response = await self.get_response(request)
+        return self._record(request, response, timings)
+
+    def _record(self, request, response, timings):
+        duration = record_request(
+            timings,
+            view=_route_name(request),
+            method=request.method,
+            status=response.status_code,
+            request_size=_request_size(request),
+            response_size=None if response.streaming else len(response.content),
+        )
+        if settings.FORMSBUILDER_SERVER_TIMING:
+            response["Server-Timing"] = server_timing(timings, duration)
+        return response
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formsbuilder", "0003_formfield_conditional_logic"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="formsubmission",
+            index=models.Index(
+                fields=["form_template", "submitted_at", "id"],
+                name="formsub_template_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="formsubmission",
+            index=models.Index(fields=["submitted_at", "id"], name="formsub_time_idx"),
+        ),
+    ]
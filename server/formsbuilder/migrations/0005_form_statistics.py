@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+
+def seed_statistics(apps, schema_editor):
+    """Count the existing forms and submissions, so writers find their rows."""
+    FormTemplate = apps.get_model("formsbuilder", "FormTemplate")
+    FormSubmission = apps.get_model("formsbuilder", "FormSubmission")
+    FormStatistics = apps.get_model("formsbuilder", "FormStatistics")
+    FormTemplateStatistics = apps.get_model("formsbuilder", "FormTemplateStatistics")
+
+    per_template = {
+        row["form_template"]: row
+        for row in FormSubmission.objects.values("form_template").annotate(
+            count=Count("id"), last=Max("submitted_at")
+        )
+    }
+    FormTemplateStatistics.objects.bulk_create(
+        [
+            FormTemplateStatistics(
+                form_template_id=template_id,
+                submission_count=per_template.get(template_id, {}).get("count", 0),
+                last_submitted_at=per_template.get(template_id, {}).get("last"),
+            )
+            for template_id in FormTemplate.objects.values_list("pk", flat=True)
+        ],
+        batch_size=1000,
+    )
+    forms = FormTemplate.objects.aggregate(
+        total=Count("id"), active=Count("id", filter=Q(is_active=True))
+    )
+    FormStatistics.objects.create(
+        pk=1,
+        total_forms=forms["total"],
+        active_forms=forms["active"],
+        total_submissions=sum(row["count"] for row in per_template.values()),
+        reconciled_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formsbuilder", "0004_formsubmission_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FormStatistics",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total_forms", models.PositiveIntegerField(default=0)),
+                ("active_forms", models.PositiveIntegerField(default=0)),
+                ("total_submissions", models.PositiveBigIntegerField(default=0)),
+                ("reconciled_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "form statistics",
+            },
+        ),
+        migrations.CreateModel(
+            name="FormTemplateStatistics",
+            fields=[
+                (
+                    "form_template",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="statistics",
+                        serialize=False,
+                        to="formsbuilder.formtemplate",
+                    ),
+                ),
+                ("submission_count", models.PositiveBigIntegerField(default=0)),
+                ("last_submitted_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "form template statistics",
+            },
+        ),
+        migrations.RunPython(seed_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formsbuilder", "0005_form_statistics"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupCheckpoint",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("last_submission_id", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SubmissionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("hour", "Hourly"), ("day", "Daily")], max_length=4
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField()),
+                ("submission_count", models.PositiveBigIntegerField(default=0)),
+                (
+                    "form_template",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="formsbuilder.formtemplate",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["bucket_start"],
+            },
+        ),
+        migrations.CreateModel(
+            name="FieldRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("field_name", models.CharField(max_length=100)),
+                ("option_counts", models.JSONField(blank=True, default=dict)),
+                ("value_count", models.PositiveBigIntegerField(default=0)),
+                ("value_sum", models.FloatField(default=0)),
+                ("value_min", models.FloatField(blank=True, null=True)),
+                ("value_max", models.FloatField(blank=True, null=True)),
+                (
+                    "rollup",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="field_rollups",
+                        to="formsbuilder.submissionrollup",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="submissionrollup",
+            constraint=models.UniqueConstraint(
+                fields=("form_template", "granularity", "bucket_start"),
+                name="formrollup_bucket_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="fieldrollup",
+            constraint=models.UniqueConstraint(
+                fields=("rollup", "field_name"), name="fieldrollup_field_uniq"
+            ),
+        ),
+    ]
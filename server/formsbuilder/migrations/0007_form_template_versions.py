@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formsbuilder", "0006_submission_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FormTemplateVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveIntegerField()),
+                ("digest", models.CharField(max_length=64)),
+                ("schema", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "form_template",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="versions",
+                        to="formsbuilder.formtemplate",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["form_template", "number"],
+            },
+        ),
+        migrations.AddField(
+            model_name="formsubmission",
+            name="template_version",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="submissions",
+                to="formsbuilder.formtemplateversion",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="formtemplateversion",
+            constraint=models.UniqueConstraint(
+                fields=("form_template", "number"), name="formversion_number_uniq"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="formtemplateversion",
+            constraint=models.UniqueConstraint(
+                fields=("form_template", "digest"), name="formversion_digest_uniq"
+            ),
+        ),
+    ]
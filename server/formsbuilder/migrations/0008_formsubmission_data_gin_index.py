@@ -0,0 +1,34 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.db import migrations
+
+INDEX = GinIndex(fields=["submission_data"], name="formsub_data_gin_idx")
+
+
+def add_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    FormSubmission = apps.get_model("formsbuilder", "FormSubmission")
+    schema_editor.add_index(FormSubmission, INDEX, concurrently=True)
+
+
+def remove_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    FormSubmission = apps.get_model("formsbuilder", "FormSubmission")
+    schema_editor.remove_index(FormSubmission, INDEX, concurrently=True)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("formsbuilder", "0007_form_template_versions"),
+    ]
+
+    # PostgreSQL only, so the index is not part of the model state; the
+    # submission filters (formsbuilder.filters) rely on it for ``@>`` and
+    # ``?`` lookups.
+    operations = [
+        migrations.RunPython(add_gin_index, remove_gin_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formsbuilder", "0009_formsubmission_provisional_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="formtemplate",
+            name="rate_limits",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
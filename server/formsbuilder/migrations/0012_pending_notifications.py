@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formsbuilder", "0011_idempotency_keys"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingNotification",
+            fields=[
+                (
+                    "form_template",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="pending_notification",
+                        serialize=False,
+                        to="formsbuilder.formtemplate",
+                    ),
+                ),
+                ("submission_count", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
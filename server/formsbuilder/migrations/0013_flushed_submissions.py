@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:10
+
+from django.db import migrations, models
+
+
+def record_flushed_submissions(apps, schema_editor):
+    FormSubmission = apps.get_model("formsbuilder", "FormSubmission")
+    FlushedSubmission = apps.get_model("formsbuilder", "FlushedSubmission")
+    provisional_ids = (
+        FormSubmission.objects.filter(provisional_id__isnull=False)
+        .values_list("provisional_id", flat=True)
+        .distinct()
+        .iterator()
+    )
+    FlushedSubmission.objects.bulk_create(
+        (FlushedSubmission(provisional_id=pk) for pk in provisional_ids),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("formsbuilder", "0012_pending_notifications"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlushedSubmission",
+            fields=[
+                ("provisional_id", models.UUIDField(primary_key=True, serialize=False)),
+                ("flushed_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.RunPython(record_flushed_submissions, migrations.RunPython.noop),
+    ]
@@ -18,6 +18,9 @@ class FormTemplate(models.Model):
     category = models.CharField(
         max_length=100, blank=True, help_text="Optional category for organizing forms"
     )
+    # Per-scope overrides of the submission rate limits, e.g.
+    # {"ip": "5/min", "form": None} (see formsbuilder.ratelimits).
+    rate_limits = models.JSONField(default=dict, blank=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -71,19 +74,122 @@ class FormField(models.Model):
         return f"{self.form_template.name} - {self.label}"
 
 
+class FormTemplateVersion(models.Model):
+    """Immutable snapshot of a template's fields, as submissions saw them.
+
+    ``schema`` holds the serialized field specs that ``formsbuilder.schema``
+    compiles into a ``FormSchema``; ``digest`` identifies their content, so
+    an unchanged schema is never frozen twice.
+    """
+
+    form_template = models.ForeignKey(
+        FormTemplate, on_delete=models.CASCADE, related_name="versions"
+    )
+    number = models.PositiveIntegerField()
+    digest = models.CharField(max_length=64)
+    schema = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["form_template", "number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["form_template", "number"], name="formversion_number_uniq"
+            ),
+            models.UniqueConstraint(
+                fields=["form_template", "digest"], name="formversion_digest_uniq"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Form template versions are immutable.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.form_template_id} v{self.number}"
+
+
 class FormSubmission(models.Model):
     form_template = models.ForeignKey(FormTemplate, on_delete=models.CASCADE)
+    # DO_NOTHING: versions are only ever deleted together with their template,
+    # whose submissions go first, and any other handler would make Django
+    # load every submission of a template before deleting it.
+    template_version = models.ForeignKey(
+        FormTemplateVersion,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name="submissions",
+    )
     submitted_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True
     )
     submission_data = models.JSONField()
     submitted_at = models.DateTimeField(auto_now_add=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
+    # Returned to the client when the submission was buffered instead of
+    # written (see formsbuilder.writebehind); also makes the flush idempotent.
+    provisional_id = models.UUIDField(
+        null=True, blank=True, editable=False, db_index=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["form_template", "submitted_at", "id"],
+                name="formsub_template_time_idx",
+            ),
+            models.Index(fields=["submitted_at", "id"], name="formsub_time_idx"),
+        ]
 
     def __str__(self):
         return f"{self.form_template.name} - {self.submitted_at}"
 
 
+class IdempotencyKey(models.Model):
+    """A client's ``Idempotency-Key`` for a form and the response it got.
+
+    Kept apart from ``FormSubmission``, whose partitioned table cannot carry
+    a unique constraint without its partition key (see
+    ``formsbuilder.idempotency``).
+    """
+
+    form_template = models.ForeignKey(
+        FormTemplate, on_delete=models.CASCADE, related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=255)
+    request_digest = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["form_template", "key"], name="idempotency_key_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.form_template_id} - {self.key}"
+
+
+class FlushedSubmission(models.Model):
+    """The provisional id of a buffered submission that has been written.
+
+    Its primary key makes the write-behind flush write each submission once
+    even when two flushers race; ``FormSubmission.provisional_id`` cannot be
+    unique on the partitioned table (see ``formsbuilder.writebehind``).
+    """
+
+    provisional_id = models.UUIDField(primary_key=True)
+    flushed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return str(self.provisional_id)
+
+
 class FormFieldOption(models.Model):
     """For select, radio, checkbox options"""
 
@@ -104,3 +210,126 @@ class FormFieldOption(models.Model):
             else "No Field"
         )
         return f"{field_label} - {self.label}"
+
+
+class FormStatistics(models.Model):
+    """Site-wide counters, kept in a single row and updated incrementally."""
+
+    SINGLETON_ID = 1
+
+    total_forms = models.PositiveIntegerField(default=0)
+    active_forms = models.PositiveIntegerField(default=0)
+    total_submissions = models.PositiveBigIntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "form statistics"
+
+    def __str__(self):
+        return (
+            f"{self.total_forms} forms, {self.active_forms} active, "
+            f"{self.total_submissions} submissions"
+        )
+
+
+class FormTemplateStatistics(models.Model):
+    """Per-template submission counters, updated incrementally."""
+
+    form_template = models.OneToOneField(
+        FormTemplate,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="statistics",
+    )
+    submission_count = models.PositiveBigIntegerField(default=0)
+    last_submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "form template statistics"
+
+    def __str__(self):
+        return f"{self.form_template_id} - {self.submission_count} submissions"
+
+
+class PendingNotification(models.Model):
+    """Submissions of a template not yet reported in a notification digest."""
+
+    form_template = models.OneToOneField(
+        FormTemplate,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="pending_notification",
+    )
+    submission_count = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.form_template_id} - {self.submission_count} pending"
+
+
+class SubmissionRollup(models.Model):
+    """Submissions of a template within one hour or one (UTC) day."""
+
+    HOUR = "hour"
+    DAY = "day"
+    GRANULARITIES = [(HOUR, "Hourly"), (DAY, "Daily")]
+
+    form_template = models.ForeignKey(
+        FormTemplate, on_delete=models.CASCADE, related_name="rollups"
+    )
+    granularity = models.CharField(max_length=4, choices=GRANULARITIES)
+    bucket_start = models.DateTimeField()
+    submission_count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["bucket_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["form_template", "granularity", "bucket_start"],
+                name="formrollup_bucket_uniq",
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.form_template_id} {self.granularity} "
+            f"{self.bucket_start:%Y-%m-%d %H:%M} - {self.submission_count}"
+        )
+
+
+class FieldRollup(models.Model):
+    """Aggregated values of one field within a ``SubmissionRollup`` bucket.
+
+    Choice fields fill ``option_counts``; number fields fill the
+    ``value_*`` columns.
+    """
+
+    rollup = models.ForeignKey(
+        SubmissionRollup, on_delete=models.CASCADE, related_name="field_rollups"
+    )
+    field_name = models.CharField(max_length=100)
+    option_counts = models.JSONField(default=dict, blank=True)
+    value_count = models.PositiveBigIntegerField(default=0)
+    value_sum = models.FloatField(default=0)
+    value_min = models.FloatField(null=True, blank=True)
+    value_max = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["rollup", "field_name"], name="fieldrollup_field_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.rollup_id} - {self.field_name}"
+
+
+class RollupCheckpoint(models.Model):
+    """High-water mark of the submissions already folded into rollups."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    last_submission_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_submission_id}"
@@ -1,5 +1,16 @@
 from django.conf import settings
-from django.core.mail import send_mail
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from formsbuilder.models import FormTemplate, PendingNotification
+
+User = get_user_model()
+
+CACHE_PREFIX = "formsbuilder:notifications"
+RECIPIENTS_KEY = f"{CACHE_PREFIX}:recipients"
 
 
 def send_notification(recipient_list, subject, message):
@@ -9,3 +20,100 @@ def send_notification(recipient_list, subject, message):
         settings.DEFAULT_FROM_EMAIL,
         recipient_list,
     )
+
+
+def get_notification_recipients():
+    """Email addresses that receive submission digests, cached between batches."""
+    recipients = cache.get(RECIPIENTS_KEY)
+    if recipients is None:
+        recipients = list(
+            User.objects.filter(is_superuser=True, is_active=True)
+            .exclude(email="")
+            .order_by("email")
+            .values_list("email", flat=True)
+            .distinct()
+        )
+        cache.set(
+            RECIPIENTS_KEY,
+            recipients,
+            settings.FORMSBUILDER_NOTIFICATION_RECIPIENTS_TIMEOUT,
+        )
+    return recipients
+
+
+def invalidate_notification_recipients():
+    cache.delete(RECIPIENTS_KEY)
+
+
+def _increment_pending(template_id, count):
+    return PendingNotification.objects.filter(pk=template_id).update(
+        submission_count=F("submission_count") + count
+    )
+
+
+def add_pending_submissions(template_id, count):
+    """Count ``count`` submissions for the next digest.
+
+    The counts live in the database rather than the cache, so every worker
+    process sees them and they cannot be evicted before the digest is sent.
+    """
+    if not count or _increment_pending(template_id, count):
+        return
+    try:
+        with transaction.atomic():
+            PendingNotification.objects.create(
+                form_template_id=template_id, submission_count=count
+            )
+    except IntegrityError:
+        # Created concurrently; a deleted template is simply not counted.
+        _increment_pending(template_id, count)
+
+
+def pop_pending_submissions():
+    """Return and clear the pending ``{template_id: submission count}``."""
+    with transaction.atomic():
+        pending = dict(
+            PendingNotification.objects.select_for_update().values_list(
+                "form_template_id", "submission_count"
+            )
+        )
+        PendingNotification.objects.filter(pk__in=pending).delete()
+    return pending
+
+
+def build_digest_message(pending, template_names):
+    total = sum(pending.values())
+    lines = [
+        f"{total} new form submission{'s' if total != 1 else ''} received:",
+        "",
+    ]
+    for template_id, count in sorted(pending.items()):
+        name = template_names.get(template_id, f"Form #{template_id}")
+        lines.append(f"- {name}: {count}")
+    return "\n".join(lines)
+
+
+def send_submission_digest(pending, recipients):
+    """Send one digest per recipient over a single SMTP connection.
+
+    Returns the number of messages sent.
+    """
+    if not pending or not recipients:
+        return 0
+
+    template_names = dict(
+        FormTemplate.objects.filter(pk__in=pending.keys()).values_list("pk", "name")
+    )
+    body = build_digest_message(pending, template_names)
+    connection = get_connection()
+    messages = [
+        EmailMessage(
+            subject="Form Submissions",
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[recipient],
+            connection=connection,
+        )
+        for recipient in recipients
+    ]
+    return connection.send_messages(messages) or 0
@@ -0,0 +1,109 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class SubmissionCursorPagination(CursorPagination):
+    """Keyset pagination over submissions, newest first.
+
+    The cursor holds the ``(submitted_at, id)`` of the last row served, and
+    the next page is fetched with ``WHERE submitted_at <= t AND (submitted_at
+    < t OR id < i) ORDER BY submitted_at DESC, id DESC LIMIT n``, a range
+    scan of the ``(form_template, submitted_at, id)`` index. That position
+    is unique, so no OFFSET is ever needed to step over timestamp ties and
+    a deep page costs the same as the first one.
+
+    Page sizes are read from the settings for every request.
+    """
+
+    ordering = ("-submitted_at", "-id")
+    page_size_query_param = "page_size"
+
+    def __init__(self):
+        self.page_size = settings.FORMSBUILDER_SUBMISSIONS_PAGE_SIZE
+        self.max_page_size = settings.FORMSBUILDER_SUBMISSIONS_MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        # The keyset is fixed; ordering filters cannot change it.
+        return self.ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            submitted_at, pk = instance["submitted_at"], instance["id"]
+        else:
+            submitted_at, pk = instance.submitted_at, instance.pk
+        return f"{submitted_at.isoformat()}|{pk}"
+
+    def _keyset(self, position, reverse):
+        """Rows after ``position`` in the page order (before it if ``reverse``)."""
+        try:
+            submitted_at, pk = position.rsplit("|", 1)
+            submitted_at, pk = datetime.fromisoformat(submitted_at), int(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if reverse:
+            return Q(submitted_at__gte=submitted_at) & (
+                Q(submitted_at__gt=submitted_at) | Q(id__gt=pk)
+            )
+        return Q(submitted_at__lte=submitted_at) & (
+            Q(submitted_at__lt=submitted_at) | Q(id__lt=pk)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # CursorPagination.paginate_queryset, with the position filter on
+        # both columns; positions are unique, so the offset stays 0.
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by("submitted_at", "id")
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self._keyset(current_position, reverse))
+
+        results = list(queryset[offset : offset + self.page_size + 1])
+        self.page = results[: self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
@@ -0,0 +1,44 @@
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from formsbuilder.fastjson import loads
+
+
+class FastJSONParser(JSONParser):
+    """``JSONParser`` through ``formsbuilder.fastjson`` (orjson when installed)."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name != "utf-8" or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}") from exc
+
+
+class NDJSONParser(BaseParser):
+    """Parses newline-delimited JSON into a list, one item per non-blank line."""
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        items = []
+        for line_number, line in enumerate(
+            stream.read().decode(encoding).splitlines(), start=1
+        ):
+            if not line.strip():
+                continue
+            try:
+                items.append(loads(line.encode()))
+            except ValueError as exc:
+                raise ParseError(
+                    f"NDJSON parse error on line {line_number} - {exc}"
+                ) from exc
+        return items
@@ -0,0 +1,332 @@
+"""Monthly range partitioning and archival of the submissions table.
+
+PostgreSQL only. ``convert_to_partitioned`` turns ``FormSubmission``'s
+table into a table partitioned by range on ``submitted_at`` with one
+partition per (UTC) month, plus a default partition that catches anything
+outside the created ranges. Django keeps using it as before: queries that
+filter on ``submitted_at`` only touch the matching partitions, and vacuum,
+index maintenance and backups work month by month.
+
+``ensure_partitions`` creates the coming months ahead of time (run by
+Celery beat). ``archive_partitions`` writes cold months to gzipped NDJSON
+files, one per month, and then detaches them; ``rehydrate_partition`` loads
+such a file back as an attached partition. Statistics counters describe
+the live table; they are reconciled after an archive or a rehydrate.
+"""
+
+import gzip
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone as django_timezone
+
+from formsbuilder.models import FormSubmission
+from formsbuilder.statistics import reconcile_statistics
+
+ARCHIVE_SUFFIX = ".ndjson.gz"
+ROWS_PER_FETCH = 2000
+ROWS_PER_INSERT = 1000
+
+
+class PartitioningError(Exception):
+    """The submissions table is not in the state an operation needs."""
+
+
+def _table():
+    return FormSubmission._meta.db_table
+
+
+def month_start(moment):
+    """The first instant of ``moment``'s UTC month."""
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month):
+    return f"{_table()}_p{month:%Y%m}"
+
+
+def partition_month(name):
+    """Inverse of ``partition_name`` (also accepts archive file names)."""
+    match = re.search(r"_p(\d{4})(\d{2})(?:\.ndjson\.gz)?$", name)
+    if match is None:
+        raise PartitioningError(f"Not a monthly partition name: {name}")
+    year, month = (int(group) for group in match.groups())
+    return datetime(year, month, 1, tzinfo=timezone.utc)
+
+
+def _require_postgresql():
+    if connection.vendor != "postgresql":
+        raise PartitioningError("Partitioning requires PostgreSQL.")
+
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid))",
+            [_table()],
+        )
+        return cursor.fetchone()[0]
+
+
+def list_partitions():
+    """``[(name, start, end)]`` of the attached monthly partitions, oldest first."""
+    _require_postgresql()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [_table()],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        try:
+            month = partition_month(name)
+        except PartitioningError:
+            continue  # the default partition
+        partitions.append((name, month, add_months(month, 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def _create_partition(cursor, month):
+    quote = connection.ops.quote_name
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {quote(partition_name(month))} "
+        f"PARTITION OF {quote(_table())} FOR VALUES FROM (%s) TO (%s)",
+        [month, add_months(month, 1)],
+    )
+
+
+def ensure_partitions(months_ahead=None):
+    """Create the partitions of this month and the next ``months_ahead``.
+
+    Returns the names of the partitions that did not exist yet; does
+    nothing unless the table is partitioned.
+    """
+    if not is_partitioned():
+        return []
+    if months_ahead is None:
+        months_ahead = settings.FORMSBUILDER_PARTITION_MONTHS_AHEAD
+    existing = {name for name, _, _ in list_partitions()}
+    current = month_start(django_timezone.now())
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if partition_name(month) not in existing:
+                _create_partition(cursor, month)
+                created.append(partition_name(month))
+    return created
+
+
+def _field_constraint_sql(table):
+    """Foreign keys and single-column indexes declared on the fields."""
+    quote = connection.ops.quote_name
+    statements = []
+    for field in FormSubmission._meta.concrete_fields:
+        if field.is_relation and field.db_constraint:
+            target = field.target_field
+            statements.append(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT "
+                f"{quote(f'{table}_{field.column}_fk')} FOREIGN KEY "
+                f"({quote(field.column)}) REFERENCES "
+                f"{quote(target.model._meta.db_table)} ({quote(target.column)}) "
+                "DEFERRABLE INITIALLY DEFERRED"
+            )
+        elif not field.db_index or field.primary_key:
+            continue
+        statements.append(
+            f"CREATE INDEX {quote(f'{table}_{field.column}_idx')} "
+            f"ON {quote(table)} ({quote(field.column)})"
+        )
+    return statements
+
+
+@transaction.atomic
+def convert_to_partitioned(months_ahead=None):
+    """Rebuild the submissions table as a monthly partitioned table.
+
+    Copies every row, so it holds an exclusive lock on the table for the
+    whole run: schedule it in a maintenance window. The per-field indexes
+    of ``formsbuilder.filters`` are dropped with the old table and must be
+    synced again. Returns the names of the partitions created.
+    """
+    _require_postgresql()
+    if is_partitioned():
+        raise PartitioningError("The submissions table is already partitioned.")
+    if months_ahead is None:
+        months_ahead = settings.FORMSBUILDER_PARTITION_MONTHS_AHEAD
+
+    quote = connection.ops.quote_name
+    table = _table()
+    legacy = f"{table}_unpartitioned"
+    sequence = f"{table}_partitioned_id_seq"
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {quote(table)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"SELECT min(submitted_at), max(id) FROM {quote(table)}")
+        first_submitted_at, max_id = cursor.fetchone()
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(legacy)}")
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(legacy)} "
+            "INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS) "
+            "PARTITION BY RANGE (submitted_at)"
+        )
+        cursor.execute(f"CREATE SEQUENCE {quote(sequence)} AS bigint")
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ALTER COLUMN id "
+            f"SET DEFAULT nextval('{sequence}')"
+        )
+        cursor.execute(f"ALTER SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.id")
+        cursor.execute("SELECT setval(%s, %s, false)", [sequence, (max_id or 0) + 1])
+
+        current = month_start(django_timezone.now())
+        month = month_start(first_submitted_at) if first_submitted_at else current
+        created = []
+        while month <= add_months(current, months_ahead):
+            _create_partition(cursor, month)
+            created.append(partition_name(month))
+            month = add_months(month, 1)
+        cursor.execute(
+            f"CREATE TABLE {quote(table + '_default')} "
+            f"PARTITION OF {quote(table)} DEFAULT"
+        )
+
+        cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(legacy)}")
+        cursor.execute(f"DROP TABLE {quote(legacy)}")
+
+        # The primary key of a partitioned table must include the partition
+        # key; ids stay unique because they all come from one sequence.
+        cursor.execute(f"ALTER TABLE {quote(table)} ADD PRIMARY KEY (id, submitted_at)")
+
+        for statement in _field_constraint_sql(table):
+            cursor.execute(statement)
+    with connection.schema_editor(atomic=False) as schema_editor:
+        for index in FormSubmission._meta.indexes:
+            schema_editor.add_index(FormSubmission, index)
+        schema_editor.execute(
+            f"CREATE INDEX formsub_data_gin_idx ON {quote(table)} "
+            "USING gin (submission_data)"
+        )
+    return created
+
+
+def _write_archive(name, path):
+    quote = connection.ops.quote_name
+    partial_path = path.with_name(path.name + ".partial")
+    with open(partial_path, "wb") as raw:
+        with gzip.open(raw, "wt", encoding="utf-8") as archive:
+            with connection.chunked_cursor() as cursor:
+                cursor.execute(
+                    f"SELECT row_to_json(p)::text FROM {quote(name)} p ORDER BY id"
+                )
+                while rows := cursor.fetchmany(ROWS_PER_FETCH):
+                    archive.writelines(row[0] + "\n" for row in rows)
+        raw.flush()
+        os.fsync(raw.fileno())
+    partial_path.rename(path)
+
+
+def archive_partitions(before, directory=None):
+    """Archive, detach and drop every partition that ends by ``before``.
+
+    Each month is archived in its own transaction, while it is still
+    attached: only writes to that month wait meanwhile. The parent table is
+    locked just for the detach and drop at the end, once the file is
+    complete. Returns the archive paths.
+    """
+    _require_postgresql()
+    if not is_partitioned():
+        raise PartitioningError("The submissions table is not partitioned.")
+    directory = Path(directory or settings.FORMSBUILDER_ARCHIVE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    quote = connection.ops.quote_name
+
+    archived = []
+    for name, _, end in list_partitions():
+        if end > before:
+            continue
+        path = directory / f"{name}{ARCHIVE_SUFFIX}"
+        if path.exists():
+            raise PartitioningError(f"{path} already exists.")
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LOCK TABLE {quote(name)} IN SHARE MODE")
+                _write_archive(name, path)
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"ALTER TABLE {quote(_table())} DETACH PARTITION {quote(name)}"
+                    )
+                    cursor.execute(f"DROP TABLE {quote(name)}")
+        except Exception:
+            # The month is still attached; let the next run archive it again.
+            path.unlink(missing_ok=True)
+            raise
+        archived.append(path)
+    if archived:
+        reconcile_statistics()
+    return archived
+
+
+def rehydrate_partition(path):
+    """Load an archive written by ``archive_partitions`` back as a partition.
+
+    Returns the number of submissions restored.
+    """
+    _require_postgresql()
+    if not is_partitioned():
+        raise PartitioningError("The submissions table is not partitioned.")
+    path = Path(path)
+    month = partition_month(path.name)
+    name = partition_name(month)
+    if name in {partition[0] for partition in list_partitions()}:
+        raise PartitioningError(f"Partition {name} is already attached.")
+    quote = connection.ops.quote_name
+    table = _table()
+
+    restored = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS)"
+        )
+        insert = (
+            f"INSERT INTO {quote(name)} SELECT * FROM "
+            f"json_populate_recordset(NULL::{quote(table)}, %s::json)"
+        )
+        batch = []
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            for line in archive:
+                if line.strip():
+                    batch.append(json.loads(line))
+                if len(batch) == ROWS_PER_INSERT:
+                    cursor.execute(insert, [json.dumps(batch)])
+                    restored += len(batch)
+                    batch = []
+        if batch:
+            cursor.execute(insert, [json.dumps(batch)])
+            restored += len(batch)
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} "
+            "FOR VALUES FROM (%s) TO (%s)",
+            [month, add_months(month, 1)],
+        )
+    reconcile_statistics()
+    return restored
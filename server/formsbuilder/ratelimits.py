@@ -0,0 +1,222 @@
+"""Token-bucket rate limits for the public submit endpoints.
+
+Every submission to a form takes one token from up to three buckets:
+
+* ``ip``: the client's ``REMOTE_ADDR`` on that form;
+* ``user``: the authenticated user on that form (anonymous requests skip it);
+* ``form``: the form as a whole, shared by every client.
+
+Batches draw from buckets of their own, ``batch_ip``, ``batch_user`` and
+``batch_form``, one token per item. Their rates come from
+``FORMSBUILDER_BATCH_RATE_*``, sized for syncing hundreds of buffered
+submissions at once rather than for one person filling in a form.
+
+A rate such as ``"30/min"`` is a bucket of 30 tokens refilled at 30 per
+minute, so bursts up to the bucket size are allowed and the sustained rate
+is the refill rate. The defaults come from ``FORMSBUILDER_SUBMIT_RATE_*``;
+a template's ``rate_limits`` overrides them per scope, with ``None``
+turning a scope off for that form. They travel in the cached schema, so a
+request over its limit is rejected without a database query.
+
+Buckets are kept in the Django cache as the time the bucket will be full
+again (the "theoretical arrival time" of the generic cell rate algorithm),
+and updated with ``add``/``incr``/``decr`` only. Those are atomic on Redis,
+Memcached and the local-memory cache, so concurrent requests can never
+overdraw a bucket; with the local-memory cache the limits are per process.
+"""
+
+import math
+import re
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+from formsbuilder.metrics import RATE_LIMITED
+
+CACHE_PREFIX = "formsbuilder:ratelimit"
+
+IP = "ip"
+USER = "user"
+FORM = "form"
+# The shared bucket comes last, so requests a client's own bucket refuses
+# cannot drain it for everybody else.
+SCOPES = (IP, USER, FORM)
+BATCH_PREFIX = "batch_"
+BATCH_SCOPES = tuple(BATCH_PREFIX + scope for scope in SCOPES)
+ALL_SCOPES = SCOPES + BATCH_SCOPES
+
+PERIODS = {
+    "s": 1,
+    "sec": 1,
+    "m": 60,
+    "min": 60,
+    "h": 60 * 60,
+    "hour": 60 * 60,
+    "d": 24 * 60 * 60,
+    "day": 24 * 60 * 60,
+}
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*([a-z]+)\s*$")
+
+
+class Rate:
+    """``capacity`` tokens, refilled at ``capacity`` per ``period`` seconds."""
+
+    __slots__ = ("capacity", "period", "interval", "tolerance")
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.period = period
+        # Milliseconds per token, and the most a full bucket holds.
+        self.interval = max(1, period * 1000 // capacity)
+        self.tolerance = self.interval * capacity
+
+    def __repr__(self):
+        return f"<Rate {self.capacity}/{self.period}s>"
+
+
+@lru_cache(maxsize=256)
+def parse_rate(rate):
+    """Parse ``"<number>/<s|sec|m|min|h|hour|d|day>"``; raises ``ValueError``."""
+    match = _RATE.match(rate)
+    if match is None or match.group(2) not in PERIODS or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid rate {rate!r}; expected e.g. '30/min'")
+    return Rate(int(match.group(1)), PERIODS[match.group(2)])
+
+
+def rate_limit_errors(rate_limits):
+    """Describe what is wrong with a template's ``rate_limits``, by scope."""
+    if not isinstance(rate_limits, dict):
+        return {"non_field_errors": "Must be an object."}
+    errors = {}
+    for scope, rate in rate_limits.items():
+        if scope not in ALL_SCOPES:
+            errors[scope] = f"Unknown scope; expected one of {', '.join(ALL_SCOPES)}."
+        elif rate is not None:
+            try:
+                parse_rate(rate)
+            except (TypeError, ValueError):
+                errors[scope] = "Must be a rate such as '30/min', or null."
+    return errors
+
+
+def rate_limits_enabled():
+    return settings.FORMSBUILDER_RATE_LIMITS_ENABLED
+
+
+def default_rates():
+    return {
+        IP: settings.FORMSBUILDER_SUBMIT_RATE_IP,
+        USER: settings.FORMSBUILDER_SUBMIT_RATE_USER,
+        FORM: settings.FORMSBUILDER_SUBMIT_RATE_FORM,
+        BATCH_PREFIX + IP: settings.FORMSBUILDER_BATCH_RATE_IP,
+        BATCH_PREFIX + USER: settings.FORMSBUILDER_BATCH_RATE_USER,
+        BATCH_PREFIX + FORM: settings.FORMSBUILDER_BATCH_RATE_FORM,
+    }
+
+
+def _buckets(schema, ip_address, user_id, batch=False):
+    """``(scope, cache key, Rate)`` for every bucket a submission draws from."""
+    rates = default_rates()
+    rates.update(schema.rate_limits)
+    idents = {IP: ip_address, USER: user_id, FORM: ""}
+    prefix = BATCH_PREFIX if batch else ""
+    for scope in SCOPES:
+        name = prefix + scope
+        if not rates.get(name) or idents[scope] is None:
+            continue
+        key = f"{CACHE_PREFIX}:{name}:{schema.template_id}:{idents[scope]}"
+        yield name, key, parse_rate(rates[name])
+
+
+def _now():
+    return int(time.time() * 1000)
+
+
+def _timeout(rate):
+    return math.ceil(rate.tolerance / 1000) + 1
+
+
+def _take(key, rate, now, cost=1):
+    """Take ``cost`` tokens; returns ``None``, or the seconds until they are."""
+    increment = rate.interval * cost
+    if increment > rate.tolerance:
+        # More than the bucket holds; callers keep batches within capacity.
+        return rate.period
+    if cache.add(key, now + increment, _timeout(rate)):
+        return None
+    try:
+        arrival = cache.incr(key, increment)
+    except ValueError:  # expired since the add
+        cache.set(key, now + increment, _timeout(rate))
+        return None
+    if arrival - increment < now:
+        # The bucket had refilled completely: start over from now.
+        cache.set(key, now + increment, _timeout(rate))
+        return None
+    if arrival - now <= rate.tolerance:
+        return None
+    cache.decr(key, increment)
+    # Keep an abusive client's bucket from expiring into a full one.
+    cache.touch(key, _timeout(rate) + math.ceil((arrival - now) / 1000))
+    return (arrival - rate.tolerance - now) / 1000
+
+
+async def _atake(key, rate, now, cost=1):
+    increment = rate.interval * cost
+    if increment > rate.tolerance:
+        return rate.period
+    if await cache.aadd(key, now + increment, _timeout(rate)):
+        return None
+    try:
+        arrival = await cache.aincr(key, increment)
+    except ValueError:
+        await cache.aset(key, now + increment, _timeout(rate))
+        return None
+    if arrival - increment < now:
+        await cache.aset(key, now + increment, _timeout(rate))
+        return None
+    if arrival - now <= rate.tolerance:
+        return None
+    await cache.adecr(key, increment)
+    await cache.atouch(key, _timeout(rate) + math.ceil((arrival - now) / 1000))
+    return (arrival - rate.tolerance - now) / 1000
+
+
+def batch_capacity(schema, ip_address, user_id):
+    """The most items one batch may carry, ``None`` when unlimited."""
+    if not rate_limits_enabled():
+        return None
+    buckets = _buckets(schema, ip_address, user_id, batch=True)
+    return min((rate.capacity for _, _, rate in buckets), default=None)
+
+
+def check_submission_rate(schema, ip_address, user_id, cost=1, batch=False):
+    """Charge ``cost`` submissions to their buckets, the batch ones if ``batch``.
+
+    Returns ``None`` when they are allowed, or the seconds to wait before
+    retrying.
+    """
+    if not rate_limits_enabled():
+        return None
+    now = _now()
+    for scope, key, rate in _buckets(schema, ip_address, user_id, batch):
+        wait = _take(key, rate, now, cost)
+        if wait is not None:
+            RATE_LIMITED.inc(scope=scope)
+            return wait
+    return None
+
+
+async def acheck_submission_rate(schema, ip_address, user_id, cost=1):
+    """Async ``check_submission_rate`` for ASGI views."""
+    if not rate_limits_enabled():
+        return None
+    now = _now()
+    for scope, key, rate in _buckets(schema, ip_address, user_id):
+        wait = await _atake(key, rate, now, cost)
+        if wait is not None:
+            RATE_LIMITED.inc(scope=scope)
+            return wait
+    return None
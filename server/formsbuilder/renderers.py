@@ -0,0 +1,95 @@
+"""The API's JSON renderer, and streaming of long list responses.
+
+``FastJSONRenderer`` renders through ``formsbuilder.fastjson`` (orjson when
+installed). ``StreamingListMixin`` sends list responses longer than
+``FORMSBUILDER_JSON_STREAM_THRESHOLD`` items as a chunked stream of
+``FORMSBUILDER_JSON_STREAM_CHUNK_SIZE`` items at a time, so the first bytes
+go out before the whole body is encoded and no copy of the full body is
+ever held. The streamed bytes are the ones ``FastJSONRenderer`` would have
+produced.
+"""
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from formsbuilder.fastjson import dumps
+
+RESULTS = "results"
+
+
+class FastJSONRenderer(JSONRenderer):
+    def _is_default_format(self, accepted_media_type, renderer_context):
+        return (
+            self.compact
+            and not self.ensure_ascii
+            and self.strict
+            and not self.get_indent(accepted_media_type, renderer_context or {})
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # Indented (or otherwise customised) output is rare; DRF makes it.
+        if not self._is_default_format(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+def _list_items(data):
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and isinstance(data.get(RESULTS), list):
+        return data[RESULTS]
+    return None
+
+
+def _iter_list(items, chunk_size):
+    yield b"["
+    for start in range(0, len(items), chunk_size):
+        chunk = dumps(items[start : start + chunk_size])[1:-1]
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]"
+
+
+def iter_json(data, chunk_size):
+    """Encode a list, or a page of results, in chunks of ``chunk_size`` items."""
+    if isinstance(data, list):
+        yield from _iter_list(data, chunk_size)
+        return
+    for index, (key, value) in enumerate(data.items()):
+        yield (b"{" if index == 0 else b",") + dumps(key) + b":"
+        if key == RESULTS:
+            yield from _iter_list(value, chunk_size)
+        else:
+            yield dumps(value)
+    yield b"}"
+
+
+class StreamingListMixin:
+    """Stream long list responses rendered by ``FastJSONRenderer``."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (
+            not isinstance(response, Response)
+            or response.status_code != 200
+            or type(response.accepted_renderer) is not FastJSONRenderer
+            or not response.accepted_renderer._is_default_format(
+                response.accepted_media_type, response.renderer_context
+            )
+        ):
+            return response
+        items = _list_items(response.data)
+        if items is None or len(items) <= settings.FORMSBUILDER_JSON_STREAM_THRESHOLD:
+            return response
+
+        streaming = StreamingHttpResponse(
+            iter_json(response.data, settings.FORMSBUILDER_JSON_STREAM_CHUNK_SIZE),
+            content_type=response.accepted_media_type,
+        )
+        for header, value in response.items():
+            if header.lower() != "content-type":
+                streaming[header] = value
+        return streaming
@@ -0,0 +1,132 @@
+"""Routing of read-heavy requests to a read replica.
+
+When ``DATABASES`` has a ``replica`` alias, ``ReplicaRouter`` sends the
+reads made inside ``replica_reads()`` there; everything else, and every
+write, goes to ``default``. Views opt in per action with
+``ReplicaReadsMixin``. Reads stay on ``default`` inside a transaction, and
+code that caches what it reads (``formsbuilder.schema``) pins itself there
+with ``primary_reads()`` so replication lag can never be cached.
+
+Reads are sticky: for ``FORMSBUILDER_REPLICA_STICKY_SECONDS`` after a
+client's own successful write (per user, or per IP address when
+anonymous), its reads stay on the primary so it always sees that write.
+The marker lives in the Django cache, which every process must share (a
+shared backend such as Redis, see ``CACHES``): with the local-memory
+default, only the process that took the write keeps its reads on the
+primary.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_ALIAS = "replica"
+CACHE_PREFIX = "formsbuilder:replica:wrote"
+
+_replica_reads = ContextVar("formsbuilder_replica_reads", default=False)
+
+
+@contextmanager
+def _reads_from(replica):
+    token = _replica_reads.set(replica)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_reads():
+    """Let the reads made in this context use the replica."""
+    return _reads_from(True)
+
+
+def primary_reads():
+    """Keep the reads made in this context on ``default``."""
+    return _reads_from(False)
+
+
+def reading_from_replica():
+    return _replica_reads.get()
+
+
+def replica_configured():
+    return REPLICA_ALIAS in connections.settings
+
+
+def client_key(user, ip_address):
+    """Who a write is remembered for: the user, or the address if anonymous."""
+    if user is not None and user.is_authenticated:
+        return f"{CACHE_PREFIX}:user:{user.pk}"
+    return f"{CACHE_PREFIX}:ip:{ip_address}"
+
+
+def remember_write(client):
+    """Keep ``client``'s reads on the primary for the sticky window."""
+    if replica_configured():
+        cache.set(client, 1, settings.FORMSBUILDER_REPLICA_STICKY_SECONDS)
+
+
+async def aremember_write(client):
+    if replica_configured():
+        await cache.aset(client, 1, settings.FORMSBUILDER_REPLICA_STICKY_SECONDS)
+
+
+def wrote_recently(client):
+    return cache.get(client) is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            _replica_reads.get()
+            and replica_configured()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+class ReplicaReadsMixin:
+    """Serve the viewset actions in ``replica_actions`` from the replica.
+
+    Also remembers the client's successful writes, so its reads stick to
+    the primary for a while; use it on every viewset that writes.
+    """
+
+    replica_actions = frozenset()
+    _replica_token = None
+
+    def _client_key(self, request):
+        return client_key(request.user, request.META.get("REMOTE_ADDR"))
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # After authentication, so stickiness can be per user.
+        if (
+            self.action in self.replica_actions
+            and replica_configured()
+            and not wrote_recently(self._client_key(request))
+        ):
+            self._replica_token = _replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._replica_token is not None:
+            _replica_reads.reset(self._replica_token)
+            self._replica_token = None
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            remember_write(self._client_key(request))
+        return super().finalize_response(request, response, *args, **kwargs)
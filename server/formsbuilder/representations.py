@@ -0,0 +1,165 @@
+"""Read-only fast paths for the hot list and detail endpoints.
+
+``FormTemplateSerializer`` and ``FormSubmissionSerializer`` build every
+nested field through DRF's per-field machinery, from model instances. The
+functions here produce the same data (key for key, value for value) from
+plain ``.values()`` rows instead: a template costs three queries however
+many fields it has, with the options grouped under their fields in one pass,
+and no model instance or serializer is created per row.
+
+The views use them while ``FORMSBUILDER_FAST_SERIALIZERS`` is on (the
+default); turning it off falls back to the serializers. Writes always go
+through the serializers.
+"""
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.fields import DateTimeField
+from rest_framework.settings import api_settings
+
+from formsbuilder.metrics import timed
+from formsbuilder.models import FormField, FormFieldOption
+
+TEMPLATE_COLUMNS = (
+    "id",
+    "name",
+    "slug",
+    "description",
+    "is_active",
+    "created_by__username",
+    "created_at",
+    "updated_at",
+    "category",
+)
+FIELD_COLUMNS = (
+    "id",
+    "form_template_id",
+    "field_name",
+    "label",
+    "widget_type",
+    "placeholder",
+    "help_text",
+    "is_required",
+    "order",
+    "widget_config",
+    "validation_rules",
+    "conditional_logic",
+)
+SUBMISSION_COLUMNS = (
+    "id",
+    "form_template_id",
+    "template_version__number",
+    "submitted_by__username",
+    "submission_data",
+    "submitted_at",
+    "ip_address",
+)
+
+
+def fast_serializers_enabled():
+    return settings.FORMSBUILDER_FAST_SERIALIZERS
+
+
+def datetime_formatter():
+    """Format datetimes exactly like the serializers' ``DateTimeField``.
+
+    The field looks the current time zone up for every value; this looks it
+    up once, so make one formatter per response.
+    """
+    field_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+    field = DateTimeField(default_timezone=field_timezone)
+    output_format = api_settings.DATETIME_FORMAT
+    if field_timezone is None or str(output_format).lower() != ISO_8601:
+        return field.to_representation
+
+    def format_datetime(value):
+        if not value:
+            return None
+        if value.utcoffset() is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return format_datetime
+
+
+def _fields_by_template(template_ids):
+    options = {}
+    for field_id, option_id, value, label, order in (
+        FormFieldOption.objects.filter(form_field__form_template_id__in=template_ids)
+        .order_by("order", "id")
+        .values_list("form_field_id", "id", "value", "label", "order")
+    ):
+        options.setdefault(field_id, []).append(
+            {"id": option_id, "value": value, "label": label, "order": order}
+        )
+
+    fields = {}
+    for row in (
+        FormField.objects.filter(form_template_id__in=template_ids)
+        .order_by("order", "id")
+        .values(*FIELD_COLUMNS)
+    ):
+        template_id = row.pop("form_template_id")
+        row["options"] = options.get(row["id"], [])
+        fields.setdefault(template_id, []).append(row)
+    return fields
+
+
+def template_rows(templates):
+    """``templates`` as the rows ``represent_templates`` expects.
+
+    Still a queryset, so it can be paginated.
+    """
+    return templates.prefetch_related(None).values(*TEMPLATE_COLUMNS)
+
+
+def represent_templates(rows):
+    """``FormTemplateSerializer(many=True).data`` for ``template_rows``."""
+    fields = _fields_by_template([row["id"] for row in rows])
+    format_datetime = datetime_formatter()
+    with timed("serialize"):
+        return [
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "slug": row["slug"],
+                "description": row["description"],
+                "is_active": row["is_active"],
+                "created_by": row["created_by__username"],
+                "created_at": format_datetime(row["created_at"]),
+                "updated_at": format_datetime(row["updated_at"]),
+                "category": row["category"],
+                "fields": fields.get(row["id"], []),
+            }
+            for row in rows
+        ]
+
+
+def submission_rows(submissions):
+    """``submissions`` as the rows ``represent_submissions`` expects.
+
+    Still a queryset, so it can be paginated.
+    """
+    return submissions.values(*SUBMISSION_COLUMNS)
+
+
+def represent_submissions(rows):
+    """``FormSubmissionSerializer(many=True).data`` for ``submission_rows``."""
+    format_datetime = datetime_formatter()
+    with timed("serialize"):
+        return [
+            {
+                "id": row["id"],
+                "form_template": row["form_template_id"],
+                "template_version": row["template_version__number"],
+                "submitted_by": row["submitted_by__username"],
+                "submission_data": row["submission_data"],
+                "submitted_at": format_datetime(row["submitted_at"]),
+                "ip_address": row["ip_address"],
+            }
+            for row in rows
+        ]
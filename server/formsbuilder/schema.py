@@ -0,0 +1,456 @@
+"""Compiled form schemas for the submission hot path.
+
+A ``FormSchema`` is built once per template version and holds everything
+``submit_form`` needs: the ordered fields, the required-field set and the
+conditional-logic rules compiled by ``formsbuilder.conditions``.
+
+Schemas are cached at two levels:
+
+* the Django cache holds the lookup -> template id mapping, the current
+  version of every template and the raw (picklable) field specs, so all
+  processes share them. That needs a shared backend such as Redis; with
+  the per-process local-memory default, other processes only see an edit
+  once ``FORMSBUILDER_SCHEMA_CACHE_TIMEOUT`` has passed (see ``CACHES``);
+* a process-local LRU holds the compiled ``FormSchema`` objects, keyed by
+  ``(template id, version)`` so a stale entry can never be served once the
+  version moves on.
+
+Everything cached here is read from the primary database, never from a
+lagging replica (see ``formsbuilder.replicas``). The version is the
+template's ``updated_at``. Field and option changes bump
+it (see ``formsbuilder.signals``), which is what makes the version key safe
+across processes. Each spec also names the immutable ``FormTemplateVersion``
+its fields were frozen into (see ``formsbuilder.versions``).
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+from rest_framework.generics import get_object_or_404
+
+from formsbuilder.conditions import compile_rule
+from formsbuilder.metrics import record_cache
+from formsbuilder.models import FormField, FormFieldOption, FormTemplate
+from formsbuilder.replicas import primary_reads
+from formsbuilder.validators import UNDECLARED_MESSAGE, FieldValidator
+from formsbuilder.versions import freeze_template_version
+
+CACHE_PREFIX = "formsbuilder:schema"
+
+SPEC_FIELDS = (
+    "id",
+    "field_name",
+    "label",
+    "widget_type",
+    "placeholder",
+    "help_text",
+    "is_required",
+    "order",
+    "widget_config",
+    "validation_rules",
+    "conditional_logic",
+)
+
+
+def _lookup_key(lookup):
+    return f"{CACHE_PREFIX}:lookup:{lookup}"
+
+
+def _version_key(template_id):
+    return f"{CACHE_PREFIX}:version:{template_id}"
+
+
+def _spec_key(template_id, version):
+    return f"{CACHE_PREFIX}:spec:{template_id}:{version}"
+
+
+def version_token(updated_at):
+    """The version string of a template last updated at ``updated_at``."""
+    return updated_at.isoformat()
+
+
+class SchemaField:
+    __slots__ = (
+        "id",
+        "field_name",
+        "label",
+        "widget_type",
+        "is_required",
+        "order",
+        "rule",
+        "validator",
+    )
+
+    def __init__(self, spec):
+        self.id = spec["id"]
+        self.field_name = spec["field_name"]
+        self.label = spec["label"]
+        self.widget_type = spec["widget_type"]
+        self.is_required = spec["is_required"]
+        self.order = spec["order"]
+        self.rule = compile_rule(spec["conditional_logic"])
+        self.validator = FieldValidator(spec)
+
+    def should_validate(self, form_data):
+        """Whether conditional logic makes this field apply to ``form_data``."""
+        return self.rule.evaluate(form_data)
+
+    def __repr__(self):
+        return f"<SchemaField {self.field_name}>"
+
+
+class FormSchema:
+    """Immutable, precompiled view of one version of a form template."""
+
+    def __init__(
+        self,
+        template_id,
+        slug,
+        version,
+        fields,
+        template_version_id=None,
+        rate_limits=None,
+    ):
+        self.template_id = template_id
+        self.slug = slug
+        self.version = version
+        self.template_version_id = template_version_id
+        self.rate_limits = rate_limits or {}
+        self.fields = tuple(SchemaField(spec) for spec in fields)
+        self.fields_by_name = {field.field_name: field for field in self.fields}
+        self.required_fields = tuple(
+            field for field in self.fields if field.is_required
+        )
+        self.required_field_names = frozenset(
+            field.field_name for field in self.required_fields
+        )
+
+    @classmethod
+    def from_spec(cls, spec):
+        return cls(
+            spec["id"],
+            spec["slug"],
+            spec["version"],
+            spec["fields"],
+            spec.get("template_version_id"),
+            spec.get("rate_limits"),
+        )
+
+    def missing_required_field(self, form_data):
+        """Return the first required field missing from ``form_data``, if any.
+
+        Fields hidden by their conditional logic are not required.
+        """
+        for field in self.required_fields:
+            if field.field_name not in form_data and field.should_validate(form_data):
+                return field
+        return None
+
+    def validate(self, form_data):
+        """Validate submitted values against the fields' widget types and rules.
+
+        Returns ``{field_name: [message]}``; empty when ``form_data`` is valid.
+        Keys that are not template fields are rejected unless
+        ``FORMSBUILDER_REJECT_UNDECLARED_FIELDS`` is off, and fields hidden by
+        their conditional logic are not validated.
+        """
+        errors = {}
+        if settings.FORMSBUILDER_REJECT_UNDECLARED_FIELDS:
+            fields_by_name = self.fields_by_name
+            for key in form_data:
+                if key not in fields_by_name:
+                    errors[key] = [UNDECLARED_MESSAGE]
+
+        for field in self.fields:
+            if not field.should_validate(form_data):
+                continue
+            error = field.validator(form_data.get(field.field_name))
+            if error:
+                errors[field.field_name] = [error]
+        return errors
+
+    def __repr__(self):
+        return f"<FormSchema {self.slug} @ {self.version}>"
+
+
+class SchemaLRU:
+    """Thread-safe, size-bounded LRU of compiled schemas."""
+
+    def __init__(self, maxsize=None):
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self):
+        if self._maxsize is not None:
+            return self._maxsize
+        return settings.FORMSBUILDER_SCHEMA_LRU_SIZE
+
+    def get(self, key):
+        with self._lock:
+            schema = self._data.get(key)
+            if schema is not None:
+                self._data.move_to_end(key)
+            return schema
+
+    def set(self, key, schema):
+        with self._lock:
+            self._data[key] = schema
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def evict_template(self, template_id):
+        with self._lock:
+            for key in [key for key in self._data if key[0] == template_id]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+local_schemas = SchemaLRU()
+
+
+def _resolve_template_id(lookup):
+    """Resolve a slug or primary key the same way ``get_object`` does."""
+    template_id = cache.get(_lookup_key(lookup))
+    record_cache("template_lookup", template_id is not None)
+    if template_id is not None:
+        return template_id
+
+    template_id = (
+        FormTemplate.objects.filter(slug=lookup).values_list("pk", flat=True).first()
+    )
+    if template_id is None:
+        template_id = get_object_or_404(FormTemplate.objects.only("pk"), pk=lookup).pk
+    cache.set(
+        _lookup_key(lookup),
+        template_id,
+        settings.FORMSBUILDER_SCHEMA_CACHE_TIMEOUT,
+    )
+    return template_id
+
+
+def _current_version(template_id):
+    version = cache.get(_version_key(template_id))
+    record_cache("template_version", version is not None)
+    if version is not None:
+        return version
+
+    updated_at = get_object_or_404(
+        FormTemplate.objects.values_list("updated_at", flat=True), pk=template_id
+    )
+    version = version_token(updated_at)
+    cache.set(
+        _version_key(template_id), version, settings.FORMSBUILDER_SCHEMA_CACHE_TIMEOUT
+    )
+    return version
+
+
+def build_schema_spec(template_id):
+    """Load the picklable description of a template's current schema.
+
+    The fields are frozen into a ``FormTemplateVersion`` on the way, so the
+    spec also names the version submissions against it should record.
+    """
+    template = get_object_or_404(
+        FormTemplate.objects.only("pk", "slug", "updated_at", "rate_limits"),
+        pk=template_id,
+    )
+    fields = list(
+        FormField.objects.filter(form_template_id=template_id)
+        .order_by("order", "id")
+        .values(*SPEC_FIELDS)
+    )
+    options = {}
+    for field_id, value, label in (
+        FormFieldOption.objects.filter(form_field__form_template_id=template_id)
+        .order_by("order", "id")
+        .values_list("form_field_id", "value", "label")
+    ):
+        options.setdefault(field_id, []).append({"value": value, "label": label})
+    for field in fields:
+        field["options"] = options.get(field["id"], [])
+    template_version_id, template_version_number = freeze_template_version(
+        template_id, fields
+    )
+    return {
+        "id": template.pk,
+        "slug": template.slug,
+        "version": version_token(template.updated_at),
+        "template_version_id": template_version_id,
+        "template_version_number": template_version_number,
+        "rate_limits": template.rate_limits,
+        "fields": fields,
+    }
+
+
+@primary_reads()
+def get_template_version(lookup):
+    """Return ``(template id, version)`` for a template slug or primary key.
+
+    Served from the cache when warm, so it costs no database query. Raises
+    ``Http404`` when no template matches.
+    """
+    template_id = _resolve_template_id(str(lookup))
+    return template_id, _current_version(template_id)
+
+
+@primary_reads()
+def get_form_schema(lookup):
+    """Return the compiled ``FormSchema`` for a template slug or primary key.
+
+    Raises ``Http404`` when no template matches.
+    """
+    template_id, version = get_template_version(lookup)
+
+    schema = local_schemas.get((template_id, version))
+    record_cache("compiled_schema", schema is not None)
+    if schema is not None:
+        return schema
+
+    spec = cache.get(_spec_key(template_id, version))
+    record_cache("schema_spec", spec is not None)
+    if spec is None:
+        spec = build_schema_spec(template_id)
+        # The template may have changed between reading the version and
+        # loading the fields; cache under whatever version was actually read.
+        version = spec["version"]
+        cache.set(
+            _spec_key(template_id, version),
+            spec,
+            settings.FORMSBUILDER_SCHEMA_CACHE_TIMEOUT,
+        )
+
+    schema = FormSchema.from_spec(spec)
+    local_schemas.set((template_id, version), schema)
+    return schema
+
+
+async def _aget_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+        raise Http404
+
+
+async def _aresolve_template_id(lookup):
+    template_id = await cache.aget(_lookup_key(lookup))
+    record_cache("template_lookup", template_id is not None)
+    if template_id is not None:
+        return template_id
+
+    template_id = (
+        await FormTemplate.objects.filter(slug=lookup)
+        .values_list("pk", flat=True)
+        .afirst()
+    )
+    if template_id is None:
+        template_id = (
+            await _aget_or_404(FormTemplate.objects.only("pk"), pk=lookup)
+        ).pk
+    await cache.aset(
+        _lookup_key(lookup),
+        template_id,
+        settings.FORMSBUILDER_SCHEMA_CACHE_TIMEOUT,
+    )
+    return template_id
+
+
+async def _acurrent_version(template_id):
+    version = await cache.aget(_version_key(template_id))
+    record_cache("template_version", version is not None)
+    if version is not None:
+        return version
+
+    updated_at = await _aget_or_404(
+        FormTemplate.objects.values_list("updated_at", flat=True), pk=template_id
+    )
+    version = version_token(updated_at)
+    await cache.aset(
+        _version_key(template_id), version, settings.FORMSBUILDER_SCHEMA_CACHE_TIMEOUT
+    )
+    return version
+
+
+async def aget_form_schema(lookup):
+    """Async ``get_form_schema`` for ASGI views.
+
+    A schema already compiled by this process is returned without leaving
+    the event loop for anything but the cache. Building a schema freezes a
+    ``FormTemplateVersion`` inside a transaction, which the async ORM cannot
+    do, so that rare path runs ``get_form_schema`` in the ORM thread.
+    """
+    with primary_reads():
+        template_id = await _aresolve_template_id(str(lookup))
+        version = await _acurrent_version(template_id)
+    schema = local_schemas.get((template_id, version))
+    if schema is not None:
+        record_cache("compiled_schema", True)
+        return schema
+    return await sync_to_async(get_form_schema)(template_id)
+
+
+def _delete_cached_schema(template_id, lookups):
+    cache.delete_many(
+        [_version_key(template_id)] + [_lookup_key(lookup) for lookup in lookups]
+    )
+    local_schemas.evict_template(template_id)
+
+
+def invalidate_form_schema(template_id, slug=None):
+    """Drop every cached entry for a template.
+
+    Runs immediately and again once the surrounding transaction commits, so a
+    concurrent request cannot re-cache the pre-commit state.
+    """
+    lookups = [str(template_id)]
+    if slug:
+        lookups.append(slug)
+    _delete_cached_schema(template_id, lookups)
+    transaction.on_commit(partial(_delete_cached_schema, template_id, lookups))
+
+
+_deferred = threading.local()
+
+
+def template_changes_deferred():
+    return getattr(_deferred, "depth", 0) > 0
+
+
+@contextmanager
+def deferred_template_changes(template_id):
+    """Collapse the per-row change signals fired inside the block into one bump.
+
+    Used by bulk writers that touch many fields and options of a single
+    template (or use ``bulk_create``/``bulk_update``, which fire no signals).
+    """
+    _deferred.depth = getattr(_deferred, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _deferred.depth -= 1
+    mark_template_changed(template_id)
+
+
+def mark_template_changed(template_id):
+    """Bump a template's ``updated_at`` and invalidate its cached schema."""
+    if template_id is None or template_changes_deferred():
+        return
+    FormTemplate.objects.filter(pk=template_id).update(updated_at=timezone.now())
+    invalidate_form_schema(template_id)
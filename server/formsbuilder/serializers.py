@@ -1,15 +1,28 @@
+from collections import Counter
+
+from django.db import transaction
 from rest_framework import serializers
 
-from .models import FormField, FormFieldOption, FormSubmission, FormTemplate
+from .bulk import sync_template_fields
+from .metrics import TimedSerializerMixin
+from .models import (
+    FormField,
+    FormFieldOption,
+    FormSubmission,
+    FormTemplate,
+    FormTemplateStatistics,
+)
+from .ratelimits import rate_limit_errors
+from .validators import parse_rules
 
 
-class FormFieldOptionSerializer(serializers.ModelSerializer):
+class FormFieldOptionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = FormFieldOption
         fields = ["id", "value", "label", "order"]
 
 
-class FormFieldSerializer(serializers.ModelSerializer):
+class FormFieldSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     options = FormFieldOptionSerializer(many=True, required=False)
 
     class Meta:
@@ -29,6 +42,12 @@ class FormFieldSerializer(serializers.ModelSerializer):
             "options",
         ]
 
+    def validate_validation_rules(self, value):
+        _, errors = parse_rules(value)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return value
+
     def create(self, validated_data):
         options_data = validated_data.pop("options", [])
         field = FormField.objects.create(**validated_data)
@@ -49,12 +68,25 @@ class FormFieldSerializer(serializers.ModelSerializer):
         return instance
 
 
-class FormTemplateSerializer(serializers.ModelSerializer):
+class FormFieldOptionWriteSerializer(FormFieldOptionSerializer):
+    """Option payload nested in ``fields_data``; ``id`` targets an existing row."""
+
+    id = serializers.IntegerField(required=False)
+
+
+class FormFieldWriteSerializer(FormFieldSerializer):
+    """Field payload nested in ``fields_data``; ``id`` targets an existing row."""
+
+    id = serializers.IntegerField(required=False)
+    options = FormFieldOptionWriteSerializer(many=True, required=False)
+
+
+class FormTemplateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     fields = FormFieldSerializer(many=True, read_only=True)
     created_by = serializers.ReadOnlyField(
         source="created_by.username", allow_null=True
     )
-    fields_data = FormFieldSerializer(many=True, write_only=True, required=False)
+    fields_data = FormFieldWriteSerializer(many=True, write_only=True, required=False)
 
     class Meta:
         model = FormTemplate
@@ -70,61 +102,109 @@ class FormTemplateSerializer(serializers.ModelSerializer):
             "category",
             "fields",
             "fields_data",
+            "rate_limits",
         ]
         read_only_fields = ("slug",)
-
+        # Limits are not published with the public form definition.
+        extra_kwargs = {"rate_limits": {"write_only": True}}
+
+    def validate_rate_limits(self, value):
+        errors = rate_limit_errors(value)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return value
+
+    def validate_fields_data(self, value):
+        if self.partial:
+            # Each entry replaces a stored field, so it must be complete even
+            # when the template itself is only patched.
+            full = FormFieldWriteSerializer(
+                data=self.initial_data["fields_data"], many=True
+            )
+            if not full.is_valid():
+                raise serializers.ValidationError(full.errors)
+            value = full.validated_data
+        counts = Counter(field_data["field_name"] for field_data in value)
+        duplicates = sorted(name for name, count in counts.items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError(
+                f"Duplicate field_name values: {', '.join(duplicates)}"
+            )
+        return value
+
+    @transaction.atomic
     def create(self, validated_data):
         fields_data = validated_data.pop("fields_data", [])
         form_template = FormTemplate.objects.create(**validated_data)
-
-        for field_data in fields_data:
-            options_data = field_data.pop("options", [])
-
-            field_serializer = FormFieldSerializer(data=field_data)
-            field_serializer.is_valid(raise_exception=True)
-            field = field_serializer.save(form_template=form_template)
-
-            for option_data in options_data:
-                option_serializer = FormFieldOptionSerializer(data=option_data)
-                option_serializer.is_valid(raise_exception=True)
-                option_serializer.save(form_field=field)
-
+        if fields_data:
+            sync_template_fields(form_template, fields_data)
         return form_template
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         fields_data = validated_data.pop("fields_data", None)
         instance = super().update(instance, validated_data)
-
         if fields_data is not None:
-            instance.fields.all().delete()
+            sync_template_fields(instance, fields_data)
+        return instance
 
-            for field_data in fields_data:
-                options_data = field_data.pop("options", [])
 
-                field_serializer = FormFieldSerializer(data=field_data)
-                field_serializer.is_valid(raise_exception=True)
-                field = field_serializer.save(form_template=instance)
+class FormTemplateSummarySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """List representation without the nested fields (``?view=summary``)."""
 
-                for option_data in options_data:
-                    option_serializer = FormFieldOptionSerializer(data=option_data)
-                    option_serializer.is_valid(raise_exception=True)
-                    option_serializer.save(form_field=field)
+    created_by = serializers.ReadOnlyField(
+        source="created_by.username", allow_null=True
+    )
 
-        return instance
+    class Meta:
+        model = FormTemplate
+        fields = [
+            "id",
+            "name",
+            "slug",
+            "description",
+            "is_active",
+            "created_by",
+            "created_at",
+            "updated_at",
+            "category",
+        ]
+        read_only_fields = fields
 
 
-class FormSubmissionSerializer(serializers.ModelSerializer):
+class FormSubmissionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     submitted_by = serializers.ReadOnlyField(
         source="submitted_by.username", allow_null=True
     )
+    template_version = serializers.ReadOnlyField(
+        source="template_version.number", allow_null=True
+    )
 
     class Meta:
         model = FormSubmission
         fields = [
             "id",
             "form_template",
+            "template_version",
             "submitted_by",
             "submission_data",
             "submitted_at",
             "ip_address",
         ]
+
+
+class FormTemplateStatisticsSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    name = serializers.ReadOnlyField(source="form_template.name")
+    slug = serializers.ReadOnlyField(source="form_template.slug")
+
+    class Meta:
+        model = FormTemplateStatistics
+        fields = [
+            "form_template",
+            "name",
+            "slug",
+            "submission_count",
+            "last_submitted_at",
+        ]
@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from formsbuilder.models import (
+    FormField,
+    FormFieldOption,
+    FormSubmission,
+    FormTemplate,
+    FormTemplateStatistics,
+    FormTemplateVersion,
+)
+from formsbuilder.notifications import invalidate_notification_recipients
+from formsbuilder.schema import (
+    invalidate_form_schema,
+    mark_template_changed,
+    template_changes_deferred,
+)
+from formsbuilder.statistics import (
+    record_submissions,
+    record_template_activity_changed,
+    record_template_created,
+    record_template_deleted,
+)
+from formsbuilder.tasks import schedule_submission_index_update
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=FormTemplate)
+@receiver(post_delete, sender=FormTemplate)
+def form_template_changed(sender, instance, **kwargs):
+    invalidate_form_schema(instance.pk, instance.slug)
+    previous_slug = getattr(instance, "_previous_slug", None)
+    if previous_slug and previous_slug != instance.slug:
+        # A renamed template must stop resolving under its old slug.
+        invalidate_form_schema(instance.pk, previous_slug)
+
+
+@receiver(post_save, sender=FormField)
+@receiver(post_delete, sender=FormField)
+def form_field_changed(sender, instance, **kwargs):
+    mark_template_changed(instance.form_template_id)
+
+
+@receiver(post_save, sender=FormFieldOption)
+@receiver(post_delete, sender=FormFieldOption)
+def form_field_option_changed(sender, instance, **kwargs):
+    if template_changes_deferred():
+        return
+    template_id = (
+        FormField.objects.filter(pk=instance.form_field_id)
+        .values_list("form_template_id", flat=True)
+        .first()
+    )
+    mark_template_changed(template_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_notification_recipients()
+
+
+@receiver(pre_save, sender=FormTemplate)
+def remember_template_state(sender, instance, **kwargs):
+    previous = (
+        FormTemplate.objects.filter(pk=instance.pk)
+        .values_list("is_active", "slug")
+        .first()
+        if instance.pk
+        else None
+    )
+    instance._was_active, instance._previous_slug = previous or (None, None)
+
+
+@receiver(post_save, sender=FormTemplate)
+def count_template_saved(sender, instance, created, **kwargs):
+    if created:
+        record_template_created(instance)
+    elif (
+        instance._was_active is not None and instance._was_active != instance.is_active
+    ):
+        record_template_activity_changed(instance.is_active)
+
+
+@receiver(pre_delete, sender=FormTemplate)
+def remember_template_submission_count(sender, instance, **kwargs):
+    instance._submission_count = (
+        FormTemplateStatistics.objects.filter(pk=instance.pk)
+        .values_list("submission_count", flat=True)
+        .first()
+        or 0
+    )
+
+
+@receiver(post_delete, sender=FormTemplate)
+def count_template_deleted(sender, instance, **kwargs):
+    record_template_deleted(instance, instance._submission_count)
+
+
+# Deliberately no delete receiver for FormSubmission: it would stop Django
+# from fast-deleting a template's submissions on cascade. Views that delete
+# submissions call ``remove_submissions`` themselves and bulk writers call
+# ``record_submissions``, as bulk_create fires no signals.
+@receiver(post_save, sender=FormSubmission)
+def count_submission_created(sender, instance, created, **kwargs):
+    if created:
+        record_submissions(instance.form_template_id, 1, instance.submitted_at)
+
+
+@receiver(post_save, sender=FormTemplateVersion)
+def template_version_frozen(sender, instance, created, **kwargs):
+    # A new version is the first sign that ``widget_config["indexed"]`` may
+    # have changed, including through bulk field syncs that fire no signals.
+    if created:
+        schedule_submission_index_update(instance.form_template_id)
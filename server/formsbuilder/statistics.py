@@ -0,0 +1,183 @@
+"""Incrementally maintained form and submission counters.
+
+Writers adjust the counters with ``F()`` expressions in the same transaction
+as the change they count, so reading the dashboard numbers is a primary-key
+lookup however many submissions exist. ``reconcile_statistics`` recomputes
+everything from the source tables and is run periodically by Celery beat to
+repair any drift (raw SQL writes, deletes that bypass the ORM, ...); it
+counts without locks, so submissions never wait for the scan.
+"""
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from formsbuilder.models import (
+    FormStatistics,
+    FormSubmission,
+    FormTemplate,
+    FormTemplateStatistics,
+)
+
+SITE_COUNTERS = ("total_forms", "active_forms", "total_submissions")
+
+
+def _update_site_counters(**changes):
+    counters = FormStatistics.objects.filter(pk=FormStatistics.SINGLETON_ID)
+    values = {
+        name: Greatest(F(name) + delta, Value(0)) for name, delta in changes.items()
+    }
+    if not counters.update(**values):
+        # Only on an empty database: migrations create the row, and the
+        # periodic reconcile repairs it should it go missing.
+        FormStatistics.objects.get_or_create(pk=FormStatistics.SINGLETON_ID)
+        counters.update(**values)
+
+
+def get_site_statistics():
+    statistics = FormStatistics.objects.filter(pk=FormStatistics.SINGLETON_ID).first()
+    return statistics or reconcile_statistics()
+
+
+def record_submissions(template_id, count, submitted_at=None):
+    """Count ``count`` new submissions for a template."""
+    if not count:
+        return
+    submitted_at = submitted_at or timezone.now()
+    counters = FormTemplateStatistics.objects.filter(pk=template_id)
+    values = {
+        "submission_count": F("submission_count") + count,
+        "last_submitted_at": Greatest(
+            Coalesce("last_submitted_at", Value(submitted_at)), Value(submitted_at)
+        ),
+    }
+    with transaction.atomic():
+        if not counters.update(**values):
+            # Concurrent first submissions both get here; get_or_create lets
+            # exactly one of them insert the row.
+            FormTemplateStatistics.objects.get_or_create(form_template_id=template_id)
+            counters.update(**values)
+        _update_site_counters(total_submissions=count)
+
+
+def remove_submissions(template_id, count):
+    """Count ``count`` deleted submissions of a template."""
+    if not count:
+        return
+    with transaction.atomic():
+        FormTemplateStatistics.objects.filter(pk=template_id).update(
+            submission_count=Greatest(F("submission_count") - count, Value(0))
+        )
+        _update_site_counters(total_submissions=-count)
+
+
+def record_template_created(template):
+    FormTemplateStatistics.objects.get_or_create(form_template=template)
+    _update_site_counters(total_forms=1, active_forms=int(template.is_active))
+
+
+def record_template_activity_changed(is_active):
+    _update_site_counters(active_forms=1 if is_active else -1)
+
+
+def record_template_deleted(template, submission_count):
+    _update_site_counters(
+        total_forms=-1,
+        active_forms=-int(template.is_active),
+        total_submissions=-submission_count,
+    )
+
+
+def _snapshot():
+    """The counters and the figures they should hold, as of one moment.
+
+    Nothing is locked. On PostgreSQL a repeatable-read transaction makes
+    every query see the same snapshot (when no outer transaction has
+    started already); SQLite transactions always do.
+    """
+    repeatable = connection.vendor == "postgresql" and not connection.in_atomic_block
+    with transaction.atomic():
+        if repeatable:
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        counters = {
+            pk: (count, last)
+            for pk, count, last in FormTemplateStatistics.objects.values_list(
+                "pk", "submission_count", "last_submitted_at"
+            )
+        }
+        site = (
+            FormStatistics.objects.filter(pk=FormStatistics.SINGLETON_ID)
+            .values(*SITE_COUNTERS)
+            .first()
+        )
+        actual = {
+            row["form_template"]: (row["count"], row["last"])
+            for row in FormSubmission.objects.values("form_template").annotate(
+                count=Count("id"), last=Max("submitted_at")
+            )
+        }
+        template_ids = sorted(FormTemplate.objects.values_list("pk", flat=True))
+        forms = FormTemplate.objects.aggregate(
+            total=Count("id"), active=Count("id", filter=Q(is_active=True))
+        )
+    totals = {
+        "total_forms": forms["total"],
+        "active_forms": forms["active"],
+        "total_submissions": sum(count for count, _ in actual.values()),
+    }
+    return counters, site, actual, template_ids, totals
+
+
+def reconcile_statistics():
+    """Recompute every counter from ``FormTemplate`` and ``FormSubmission``.
+
+    The source tables are counted from a snapshot without holding any lock;
+    the difference between the true figures and the counters in that same
+    snapshot is then added to the counters. Changes committed since the
+    snapshot have moved the counters already and are kept, and writers only
+    wait for the few counter rows that drifted.
+    """
+    counters, site, actual, template_ids, totals = _snapshot()
+    # A row created since the snapshot started from zero.
+    site = site or dict.fromkeys(SITE_COUNTERS, 0)
+
+    with transaction.atomic():
+        missing = [pk for pk in template_ids if pk not in counters]
+        if missing:
+            # Likewise. The lock keeps the templates from being deleted
+            # while their rows are created.
+            existing = (
+                FormTemplate.objects.select_for_update()
+                .filter(pk__in=missing)
+                .values_list("pk", flat=True)
+            )
+            FormTemplateStatistics.objects.bulk_create(
+                [FormTemplateStatistics(form_template_id=pk) for pk in existing],
+                ignore_conflicts=True,
+            )
+        for template_id in template_ids:
+            count, last = actual.get(template_id, (0, None))
+            seen_count, seen_last = counters.get(template_id, (0, None))
+            rows = FormTemplateStatistics.objects.filter(pk=template_id)
+            if count != seen_count:
+                rows.update(
+                    submission_count=Greatest(
+                        F("submission_count") + (count - seen_count), Value(0)
+                    )
+                )
+            if last != seen_last:
+                # Unless a newer submission has moved it since.
+                rows.filter(last_submitted_at=seen_last).update(last_submitted_at=last)
+
+        FormStatistics.objects.get_or_create(pk=FormStatistics.SINGLETON_ID)
+        values = {
+            name: Greatest(F(name) + (totals[name] - site[name]), Value(0))
+            for name in SITE_COUNTERS
+            if totals[name] != site[name]
+        }
+        FormStatistics.objects.filter(pk=FormStatistics.SINGLETON_ID).update(
+            reconciled_at=timezone.now(), **values
+        )
+    return FormStatistics.objects.get(pk=FormStatistics.SINGLETON_ID)
@@ -1,14 +1,141 @@
+import logging
+from functools import partial
+
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from formsbuilder.analytics import fold_new_submissions
+from formsbuilder.filters import sync_submission_indexes
+from formsbuilder.idempotency import purge_idempotency_keys
+from formsbuilder.notifications import (
+    CACHE_PREFIX,
+    add_pending_submissions,
+    get_notification_recipients,
+    pop_pending_submissions,
+    send_submission_digest,
+)
+from formsbuilder.partitions import ensure_partitions
+from formsbuilder.statistics import reconcile_statistics
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SCHEDULED_KEY = f"{CACHE_PREFIX}:digest-scheduled"
+
+
+@shared_task
+def queue_submission_notifications(template_id, submission_ids):
+    """Count new submissions and make sure a digest is scheduled for them."""
+    add_pending_submissions(template_id, len(submission_ids))
+
+    _schedule_digest()
 
-from formsbuilder.notifications import send_notification
+
+def _schedule_digest():
+    window = settings.FORMSBUILDER_NOTIFICATION_DIGEST_WINDOW
+    # The flag outlives the window so a lost digest task is eventually retried
+    # by the next submission instead of blocking notifications forever. It
+    # only prevents duplicate digests: with a per-process cache each worker
+    # may schedule its own, and whichever runs first sends every count.
+    if cache.add(DIGEST_SCHEDULED_KEY, 1, window * 2 + 1):
+        send_submission_digests.apply_async(countdown=window)
 
 
 @shared_task
-def form_submission_notification(emails):
-    admin_emails = [admin.email for admin in emails]
-    message = "A new form has been sumitted."
-    send_notification(
-        subject="Form Submission",
-        message=message,
-        recipient_list=admin_emails,
-    )
\ No newline at end of file
+def send_submission_digests():
+    cache.delete(DIGEST_SCHEDULED_KEY)
+    pending = pop_pending_submissions()
+    if not pending:
+        return 0
+    try:
+        return send_submission_digest(pending, get_notification_recipients())
+    except Exception:
+        # Put the counts back for the next digest, one window from now.
+        for template_id, count in pending.items():
+            add_pending_submissions(template_id, count)
+        _schedule_digest()
+        raise
+
+
+@shared_task
+def reconcile_form_statistics():
+    """Recompute the statistics counters from the source tables."""
+    statistics = reconcile_statistics()
+    return {
+        "total_forms": statistics.total_forms,
+        "active_forms": statistics.active_forms,
+        "total_submissions": statistics.total_submissions,
+    }
+
+
+@shared_task
+def fold_submission_rollups():
+    """Fold new submissions into the hourly and daily analytics rollups."""
+    return fold_new_submissions()
+
+
+@shared_task
+def purge_expired_idempotency_keys():
+    """Forget idempotency keys older than the retention period."""
+    return purge_idempotency_keys()
+
+
+@shared_task
+def update_submission_indexes(template_id):
+    """Build and drop the expression indexes of a template's indexed fields."""
+    return sync_submission_indexes(template_id)
+
+
+@shared_task
+def create_submission_partitions():
+    """Create the coming months' submission partitions ahead of time."""
+    return ensure_partitions()
+
+
+def schedule_submission_index_update(template_id):
+    """Enqueue ``update_submission_indexes`` once the transaction commits.
+
+    Only PostgreSQL gets per-field indexes, so elsewhere this does nothing.
+    The version is frozen on the submit path, so a broker that is down is
+    logged rather than raised: submissions filter fine without the indexes.
+    """
+    if connection.vendor != "postgresql":
+        return
+
+    def dispatch():
+        try:
+            update_submission_indexes.delay(template_id)
+        except Exception:
+            logger.exception("Could not enqueue the submission index update")
+
+    transaction.on_commit(dispatch)
+
+
+def notify_form_submissions(template_id, submission_ids, loop=None):
+    """Enqueue admin notifications once the current transaction commits.
+
+    The submissions are already stored by then, so a broker that is down
+    only loses their notifications: the error is logged, not raised.
+
+    Async views pass their event ``loop``: the broker is then called from
+    the loop's executor, so the ORM thread that committed is not held up.
+    """
+    submission_ids = list(submission_ids)
+
+    def dispatch():
+        try:
+            queue_submission_notifications.delay(template_id, submission_ids)
+        except Exception:
+            logger.exception("Could not enqueue submission notifications")
+
+    if loop is not None:
+        dispatch = partial(_dispatch_from_loop, loop, dispatch)
+    transaction.on_commit(dispatch)
+
+
+def _dispatch_from_loop(loop, dispatch):
+    if loop.is_closed():
+        dispatch()
+    else:
+        loop.call_soon_threadsafe(loop.run_in_executor, None, dispatch)
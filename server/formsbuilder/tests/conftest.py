@@ -1,13 +1,24 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from formsbuilder.models import FormField, FormFieldOption, FormSubmission, FormTemplate
+from formsbuilder.schema import local_schemas
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    cache.clear()
+    local_schemas.clear()
+    yield
+    cache.clear()
+    local_schemas.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
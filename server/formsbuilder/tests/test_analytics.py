@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder.analytics import bucket_start, fold_new_submissions
+from formsbuilder.models import (
+    FieldRollup,
+    FormField,
+    FormSubmission,
+    RollupCheckpoint,
+    SubmissionRollup,
+)
+from formsbuilder.tasks import fold_submission_rollups
+
+pytestmark = pytest.mark.django_db
+
+NOON = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def tracked_fields(form_template):
+    for field_name, widget_type in (
+        ("colour", "select"),
+        ("toppings", "multi_select"),
+        ("age", "number"),
+        ("comment", "text"),
+    ):
+        FormField.objects.create(
+            form_template=form_template,
+            field_name=field_name,
+            label=field_name.title(),
+            widget_type=widget_type,
+        )
+
+
+def submit(form_template, submitted_at, **data):
+    submission = FormSubmission.objects.create(
+        form_template=form_template, submission_data=data
+    )
+    FormSubmission.objects.filter(pk=submission.pk).update(submitted_at=submitted_at)
+    return submission
+
+
+def fold():
+    return fold_new_submissions(settle_seconds=0)
+
+
+class TestBucketStart:
+    def test_hour_and_day(self):
+        moment = datetime(2024, 5, 1, 14, 45, 12, tzinfo=timezone(timedelta(hours=2)))
+
+        assert bucket_start(moment, "hour") == datetime(
+            2024, 5, 1, 12, tzinfo=timezone.utc
+        )
+        assert bucket_start(moment, "day") == datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+class TestFold:
+    def test_aggregates_choice_and_number_fields(self, form_template, tracked_fields):
+        submit(form_template, NOON, colour="red", toppings=["ham", "olive"], age=30)
+        submit(form_template, NOON, colour="red", toppings=["ham"], age="10")
+        submit(form_template, NOON + timedelta(hours=1), colour="blue", age="n/a")
+
+        assert fold() == 3
+
+        hourly = SubmissionRollup.objects.filter(granularity="hour")
+        assert [(r.bucket_start.hour, r.submission_count) for r in hourly] == [
+            (12, 2),
+            (13, 1),
+        ]
+        daily = SubmissionRollup.objects.get(granularity="day")
+        assert daily.submission_count == 3
+        fields = {f.field_name: f for f in daily.field_rollups.all()}
+        assert set(fields) == {"colour", "toppings", "age"}
+        assert fields["colour"].option_counts == {"red": 2, "blue": 1}
+        assert fields["toppings"].option_counts == {"ham": 2, "olive": 1}
+        age = fields["age"]
+        assert (age.value_count, age.value_sum, age.value_min, age.value_max) == (
+            2,
+            40.0,
+            10.0,
+            30.0,
+        )
+
+    def test_skips_integers_too_large_for_a_float(self, form_template, tracked_fields):
+        submit(form_template, NOON, age=10**400)
+        submit(form_template, NOON, age=7)
+
+        assert fold() == 2
+
+        age = FieldRollup.objects.get(rollup__granularity="day", field_name="age")
+        assert (age.value_count, age.value_sum) == (1, 7.0)
+
+    def test_is_incremental(self, form_template, tracked_fields):
+        submit(form_template, NOON, colour="red", age=5)
+        fold()
+        last = submit(form_template, NOON, colour="green", age=50)
+
+        assert fold() == 1
+        assert fold() == 0
+
+        daily = SubmissionRollup.objects.get(granularity="day")
+        assert daily.submission_count == 2
+        colour = daily.field_rollups.get(field_name="colour")
+        assert colour.option_counts == {"red": 1, "green": 1}
+        age = daily.field_rollups.get(field_name="age")
+        assert (age.value_min, age.value_max) == (5.0, 50.0)
+        assert RollupCheckpoint.objects.get().last_submission_id == last.pk
+
+    def test_processes_in_batches(self, form_template, tracked_fields):
+        for _ in range(5):
+            submit(form_template, NOON, colour="red")
+
+        assert fold_new_submissions(batch_size=2, settle_seconds=0) == 5
+        assert SubmissionRollup.objects.get(granularity="hour").submission_count == 5
+        assert FieldRollup.objects.count() == 2
+
+    def test_leaves_unsettled_submissions_for_the_next_run(self, form_template):
+        FormSubmission.objects.create(form_template=form_template, submission_data={})
+
+        assert fold_new_submissions(settle_seconds=60) == 0
+        assert not RollupCheckpoint.objects.get().last_submission_id
+
+    def test_task(self, form_template, settings):
+        settings.FORMSBUILDER_ROLLUP_SETTLE_SECONDS = 0
+        submit(form_template, NOON)
+
+        assert fold_submission_rollups() == 1
+
+
+class TestAnalyticsEndpoint:
+    @pytest.fixture
+    def url(self, form_template, tracked_fields):
+        submit(form_template, NOON, colour="red", age=20)
+        submit(form_template, NOON + timedelta(days=1), colour="blue", age=40)
+        fold()
+        return reverse("form-template-analytics", args=[form_template.slug])
+
+    def test_daily_buckets_and_totals(
+        self, authenticated_client, url, django_assert_max_num_queries
+    ):
+        # User, template, buckets, field rollups and the checkpoint.
+        with django_assert_max_num_queries(5):
+            response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [b["submission_count"] for b in response.data["buckets"]] == [1, 1]
+        totals = response.data["totals"]
+        assert totals["submission_count"] == 2
+        assert totals["fields"]["colour"] == {"options": {"red": 1, "blue": 1}}
+        assert totals["fields"]["age"] == {
+            "count": 2,
+            "sum": 60.0,
+            "min": 20.0,
+            "max": 40.0,
+            "mean": 30.0,
+        }
+
+    def test_hourly_with_bounds(self, authenticated_client, url):
+        response = authenticated_client.get(
+            url,
+            {"granularity": "hour", "since": "2024-05-02T00:00:00"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [b["bucket_start"] for b in response.data["buckets"]] == [
+            NOON.replace(minute=0) + timedelta(days=1)
+        ]
+
+    def test_rejects_bad_parameters(self, authenticated_client, url):
+        assert (
+            authenticated_client.get(url, {"granularity": "week"}).status_code
+            == status.HTTP_400_BAD_REQUEST
+        )
+        assert (
+            authenticated_client.get(url, {"since": "yesterday"}).status_code
+            == status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_requires_authentication(self, api_client, url):
+        assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
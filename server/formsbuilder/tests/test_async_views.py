@@ -0,0 +1,108 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder import tasks
+from formsbuilder.models import FormField, FormSubmission
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    queued = []
+    monkeypatch.setattr(
+        tasks.queue_submission_notifications,
+        "delay",
+        lambda *args: queued.append(args),
+    )
+    return queued
+
+
+@pytest.fixture
+def name_field(form_template):
+    return FormField.objects.create(
+        form_template=form_template,
+        field_name="name",
+        label="Name",
+        widget_type="text",
+        is_required=True,
+    )
+
+
+def submit_url(template):
+    return reverse("form-template-submit-async", args=[template.slug])
+
+
+class TestAsyncSubmit:
+    def test_matches_the_sync_endpoint(self, api_client, form_template, name_field):
+        sync_url = reverse("form-template-submit-form", args=[form_template.slug])
+        sync = api_client.post(sync_url, {"name": "Ada"}, format="json")
+
+        response = api_client.post(
+            submit_url(form_template), {"name": "Grace"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        body = response.json()
+        assert body.keys() == sync.data.keys()
+        submission = FormSubmission.objects.get(pk=body["submission_id"])
+        assert submission.submission_data == {"name": "Grace"}
+        assert submission.submitted_by is None
+        assert (
+            submission.template_version_id
+            == FormSubmission.objects.get(
+                pk=sync.data["submission_id"]
+            ).template_version_id
+        )
+
+    def test_validation_errors(self, api_client, form_template, name_field):
+        response = api_client.post(submit_url(form_template), {}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["field_name"] == "name"
+        assert not FormSubmission.objects.exists()
+
+    def test_malformed_json(self, api_client, form_template):
+        response = api_client.post(
+            submit_url(form_template), "{oops", content_type="application/json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_unknown_template(self, api_client):
+        url = reverse("form-template-submit-async", args=["no-such-form"])
+
+        response = api_client.post(url, {}, format="json")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_is_not_allowed(self, api_client, form_template):
+        response = api_client.get(submit_url(form_template))
+
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_records_the_authenticated_user(self, authenticated_client, form_template):
+        response = authenticated_client.post(
+            submit_url(form_template), {}, format="json"
+        )
+
+        submission = FormSubmission.objects.get(pk=response.json()["submission_id"])
+        assert submission.submitted_by.username == "testuser"
+
+    def test_rejects_invalid_tokens(self, api_client, form_template):
+        api_client.credentials(HTTP_AUTHORIZATION="Bearer not-a-token")
+
+        response = api_client.post(submit_url(form_template), {}, format="json")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response["WWW-Authenticate"].startswith("Bearer")
+
+    def test_notification_enqueued_after_commit(
+        self, api_client, form_template, queued, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(submit_url(form_template), {}, format="json")
+            assert not queued
+
+        assert queued == [(form_template.id, [response.json()["submission_id"]])]
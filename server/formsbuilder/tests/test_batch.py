@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder import tasks
+from formsbuilder.models import FormField, FormSubmission
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def batch_url(form_template):
+    FormField.objects.create(
+        form_template=form_template,
+        field_name="email",
+        label="Email",
+        widget_type="email",
+        is_required=True,
+    )
+    return reverse("form-template-submit-batch", args=[form_template.slug])
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        tasks.queue_submission_notifications,
+        "delay",
+        lambda *args: calls.append(args),
+    )
+    return calls
+
+
+class TestSubmitBatch:
+    def test_valid_items_are_bulk_inserted(
+        self,
+        api_client,
+        form_template,
+        batch_url,
+        queued,
+        django_assert_max_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        items = [{"email": f"user{i}@example.com"} for i in range(50)]
+
+        # Cold schema cache (slug, version, template, fields, options, and
+        # freezing the first FormTemplateVersion), a single INSERT for all 50
+        # rows and the two statistics counter UPDATEs (plus their savepoints).
+        with django_capture_on_commit_callbacks(execute=True):
+            with django_assert_max_num_queries(17):
+                response = api_client.post(batch_url, items, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 50
+        assert FormSubmission.objects.filter(form_template=form_template).count() == 50
+        ids = [result["submission_id"] for result in response.data["results"]]
+        assert sorted(ids) == sorted(
+            FormSubmission.objects.values_list("id", flat=True)
+        )
+        assert queued == [(form_template.id, ids)]
+
+    def test_results_are_reported_per_item(self, api_client, batch_url, queued):
+        items = [{"email": "ok@example.com"}, {"email": "nope"}, {}, "x"]
+
+        response = api_client.post(batch_url, items, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 1
+        assert response.data["failed"] == 3
+        statuses = [result["status"] for result in response.data["results"]]
+        assert statuses == ["created", "invalid", "invalid", "invalid"]
+        assert "email" in response.data["results"][2]["errors"]
+        assert FormSubmission.objects.count() == 1
+
+    def test_all_invalid_batch_returns_400(self, api_client, batch_url, queued):
+        response = api_client.post(batch_url, [{}], format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not FormSubmission.objects.exists()
+        assert not queued
+
+    def test_ndjson_body(self, api_client, batch_url, queued):
+        body = "\n".join(
+            json.dumps({"email": f"user{i}@example.com"}) for i in range(3)
+        )
+        response = api_client.post(batch_url, body, content_type="application/x-ndjson")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 3
+
+    def test_malformed_ndjson(self, api_client, batch_url):
+        response = api_client.post(
+            batch_url, '{"email": "a@b.co"}\n{oops', content_type="application/x-ndjson"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "line 2" in response.data["detail"]
+
+    def test_batch_size_is_capped(self, api_client, batch_url, settings):
+        settings.FORMSBUILDER_MAX_BATCH_SUBMISSIONS = 2
+        response = api_client.post(batch_url, [{}, {}, {}], format="json")
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    def test_body_must_be_a_list(self, api_client, batch_url):
+        response = api_client.post(batch_url, {"email": "a@b.co"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
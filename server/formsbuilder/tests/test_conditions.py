@@ -0,0 +1,171 @@
+import pytest
+
+from formsbuilder.conditions import ALWAYS, Group, compile_rule, evaluate_rules
+from formsbuilder.models import FormField
+from formsbuilder.views import FormTemplateViewSet
+
+OPERATORS = [
+    "equals",
+    "not_equals",
+    "contains",
+    "not_contains",
+    "greater_than",
+    "less_than",
+    "greater_than_or_equals",
+    "less_than_or_equals",
+    "is_empty",
+    "is_not_empty",
+    "unknown",
+]
+
+CONSTANTS = ["10", 10, 2.5, "abc", "", None, True, 0, 10**400]
+
+SUBMISSIONS = [
+    {},
+    {"a": "10"},
+    {"a": 10},
+    {"a": "9.99"},
+    {"a": "abcdef"},
+    {"a": ""},
+    {"a": None},
+    {"a": True},
+    {"a": 0},
+    {"a": ["x", "abc"]},
+    {"a": 10**400},
+    {"b": "10"},
+]
+
+
+def _reference(logic, form_data):
+    field = FormField(conditional_logic=logic)
+    return FormTemplateViewSet()._should_validate_field(field, form_data)
+
+
+@pytest.mark.parametrize("action", ["show", "hide"])
+@pytest.mark.parametrize("operator", OPERATORS)
+@pytest.mark.parametrize("value", CONSTANTS)
+def test_single_condition_matches_reference(action, operator, value):
+    logic = {
+        "action": action,
+        "conditions": [{"field": "a", "operator": operator, "value": value}],
+    }
+    rule = compile_rule(logic)
+
+    expected = [_reference(logic, data) for data in SUBMISSIONS]
+    assert [rule.evaluate(data) for data in SUBMISSIONS] == expected
+    assert rule.evaluate_batch(SUBMISSIONS) == expected
+
+
+@pytest.mark.parametrize("logical_operator", ["and", "or", "AND", "xor"])
+def test_logical_operators_match_reference(logical_operator):
+    logic = {
+        "action": "show",
+        "logicalOperator": logical_operator,
+        "conditions": [
+            {"field": "a", "operator": "greater_than", "value": 5},
+            {"field": "b", "operator": "is_not_empty"},
+        ],
+    }
+    rule = compile_rule(logic)
+    rows = [{"a": 6, "b": "x"}, {"a": 6}, {"b": "x"}, {}]
+
+    expected = [_reference(logic, data) for data in rows]
+    assert [rule.evaluate(data) for data in rows] == expected
+    assert rule.evaluate_batch(rows) == expected
+
+
+@pytest.mark.parametrize(
+    "logic",
+    [None, {}, {"conditions": []}, {"action": "disable", "conditions": [{}]}],
+)
+def test_rules_without_effect_always_validate(logic):
+    assert compile_rule(logic) is ALWAYS
+    assert compile_rule(logic).evaluate({}) is True
+    assert compile_rule(logic).evaluate_batch([{}, {}]) == [True, True]
+
+
+def test_nested_groups():
+    rule = compile_rule(
+        {
+            "action": "show",
+            "conditions": [
+                {"field": "country", "operator": "equals", "value": "KE"},
+                {
+                    "logicalOperator": "or",
+                    "conditions": [
+                        {"field": "age", "operator": "greater_than", "value": 30},
+                        {"field": "vip", "operator": "is_not_empty"},
+                    ],
+                },
+            ],
+        }
+    )
+    rows = [
+        {"country": "KE", "age": "31"},
+        {"country": "KE", "age": "20", "vip": "yes"},
+        {"country": "KE", "age": "20"},
+        {"country": "UG", "age": "40"},
+    ]
+
+    assert isinstance(rule.expression.children[1], Group)
+    assert [rule.evaluate(row) for row in rows] == [True, True, False, False]
+    assert rule.evaluate_batch(rows) == [True, True, False, False]
+
+
+@pytest.mark.parametrize("logical_operator", ["and", "or"])
+def test_empty_nested_group(logical_operator):
+    rule = compile_rule(
+        {
+            "action": "show",
+            "conditions": [
+                {"field": "a", "operator": "is_not_empty"},
+                {"logicalOperator": logical_operator, "conditions": []},
+            ],
+        }
+    )
+    rows = [{"a": "x"}, {}]
+
+    expected = [rule.evaluate(row) for row in rows]
+    assert expected == [logical_operator == "and", False]
+    assert rule.evaluate_batch(rows) == expected
+
+
+def test_constants_are_coerced_at_compile_time():
+    rule = compile_rule(
+        {
+            "action": "show",
+            "conditions": [{"field": "a", "operator": "less_than", "value": "7"}],
+        }
+    )
+    condition = rule.expression.children[0]
+    assert condition.num_value == 7.0
+    assert condition.str_value == "7"
+
+
+def test_evaluate_rules_batches_a_rule_set():
+    rules = {
+        "reason": compile_rule(
+            {
+                "action": "show",
+                "conditions": [
+                    {"field": "attending", "operator": "equals", "value": "no"}
+                ],
+            }
+        ),
+        "plus_one": compile_rule(
+            {
+                "action": "hide",
+                "conditions": [
+                    {"field": "attending", "operator": "equals", "value": "no"}
+                ],
+            }
+        ),
+        "name": ALWAYS,
+    }
+    rows = [{"attending": "no"}, {"attending": "yes"}, {}]
+
+    assert evaluate_rules(rules, rows) == {
+        "reason": [True, False, False],
+        "plus_one": [False, True, True],
+        "name": [True, True, True],
+    }
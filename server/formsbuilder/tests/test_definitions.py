@@ -0,0 +1,89 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder.models import FormFieldOption
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def url(form_template):
+    return reverse("form-template-detail", args=[form_template.slug])
+
+
+class TestDefinitionCaching:
+    def test_sends_validators_and_cache_headers(self, api_client, url, settings):
+        settings.FORMSBUILDER_DEFINITION_SHARED_MAX_AGE = 120
+
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"].startswith('"')
+        assert response["Last-Modified"].endswith("GMT")
+        cache_control = response["Cache-Control"]
+        assert "public" in cache_control
+        assert "s-maxage=120" in cache_control
+        assert "Accept" in response["Vary"]
+
+    def test_if_none_match_is_answered_without_queries(
+        self, api_client, url, django_assert_num_queries
+    ):
+        etag = api_client.get(url)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert not response.content
+
+    def test_if_modified_since(self, api_client, url):
+        last_modified = api_client.get(url)["Last-Modified"]
+
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_field_change_moves_the_etag(self, api_client, url, form_field):
+        etag = api_client.get(url)["ETag"]
+
+        form_field.label = "Renamed"
+        form_field.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+        assert response.json()["fields"][0]["label"] == "Renamed"
+
+    def test_option_change_moves_the_etag(self, api_client, url, form_field):
+        etag = api_client.get(url)["ETag"]
+
+        FormFieldOption.objects.create(form_field=form_field, value="a", label="A")
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["fields"][0]["options"][0]["value"] == "a"
+
+    def test_deleted_field_is_not_served_from_cache(self, api_client, url, form_field):
+        api_client.get(url)
+
+        form_field.delete()
+
+        assert api_client.get(url).json()["fields"] == []
+
+    def test_renamed_slug_stops_resolving(self, api_client, url, form_template):
+        api_client.get(url)
+
+        form_template.slug = "renamed-form"
+        form_template.save()
+
+        assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+        renamed = reverse("form-template-detail", args=["renamed-form"])
+        assert api_client.get(renamed).status_code == status.HTTP_200_OK
+
+    def test_browsable_api_is_unaffected(self, api_client, url):
+        response = api_client.get(url, HTTP_ACCEPT="text/html")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"].startswith("text/html")
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder.exports import stream_submissions
+from formsbuilder.models import FormField, FormSubmission
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def export_template(form_template, test_user):
+    FormField.objects.create(
+        form_template=form_template,
+        field_name="age",
+        label="Age",
+        widget_type="number",
+        order=2,
+    )
+    FormField.objects.create(
+        form_template=form_template,
+        field_name="name",
+        label="Name",
+        widget_type="text",
+        order=1,
+    )
+    FormSubmission.objects.create(
+        form_template=form_template,
+        submitted_by=test_user,
+        submission_data={"name": "Ann", "age": 31, "tags": ["a", "b"]},
+        ip_address="10.0.0.1",
+    )
+    FormSubmission.objects.create(
+        form_template=form_template, submission_data={"name": "Bob"}
+    )
+    return form_template
+
+
+def _content(response):
+    return b"".join(response.streaming_content).decode()
+
+
+class TestStreamSubmissions:
+    def test_csv_columns_follow_field_order(self, export_template):
+        rows = list(
+            csv.reader(io.StringIO("".join(stream_submissions(export_template, "csv"))))
+        )
+
+        assert rows[0] == [
+            "id",
+            "submitted_at",
+            "submitted_by",
+            "ip_address",
+            "template_version",
+            "name",
+            "age",
+            "extra",
+        ]
+        assert rows[1][2:] == [
+            "testuser2",
+            "10.0.0.1",
+            "",
+            "Ann",
+            "31",
+            '{"tags": ["a", "b"]}',
+        ]
+        assert rows[2][2:] == ["", "", "", "Bob", "", ""]
+
+    def test_ndjson_emits_one_object_per_submission(self, export_template):
+        lines = "".join(stream_submissions(export_template, "ndjson")).splitlines()
+        records = [json.loads(line) for line in lines]
+
+        assert [record["name"] for record in records] == ["Ann", "Bob"]
+        assert list(records[0])[5:] == ["name", "age", "extra"]
+        assert records[0]["extra"] == {"tags": ["a", "b"]}
+
+    def test_output_is_chunked(self, export_template, monkeypatch):
+        monkeypatch.setattr("formsbuilder.exports.ROWS_PER_WRITE", 1)
+        chunks = list(stream_submissions(export_template, "csv", chunk_size=1))
+        assert len(chunks) == 3
+
+    def test_unknown_format_is_rejected(self, export_template):
+        with pytest.raises(ValueError):
+            stream_submissions(export_template, "xml")
+
+
+class TestExportAction:
+    def test_export_requires_authentication(self, api_client, export_template):
+        url = reverse("form-template-export", args=[export_template.id])
+        assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_export_streams_csv(self, api_client, test_user, export_template):
+        api_client.force_authenticate(user=test_user)
+        url = reverse("form-template-export", args=[export_template.slug])
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv"
+        assert "test-form-submissions.csv" in response["Content-Disposition"]
+        assert _content(response).count("\n") == 3
+
+    def test_export_ndjson(self, api_client, test_user, export_template):
+        api_client.force_authenticate(user=test_user)
+        url = reverse("form-template-export", args=[export_template.id])
+        response = api_client.get(url, {"export_format": "ndjson"})
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert len(_content(response).splitlines()) == 2
+
+    def test_unsupported_format(self, api_client, test_user, export_template):
+        api_client.force_authenticate(user=test_user)
+        url = reverse("form-template-export", args=[export_template.id])
+        response = api_client.get(url, {"export_format": "xml"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,135 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from formsbuilder.fastjson import dumps, loads, orjson
+from formsbuilder.models import FormSubmission
+
+BACKENDS = [
+    pytest.param(
+        "orjson",
+        marks=pytest.mark.skipif(orjson is None, reason="orjson is not installed"),
+    ),
+    "json",
+]
+
+DOCUMENT = {
+    "utc": datetime.datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=datetime.UTC),
+    "local": timezone.make_aware(
+        datetime.datetime(2024, 5, 1, 12, 30), timezone.get_fixed_timezone(180)
+    ),
+    "naive": datetime.datetime(2024, 5, 1, 12, 30),
+    "date": datetime.date(2024, 5, 1),
+    "time": datetime.time(9, 15),
+    "decimal": Decimal("12.50"),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "big": 2**70,
+    "text": "café\u2028\u2029\U0001f600",
+    "nested": [{"a": 1.5, "b": None, "c": True}],
+}
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, settings):
+    settings.FORMSBUILDER_JSON_BACKEND = request.param
+    return request.param
+
+
+class TestFastJSON:
+    def test_dumps_matches_drf(self, backend):
+        assert dumps(DOCUMENT) == JSONRenderer().render(DOCUMENT)
+
+    def test_dumps_escapes_line_separators(self, backend):
+        assert dumps("\u2028") == b'"\\u2028"'
+
+    def test_loads_keeps_big_integers(self, backend):
+        assert loads(b'{"n": 123456789012345678901234567890}') == {
+            "n": 123456789012345678901234567890
+        }
+
+    @pytest.mark.parametrize("content", [b"{", b'{"n": NaN}', b"\xff"])
+    def test_loads_rejects_invalid(self, backend, content):
+        with pytest.raises(ValueError):
+            loads(content)
+
+    def test_unknown_backend(self, settings):
+        settings.FORMSBUILDER_JSON_BACKEND = "simplejson"
+
+        with pytest.raises(ImproperlyConfigured):
+            dumps({})
+
+
+@pytest.mark.django_db
+class TestParser:
+    def test_parse_error(self, api_client, backend, form_template):
+        url = reverse("form-template-submit-form", args=[form_template.slug])
+
+        response = api_client.post(url, b"{", content_type="application/json")
+
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("JSON parse error - ")
+
+    def test_submit(self, api_client, backend, form_template, form_field):
+        url = reverse("form-template-submit-form", args=[form_template.slug])
+
+        response = api_client.post(url, {"test_field": "café"}, format="json")
+
+        assert response.status_code == 201
+        assert FormSubmission.objects.get().submission_data == {"test_field": "café"}
+
+
+@pytest.mark.django_db
+class TestStreaming:
+    @pytest.fixture
+    def submissions(self, form_template):
+        FormSubmission.objects.bulk_create(
+            FormSubmission(
+                form_template=form_template,
+                submission_data={"n": number, "text": "\u2028"},
+            )
+            for number in range(25)
+        )
+
+    def get(self, client, settings, url, threshold):
+        settings.FORMSBUILDER_JSON_STREAM_THRESHOLD = threshold
+        settings.FORMSBUILDER_JSON_STREAM_CHUNK_SIZE = 10
+        return client.get(url, {"page_size": 25})
+
+    def test_paginated_list(self, authenticated_client, settings, submissions):
+        url = reverse("form-submission-list")
+
+        buffered = self.get(authenticated_client, settings, url, 1000)
+        streamed = self.get(authenticated_client, settings, url, 20)
+
+        assert not buffered.streaming
+        assert streamed.streaming
+        assert streamed["Content-Type"] == buffered["Content-Type"]
+        assert b"".join(streamed.streaming_content) == buffered.content
+
+    def test_plain_list(self, api_client, settings, form_template):
+        url = reverse("form-template-list")
+
+        buffered = self.get(api_client, settings, url, 1000)
+        streamed = self.get(api_client, settings, url, 0)
+
+        assert streamed.streaming
+        assert b"".join(streamed.streaming_content) == buffered.content
+
+    def test_indented_responses_are_not_streamed(
+        self, authenticated_client, settings, submissions
+    ):
+        settings.FORMSBUILDER_JSON_STREAM_THRESHOLD = 0
+
+        response = authenticated_client.get(
+            reverse("form-submission-list"),
+            HTTP_ACCEPT="application/json; indent=2",
+        )
+
+        assert not response.streaming
+        assert b'\n  "next"' in response.content
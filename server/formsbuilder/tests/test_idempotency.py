@@ -0,0 +1,205 @@
+import uuid
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder import tasks, views
+from formsbuilder.idempotency import purge_idempotency_keys
+from formsbuilder.models import (
+    FlushedSubmission,
+    FormField,
+    FormSubmission,
+    FormTemplate,
+    IdempotencyKey,
+)
+from formsbuilder.writebehind import SpoolBuffer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    queued = []
+    monkeypatch.setattr(
+        tasks.queue_submission_notifications,
+        "delay",
+        lambda *args: queued.append(args),
+    )
+    return queued
+
+
+@pytest.fixture
+def name_field(form_template):
+    return FormField.objects.create(
+        form_template=form_template,
+        field_name="name",
+        label="Name",
+        widget_type="text",
+        is_required=True,
+    )
+
+
+def submit(client, template, data, key, name="form-template-submit-form"):
+    return client.post(
+        reverse(name, args=[template.slug]),
+        data,
+        format="json",
+        HTTP_IDEMPOTENCY_KEY=key,
+    )
+
+
+class TestIdempotentSubmit:
+    def test_retry_replays_the_first_response(
+        self,
+        api_client,
+        form_template,
+        name_field,
+        queued,
+        django_capture_on_commit_callbacks,
+        django_assert_num_queries,
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            first = submit(api_client, form_template, {"name": "Ada"}, "k-1")
+        with django_assert_num_queries(0):
+            retry = submit(api_client, form_template, {"name": "Ada"}, "k-1")
+
+        assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+        assert retry.json() == first.json()
+        assert retry["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first
+        assert FormSubmission.objects.count() == 1
+        assert len(queued) == 1
+
+    def test_retry_after_the_cache_expired(
+        self, api_client, form_template, name_field, queued
+    ):
+        first = submit(api_client, form_template, {"name": "Ada"}, "k-1")
+        cache.clear()
+
+        retry = submit(api_client, form_template, {"name": "Ada"}, "k-1")
+
+        assert retry.json()["submission_id"] == first.json()["submission_id"]
+        assert FormSubmission.objects.count() == 1
+
+    def test_keys_are_per_form(self, api_client, test_user, form_template, queued):
+        other = FormTemplate.objects.create(name="Other", created_by=test_user)
+
+        submit(api_client, form_template, {}, "k-1")
+        response = submit(api_client, other, {}, "k-1")
+
+        assert response.status_code == 201
+        assert FormSubmission.objects.count() == 2
+
+    def test_key_reused_for_another_body(
+        self, api_client, form_template, name_field, queued
+    ):
+        submit(api_client, form_template, {"name": "Ada"}, "k-1")
+
+        response = submit(api_client, form_template, {"name": "Grace"}, "k-1")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert FormSubmission.objects.count() == 1
+
+    def test_rejected_submissions_are_not_remembered(
+        self, api_client, form_template, name_field, queued
+    ):
+        assert submit(api_client, form_template, {}, "k-1").status_code == 400
+
+        response = submit(api_client, form_template, {"name": "Ada"}, "k-1")
+
+        assert response.status_code == 201
+
+    @pytest.mark.parametrize("key", ["", "x" * 256, "bad\tkey"])
+    def test_invalid_key(self, api_client, form_template, queued, key):
+        response = submit(api_client, form_template, {}, key)
+
+        assert response.status_code == 400
+        assert not FormSubmission.objects.exists()
+
+    def test_concurrent_attempt_loses_the_race(
+        self,
+        api_client,
+        form_template,
+        name_field,
+        queued,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            first = submit(api_client, form_template, {"name": "Ada"}, "k-1")
+        find_response = views.find_response
+        lookups = []
+
+        def racing_find_response(*args):
+            # The first lookup runs before the other attempt has committed.
+            lookups.append(args)
+            return None if len(lookups) == 1 else find_response(*args)
+
+        monkeypatch.setattr(views, "find_response", racing_find_response)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            retry = submit(api_client, form_template, {"name": "Ada"}, "k-1")
+
+        assert retry.status_code == 201
+        assert retry.json() == first.json()
+        assert FormSubmission.objects.count() == 1
+        assert len(queued) == 1
+
+    def test_batch(
+        self,
+        api_client,
+        form_template,
+        name_field,
+        queued,
+        django_capture_on_commit_callbacks,
+    ):
+        items = [{"name": "Ada"}, {}, {"name": "Grace"}]
+        name = "form-template-submit-batch"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            first = submit(api_client, form_template, items, "sync-1", name)
+            retry = submit(api_client, form_template, items, "sync-1", name)
+
+        assert first.status_code == 201
+        assert retry.json() == first.json()
+        assert retry["Idempotent-Replayed"] == "true"
+        assert FormSubmission.objects.count() == 2
+        assert len(queued) == 1
+
+    def test_async_view_shares_keys(
+        self, api_client, form_template, name_field, queued
+    ):
+        name = "form-template-submit-async"
+        first = submit(api_client, form_template, {"name": "Ada"}, "k-1", name)
+        retry = submit(api_client, form_template, {"name": "Ada"}, "k-1")
+        cache.clear()
+        async_retry = submit(api_client, form_template, {"name": "Ada"}, "k-1", name)
+
+        assert first.status_code == 201
+        assert retry.json() == async_retry.json() == first.json()
+        assert async_retry["Idempotent-Replayed"] == "true"
+        assert FormSubmission.objects.count() == 1
+
+    def test_write_behind(self, api_client, settings, tmp_path, form_template):
+        settings.FORMSBUILDER_WRITE_BEHIND = "spool"
+        settings.FORMSBUILDER_WRITE_BEHIND_SPOOL_DIR = str(tmp_path)
+
+        first = submit(api_client, form_template, {}, "k-1")
+        cache.clear()
+        retry = submit(api_client, form_template, {}, "k-1")
+
+        assert first.status_code == retry.status_code == 202
+        assert retry.json() == first.json()
+        assert SpoolBuffer().flush(batch_size=10) == 1
+        assert FormSubmission.objects.get().provisional_id is not None
+
+    def test_purge(self, api_client, settings, form_template, queued):
+        submit(api_client, form_template, {}, "k-1")
+        FlushedSubmission.objects.create(provisional_id=uuid.uuid4())
+        settings.FORMSBUILDER_IDEMPOTENCY_KEY_RETENTION = -1
+
+        assert purge_idempotency_keys() == 1
+        assert not IdempotencyKey.objects.exists()
+        assert not FlushedSubmission.objects.exists()
@@ -0,0 +1,142 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from formsbuilder import tasks
+from formsbuilder.metrics import (
+    CACHE_REQUESTS,
+    DB_QUERIES,
+    PHASE_DURATION,
+    REQUEST_DURATION,
+    REQUESTS,
+    RESPONSE_SIZE,
+    Counter,
+    Histogram,
+    registry,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    monkeypatch.setattr(
+        tasks.queue_submission_notifications, "delay", lambda *args: None
+    )
+
+
+class TestRendering:
+    def test_counter(self):
+        counter = Counter("requests_total", "Requests.", ("view",))
+        counter.inc(view='say "hi"')
+        counter.inc(2, view='say "hi"')
+
+        assert counter.render().splitlines() == [
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            'requests_total{view="say \\"hi\\""} 3',
+        ]
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 0.5, 5):
+            histogram.observe(value)
+
+        assert histogram.render().splitlines()[2:] == [
+            'latency_seconds_bucket{le="0.1"} 1',
+            'latency_seconds_bucket{le="1.0"} 3',
+            'latency_seconds_bucket{le="+Inf"} 4',
+            "latency_seconds_sum 6.05",
+            "latency_seconds_count 4",
+        ]
+
+
+class TestMiddleware:
+    def test_submit_is_broken_down_by_phase(self, api_client, form_template, queued):
+        url = reverse("form-template-submit-form", args=[form_template.slug])
+        response = api_client.post(url, {}, format="json")
+
+        assert response.status_code == 201
+        view = "form-template-submit-form"
+        assert REQUESTS.value(view=view, method="POST", status=201) == 1
+        assert REQUEST_DURATION.count(view=view, method="POST") == 1
+        assert DB_QUERIES.count(view=view) == 1
+        for phase in ("schema", "validate", "insert", "notify", "db"):
+            assert PHASE_DURATION.count(view=view, phase=phase) == 1
+        assert (
+            CACHE_REQUESTS.value(view=view, cache="compiled_schema", result="miss") == 1
+        )
+        assert RESPONSE_SIZE.count(view=view) == 1
+
+    def test_async_submit(self, api_client, form_template, queued):
+        url = reverse("form-template-submit-async", args=[form_template.slug])
+        api_client.post(url, {}, format="json")
+
+        view = "form-template-submit-async"
+        for phase in ("schema", "validate", "insert", "notify", "db"):
+            assert PHASE_DURATION.count(view=view, phase=phase) == 1
+
+    def test_serializer_time_and_cache_hits(self, api_client, form_template):
+        url = reverse("form-template-detail", args=[form_template.slug])
+        api_client.get(url)
+        api_client.get(url)
+
+        view = "form-template-detail"
+        assert PHASE_DURATION.count(view=view, phase="serialize") == 1
+        assert CACHE_REQUESTS.value(view=view, cache="definition", result="miss") == 1
+        assert CACHE_REQUESTS.value(view=view, cache="definition", result="hit") == 1
+
+    def test_server_timing(self, api_client, form_template, queued, settings):
+        url = reverse("form-template-submit-form", args=[form_template.slug])
+        assert "Server-Timing" not in api_client.post(url, {}, format="json")
+
+        settings.FORMSBUILDER_SERVER_TIMING = True
+        response = api_client.post(url, {}, format="json")
+
+        entries = {
+            entry.split(";")[0]: entry
+            for entry in response["Server-Timing"].split(", ")
+        }
+        assert {"total", "schema", "validate", "insert", "notify", "db"} <= set(entries)
+        assert 'desc="' in entries["db"]
+
+    def test_unrouted_requests(self, api_client):
+        api_client.get("/no-such-page/")
+
+        assert REQUESTS.value(view="unmatched", method="GET", status=404) == 1
+
+
+class TestMetricsEndpoint:
+    def test_exposes_the_metrics(self, api_client, form_template):
+        api_client.get(reverse("form-template-detail", args=[form_template.slug]))
+
+        response = api_client.get(reverse("metrics"))
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        body = response.content.decode()
+        assert (
+            'formsbuilder_requests_total{view="form-template-detail",method="GET",'
+            'status="200"} 1' in body
+        )
+        assert "# TYPE formsbuilder_request_duration_seconds histogram" in body
+
+    def test_token(self, settings):
+        settings.FORMSBUILDER_METRICS_TOKEN = "secret"
+        client = APIClient()
+
+        assert client.get(reverse("metrics")).status_code == 401
+        client.credentials(HTTP_AUTHORIZATION="Bearer secret")
+        assert client.get(reverse("metrics")).status_code == 200
+
+    def test_disabled(self, api_client, settings):
+        settings.FORMSBUILDER_METRICS_ENABLED = False
+
+        assert api_client.get(reverse("metrics")).status_code == 404
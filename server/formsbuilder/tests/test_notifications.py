@@ -0,0 +1,151 @@
+from smtplib import SMTPException
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.urls import reverse
+
+from formsbuilder import tasks
+from formsbuilder.models import FormSubmission, FormTemplate
+from formsbuilder.notifications import (
+    add_pending_submissions,
+    get_notification_recipients,
+    pop_pending_submissions,
+)
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.fixture
+def admins():
+    return [
+        User.objects.create_superuser(
+            username=f"admin{i}", email=f"admin{i}@example.com", password="pass12345"
+        )
+        for i in range(2)
+    ]
+
+
+class TestRecipients:
+    def test_recipients_are_cached(self, admins, django_assert_num_queries):
+        assert get_notification_recipients() == [
+            "admin0@example.com",
+            "admin1@example.com",
+        ]
+        with django_assert_num_queries(0):
+            get_notification_recipients()
+
+    def test_user_change_invalidates_recipients(self, admins):
+        get_notification_recipients()
+        User.objects.create_superuser(
+            username="admin2", email="admin2@example.com", password="pass12345"
+        )
+        assert "admin2@example.com" in get_notification_recipients()
+
+
+class TestPendingCounts:
+    def test_pop_returns_and_clears_pending(self, test_user, form_template):
+        other = FormTemplate.objects.create(name="Other", created_by=test_user)
+        add_pending_submissions(form_template.id, 1)
+        add_pending_submissions(form_template.id, 2)
+        add_pending_submissions(other.id, 1)
+
+        assert pop_pending_submissions() == {form_template.id: 3, other.id: 1}
+        assert pop_pending_submissions() == {}
+
+    def test_counts_are_not_kept_in_the_cache(self, form_template):
+        add_pending_submissions(form_template.id, 2)
+        cache.clear()
+
+        assert pop_pending_submissions() == {form_template.id: 2}
+
+
+class TestDigestTasks:
+    def test_queue_schedules_a_single_digest(self, monkeypatch, form_template):
+        scheduled = []
+        monkeypatch.setattr(
+            tasks.send_submission_digests,
+            "apply_async",
+            lambda **kwargs: scheduled.append(kwargs),
+        )
+
+        tasks.queue_submission_notifications(form_template.id, [1])
+        tasks.queue_submission_notifications(form_template.id, [2, 3])
+
+        assert len(scheduled) == 1
+        assert pop_pending_submissions() == {form_template.id: 3}
+
+    def test_digest_sends_one_message_per_recipient(self, admins, form_template):
+        add_pending_submissions(form_template.id, 2)
+
+        sent = tasks.send_submission_digests()
+
+        assert sent == 2
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            "admin0@example.com",
+            "admin1@example.com",
+        ]
+        assert f"- {form_template.name}: 2" in mail.outbox[0].body
+
+    def test_failed_digest_keeps_its_counts(self, admins, form_template, monkeypatch):
+        scheduled = []
+        monkeypatch.setattr(
+            tasks.send_submission_digests,
+            "apply_async",
+            lambda **kwargs: scheduled.append(kwargs),
+        )
+
+        def smtp_down(*args):
+            raise SMTPException("connection refused")
+
+        monkeypatch.setattr(tasks, "send_submission_digest", smtp_down)
+        add_pending_submissions(form_template.id, 2)
+
+        with pytest.raises(SMTPException):
+            tasks.send_submission_digests()
+
+        assert len(scheduled) == 1
+        assert pop_pending_submissions() == {form_template.id: 2}
+
+    def test_digest_without_pending_sends_nothing(self, admins):
+        assert tasks.send_submission_digests() == 0
+        assert not mail.outbox
+
+
+class TestSubmitEnqueuesNotification:
+    def test_notification_enqueued_after_commit(
+        self, api_client, form_template, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        queued = []
+        monkeypatch.setattr(
+            tasks.queue_submission_notifications,
+            "delay",
+            lambda *args: queued.append(args),
+        )
+        url = reverse("form-template-submit-form", args=[form_template.id])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(url, {}, format="json")
+            assert not queued
+
+        assert response.status_code == 201
+        assert queued == [(form_template.id, [response.data["submission_id"]])]
+        assert not mail.outbox
+
+    def test_broker_outage_does_not_fail_the_submission(
+        self, api_client, form_template, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        def broker_down(*args):
+            raise ConnectionError("broker unreachable")
+
+        monkeypatch.setattr(tasks.queue_submission_notifications, "delay", broker_down)
+        url = reverse("form-template-submit-form", args=[form_template.id])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(url, {}, format="json")
+
+        assert response.status_code == 201
+        assert FormSubmission.objects.count() == 1
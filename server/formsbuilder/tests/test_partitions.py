@@ -0,0 +1,157 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.utils import timezone as django_timezone
+
+from formsbuilder.models import FormStatistics, FormSubmission
+from formsbuilder.partitions import (
+    PartitioningError,
+    add_months,
+    archive_partitions,
+    convert_to_partitioned,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    month_start,
+    partition_month,
+    partition_name,
+    rehydrate_partition,
+)
+from formsbuilder.tasks import create_submission_partitions
+
+requires_postgresql = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Partitioning requires PostgreSQL"
+)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestMonths:
+    def test_month_start_is_utc(self):
+        moment = datetime.fromisoformat("2024-03-01T01:30:00+03:00")
+
+        assert month_start(moment) == utc(2024, 2, 1)
+
+    @pytest.mark.parametrize(
+        "count, expected",
+        [(1, utc(2025, 1, 1)), (0, utc(2024, 12, 1)), (-12, utc(2023, 12, 1))],
+    )
+    def test_add_months(self, count, expected):
+        assert add_months(utc(2024, 12, 1), count) == expected
+
+    def test_partition_names_round_trip(self):
+        name = partition_name(utc(2024, 7, 1))
+
+        assert name == "formsbuilder_formsubmission_p202407"
+        assert partition_month(name) == utc(2024, 7, 1)
+        assert partition_month(f"/archive/{name}.ndjson.gz") == utc(2024, 7, 1)
+
+    def test_default_partition_has_no_month(self):
+        with pytest.raises(PartitioningError):
+            partition_month("formsbuilder_formsubmission_default")
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor == "postgresql", reason="Not on PostgreSQL")
+class TestOutsidePostgreSQL:
+    def test_nothing_to_maintain(self):
+        assert not is_partitioned()
+        assert ensure_partitions() == []
+        assert create_submission_partitions() == []
+
+    def test_command_refuses_to_convert(self):
+        with pytest.raises(CommandError, match="PostgreSQL"):
+            call_command("submission_partitions", "convert")
+
+    def test_command_validates_months(self):
+        with pytest.raises(CommandError, match="YYYY-MM"):
+            call_command("submission_partitions", "archive", "--before", "2024")
+
+
+@requires_postgresql
+@pytest.mark.django_db
+class TestPartitionedTable:
+    @pytest.fixture
+    def months(self):
+        current = month_start(django_timezone.now())
+        return [add_months(current, offset) for offset in (-2, -1, 0, 1)]
+
+    @pytest.fixture
+    def cold_submission(self, form_template, months):
+        submission = FormSubmission.objects.create(
+            form_template=form_template, submission_data={"n": 1}
+        )
+        FormSubmission.objects.filter(pk=submission.pk).update(
+            submitted_at=months[0] + timedelta(days=3)
+        )
+        return submission
+
+    @pytest.fixture
+    def partitioned(self, cold_submission):
+        # Fire the deferred foreign key checks of the rows created above;
+        # PostgreSQL refuses to rebuild a table with checks still pending.
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        return convert_to_partitioned(months_ahead=1)
+
+    def test_convert(self, partitioned, months, form_template, cold_submission):
+        assert is_partitioned()
+        assert partitioned == [partition_name(month) for month in months]
+        assert [name for name, _, _ in list_partitions()] == partitioned
+        assert FormSubmission.objects.get().submission_data == {"n": 1}
+
+        submission = FormSubmission.objects.create(
+            form_template=form_template, submission_data={}
+        )
+
+        assert submission.pk > cold_submission.pk
+        with pytest.raises(PartitioningError, match="already partitioned"):
+            convert_to_partitioned()
+
+    def test_ensure(self, partitioned, months):
+        ahead = [add_months(months[-1], offset) for offset in (1, 2)]
+
+        assert ensure_partitions(months_ahead=3) == [
+            partition_name(month) for month in ahead
+        ]
+        assert ensure_partitions(months_ahead=3) == []
+
+    def test_archive_and_rehydrate(self, partitioned, months, tmp_path):
+        cold = partition_name(months[0])
+
+        paths = archive_partitions(months[1], tmp_path)
+
+        assert paths == [tmp_path / f"{cold}.ndjson.gz"]
+        assert cold not in {name for name, _, _ in list_partitions()}
+        assert not FormSubmission.objects.exists()
+        assert FormStatistics.objects.get().total_submissions == 0
+        with gzip.open(paths[0], "rt", encoding="utf-8") as archive:
+            rows = [json.loads(line) for line in archive]
+        assert [row["submission_data"] for row in rows] == [{"n": 1}]
+
+        assert rehydrate_partition(paths[0]) == 1
+        assert FormSubmission.objects.get().submission_data == {"n": 1}
+        assert FormStatistics.objects.get().total_submissions == 1
+        with pytest.raises(PartitioningError, match="already attached"):
+            rehydrate_partition(paths[0])
+
+    def test_archive_keeps_existing_files(self, partitioned, months, tmp_path):
+        existing = tmp_path / f"{partition_name(months[0])}.ndjson.gz"
+        existing.write_bytes(b"kept")
+
+        with pytest.raises(PartitioningError, match="already exists"):
+            archive_partitions(months[1], tmp_path)
+
+        assert existing.read_bytes() == b"kept"
+        assert FormSubmission.objects.exists()
+
+    def test_archive_needs_a_partitioned_table(self, tmp_path):
+        with pytest.raises(PartitioningError, match="not partitioned"):
+            archive_partitions(django_timezone.now(), tmp_path)
@@ -0,0 +1,256 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder import ratelimits, tasks
+from formsbuilder.metrics import RATE_LIMITED
+from formsbuilder.models import FormSubmission
+from formsbuilder.serializers import FormTemplateSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def limits(settings, monkeypatch):
+    settings.FORMSBUILDER_SUBMIT_RATE_IP = "3/min"
+    settings.FORMSBUILDER_SUBMIT_RATE_USER = "5/min"
+    settings.FORMSBUILDER_SUBMIT_RATE_FORM = "100/min"
+    clock = {"now": 1_000_000}
+    monkeypatch.setattr(ratelimits, "_now", lambda: clock["now"])
+    monkeypatch.setattr(
+        tasks.queue_submission_notifications, "delay", lambda *args: None
+    )
+    return clock
+
+
+def submit(client, template, ip="10.0.0.1", name="form-template-submit-form"):
+    return client.post(
+        reverse(name, args=[template.slug]), {}, format="json", REMOTE_ADDR=ip
+    )
+
+
+class TestRates:
+    @pytest.mark.parametrize(
+        "rate, capacity, period",
+        [
+            ("30/min", 30, 60),
+            ("1/s", 1, 1),
+            (" 10 / hour ", 10, 3600),
+            ("2/d", 2, 86400),
+        ],
+    )
+    def test_parse(self, rate, capacity, period):
+        parsed = ratelimits.parse_rate(rate)
+
+        assert (parsed.capacity, parsed.period) == (capacity, period)
+
+    @pytest.mark.parametrize("rate", ["", "30", "0/min", "30/week", "-1/s"])
+    def test_parse_invalid(self, rate):
+        with pytest.raises(ValueError):
+            ratelimits.parse_rate(rate)
+
+    def test_template_limits_are_validated(self):
+        serializer = FormTemplateSerializer(
+            data={
+                "name": "Limited",
+                "rate_limits": {"ip": "often", "form": None, "planet": "1/s"},
+            }
+        )
+
+        assert not serializer.is_valid()
+        assert set(serializer.errors["rate_limits"]) == {"ip", "planet"}
+
+
+class TestSubmitLimits:
+    def test_burst_then_retry_after(self, api_client, form_template, limits):
+        for _ in range(3):
+            assert submit(api_client, form_template).status_code == 201
+
+        response = submit(api_client, form_template)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response["Retry-After"] == "20"
+        assert FormSubmission.objects.count() == 3
+        assert submit(api_client, form_template, ip="10.0.0.2").status_code == 201
+
+        limits["now"] += 20_000
+        assert submit(api_client, form_template).status_code == 201
+        assert submit(api_client, form_template).status_code == 429
+
+    def test_idle_bucket_refills_completely(self, api_client, form_template, limits):
+        for _ in range(3):
+            submit(api_client, form_template)
+        limits["now"] += 10 * 60_000
+
+        for _ in range(3):
+            assert submit(api_client, form_template).status_code == 201
+        assert submit(api_client, form_template).status_code == 429
+
+    def test_rejected_without_queries(
+        self, api_client, form_template, django_assert_num_queries
+    ):
+        for _ in range(3):
+            submit(api_client, form_template)
+
+        with django_assert_num_queries(0):
+            response = submit(api_client, form_template)
+
+        assert response.status_code == 429
+
+    def test_form_bucket_is_shared(self, api_client, settings, form_template):
+        settings.FORMSBUILDER_SUBMIT_RATE_FORM = "4/min"
+        for number in range(4):
+            response = submit(api_client, form_template, ip=f"10.0.1.{number}")
+            assert response.status_code == 201
+
+        assert submit(api_client, form_template, ip="10.0.2.1").status_code == 429
+
+    def test_user_bucket_follows_the_user(
+        self, authenticated_client, settings, form_template
+    ):
+        settings.FORMSBUILDER_SUBMIT_RATE_IP = ""
+        for number in range(5):
+            response = submit(
+                authenticated_client, form_template, ip=f"10.0.1.{number}"
+            )
+            assert response.status_code == 201
+
+        assert submit(authenticated_client, form_template).status_code == 429
+
+    def test_template_overrides(self, api_client, form_template):
+        form_template.rate_limits = {"ip": "1/min", "form": None}
+        form_template.save()
+
+        assert submit(api_client, form_template).status_code == 201
+        assert submit(api_client, form_template).status_code == 429
+
+        form_template.rate_limits = {"ip": None}
+        form_template.save()
+        for _ in range(5):
+            assert submit(api_client, form_template).status_code == 201
+
+    def test_rate_limits_are_not_published(self, api_client, form_template):
+        form_template.rate_limits = {"ip": "1/min"}
+        form_template.save()
+
+        response = api_client.get(
+            reverse("form-template-detail", args=[form_template.slug])
+        )
+
+        assert "rate_limits" not in response.json()
+
+    def test_batches_have_buckets_of_their_own(self, api_client, form_template):
+        for _ in range(3):
+            submit(api_client, form_template)
+        url = reverse("form-template-submit-batch", args=[form_template.slug])
+
+        response = api_client.post(url, [{}] * 3, format="json", REMOTE_ADDR="10.0.0.1")
+
+        assert response.status_code == 201
+        assert submit(api_client, form_template).status_code == 429
+
+    def test_large_batch_within_the_default_limits(self, api_client, form_template):
+        url = reverse("form-template-submit-batch", args=[form_template.slug])
+
+        response = api_client.post(url, [{}] * 500, format="json")
+
+        assert response.status_code == 201
+        assert FormSubmission.objects.count() == 500
+
+    def test_batch_takes_a_token_per_item(self, api_client, settings, form_template):
+        settings.FORMSBUILDER_BATCH_RATE_IP = "3/min"
+        url = reverse("form-template-submit-batch", args=[form_template.slug])
+
+        assert api_client.post(url, [{}] * 3, format="json").status_code == 201
+        response = api_client.post(url, [{}], format="json")
+
+        assert response.status_code == 429
+        assert RATE_LIMITED.value(scope="batch_ip") >= 1
+
+    def test_batch_larger_than_a_bucket(self, api_client, settings, form_template):
+        settings.FORMSBUILDER_BATCH_RATE_IP = "3/min"
+        url = reverse("form-template-submit-batch", args=[form_template.slug])
+
+        response = api_client.post(url, [{}] * 4, format="json")
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert response.json()["max_items"] == 3
+        assert not FormSubmission.objects.exists()
+
+    def test_template_overrides_batch_scopes(self, api_client, form_template):
+        form_template.rate_limits = {"batch_ip": "2/min"}
+        form_template.save()
+        url = reverse("form-template-submit-batch", args=[form_template.slug])
+
+        response = api_client.post(url, [{}] * 3, format="json")
+
+        assert response.status_code == 413
+        assert response.json()["max_items"] == 2
+
+    @pytest.mark.parametrize(
+        "name, body",
+        [
+            ("form-template-submit-form", {}),
+            ("form-template-submit-batch", [{}]),
+            ("form-template-submit-async", {}),
+        ],
+    )
+    def test_replays_take_no_tokens(
+        self, api_client, settings, form_template, name, body
+    ):
+        settings.FORMSBUILDER_BATCH_RATE_IP = "3/min"
+        url = reverse(name, args=[form_template.slug])
+        for _ in range(4):
+            response = api_client.post(
+                url, body, format="json", HTTP_IDEMPOTENCY_KEY="retry-1"
+            )
+            assert response.status_code == 201
+
+        assert api_client.post(url, body, format="json").status_code == 201
+
+    @pytest.mark.parametrize(
+        "name, body",
+        [("form-template-submit-form", {}), ("form-template-submit-batch", [{}])],
+    )
+    def test_fresh_keys_are_limited_before_the_key_lookup(
+        self, api_client, settings, django_assert_num_queries, form_template, name, body
+    ):
+        settings.FORMSBUILDER_BATCH_RATE_IP = "3/min"
+        url = reverse(name, args=[form_template.slug])
+        for index in range(3):
+            response = api_client.post(
+                url, body, format="json", HTTP_IDEMPOTENCY_KEY=f"fresh-{index}"
+            )
+            assert response.status_code == 201
+
+        with django_assert_num_queries(0):
+            response = api_client.post(
+                url, body, format="json", HTTP_IDEMPOTENCY_KEY="fresh-3"
+            )
+
+        assert response.status_code == 429
+
+    def test_async_view(self, api_client, form_template):
+        name = "form-template-submit-async"
+        for _ in range(3):
+            assert submit(api_client, form_template, name=name).status_code == 201
+
+        sync = submit(api_client, form_template)
+        response = submit(api_client, form_template, name=name)
+
+        assert response.status_code == 429
+        assert response["Retry-After"] == sync["Retry-After"]
+        assert response.json() == sync.json()
+
+    def test_disabled(self, api_client, settings, form_template):
+        settings.FORMSBUILDER_RATE_LIMITS_ENABLED = False
+
+        for _ in range(5):
+            assert submit(api_client, form_template).status_code == 201
+
+    def test_counted_by_scope(self, api_client, form_template):
+        before = RATE_LIMITED.value(scope="ip")
+        for _ in range(4):
+            submit(api_client, form_template)
+
+        assert RATE_LIMITED.value(scope="ip") == before + 1
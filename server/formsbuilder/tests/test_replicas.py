@@ -0,0 +1,151 @@
+import sqlite3
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from formsbuilder import tasks
+from formsbuilder.models import FormSubmission, FormTemplate
+from formsbuilder.replicas import (
+    REPLICA_ALIAS,
+    ReplicaRouter,
+    primary_reads,
+    replica_reads,
+)
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    monkeypatch.setitem(
+        connections.settings, "replica", connections.settings["default"]
+    )
+
+
+class TestReplicaRouter:
+    def test_reads_go_to_the_replica_only_when_asked(self, replica):
+        router = ReplicaRouter()
+
+        assert router.db_for_read(FormTemplate) is None
+        with replica_reads():
+            assert router.db_for_read(FormTemplate) == REPLICA_ALIAS
+            with primary_reads():
+                assert router.db_for_read(FormTemplate) is None
+        assert router.db_for_write(FormTemplate) == "default"
+
+    def test_without_a_replica(self):
+        with replica_reads():
+            assert ReplicaRouter().db_for_read(FormTemplate) is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_transactions_read_from_the_primary(self, replica):
+        with replica_reads(), transaction.atomic():
+            assert ReplicaRouter().db_for_read(FormTemplate) is None
+
+    def test_replica_is_never_migrated(self):
+        assert not ReplicaRouter().allow_migrate("replica", "formsbuilder")
+        assert ReplicaRouter().allow_migrate("default", "formsbuilder")
+
+
+@pytest.fixture(scope="class")
+def replica_alias(tmp_path_factory):
+    """A second SQLite database, registered before the test's databases are."""
+    path = tmp_path_factory.mktemp("replica") / "replica.sqlite3"
+    primary = connections["default"]
+    connections.settings[REPLICA_ALIAS] = {**primary.settings_dict, "NAME": str(path)}
+    yield path
+    connections[REPLICA_ALIAS].close()
+    del connections[REPLICA_ALIAS]
+    del connections.settings[REPLICA_ALIAS]
+
+
+@pytest.fixture
+def lagging_replica(replica_alias):
+    """Make the replica a copy of the primary as it is now."""
+    connections[REPLICA_ALIAS].close()
+    primary = connections["default"]
+    primary.ensure_connection()
+    copy = sqlite3.connect(replica_alias)
+    primary.connection.backup(copy)
+    copy.close()
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="The replica is copied with SQLite's backup"
+)
+@pytest.mark.usefixtures("replica_alias")
+@pytest.mark.django_db(transaction=True, databases=["default", REPLICA_ALIAS])
+class TestTwoDatabases:
+    @pytest.fixture
+    def setup(self, authenticated_client, form_template):
+        FormSubmission.objects.create(form_template=form_template, submission_data={})
+
+    @pytest.fixture
+    def late_submission(self, setup, lagging_replica, form_template):
+        # Written after the copy: only the primary has it.
+        return FormSubmission.objects.create(
+            form_template=form_template, submission_data={}
+        )
+
+    def listed(self, client, form_template):
+        url = reverse("form-template-submissions", args=[form_template.slug])
+        return len(client.get(url).data["results"])
+
+    def test_reads_come_from_the_replica(
+        self, authenticated_client, form_template, late_submission
+    ):
+        assert self.listed(authenticated_client, form_template) == 1
+        response = authenticated_client.get(
+            reverse("form-submission-list"), {"form_template": form_template.pk}
+        )
+        assert len(response.data["results"]) == 1
+        export = authenticated_client.get(
+            reverse("form-template-export", args=[form_template.slug]),
+            {"export_format": "ndjson"},
+        )
+        assert len(b"".join(export.streaming_content).splitlines()) == 1
+
+    def test_writes_and_unlisted_actions_use_the_primary(
+        self, authenticated_client, form_template, late_submission
+    ):
+        response = authenticated_client.get(
+            reverse("form-submission-detail", args=[late_submission.pk])
+        )
+        assert response.status_code == 404  # not replicated yet
+
+        authenticated_client.patch(
+            reverse("form-template-detail", args=[form_template.slug]),
+            {"description": "Updated"},
+            format="json",
+        )
+
+        assert FormTemplate.objects.get().description == "Updated"
+
+    def test_reads_stick_to_the_primary_after_a_write(
+        self, authenticated_client, form_template, late_submission
+    ):
+        authenticated_client.patch(
+            reverse("form-template-detail", args=[form_template.slug]),
+            {"description": "Updated"},
+            format="json",
+        )
+
+        assert self.listed(authenticated_client, form_template) == 2
+
+        cache.clear()  # the sticky window is over
+        assert self.listed(authenticated_client, form_template) == 1
+
+    def test_other_clients_are_not_pinned(
+        self, authenticated_client, form_template, late_submission, monkeypatch
+    ):
+        monkeypatch.setattr(
+            tasks.queue_submission_notifications, "delay", lambda *args: None
+        )
+        APIClient().post(
+            reverse("form-template-submit-form", args=[form_template.slug]),
+            {},
+            format="json",
+        )
+
+        assert self.listed(authenticated_client, form_template) == 1
@@ -0,0 +1,110 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from formsbuilder.models import FormField, FormFieldOption, FormSubmission, FormTemplate
+from formsbuilder.versions import freeze_template_version
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def templates(test_user, form_template, form_field_option):
+    select = FormField.objects.create(
+        form_template=form_template,
+        field_name="colour",
+        label="Colour",
+        widget_type="select",
+        order=0,
+        widget_config={"multiple": False},
+        validation_rules={"min_length": 1},
+        conditional_logic={
+            "action": "show",
+            "conditions": [{"field": "test_field", "operator": "equals", "value": "x"}],
+        },
+    )
+    for order, value in [(2, "blue"), (1, "red"), (1, "green")]:
+        FormFieldOption.objects.create(
+            form_field=select, value=value, label=value.title(), order=order
+        )
+    # No creator, no fields.
+    FormTemplate.objects.create(name="Empty", category="misc")
+    return form_template
+
+
+@pytest.fixture
+def submissions(templates, form_submission):
+    version_id, _ = freeze_template_version(templates.pk, [])
+    FormSubmission.objects.create(
+        form_template=templates,
+        template_version_id=version_id,
+        submission_data={"colour": ["red", "green"], "nested": {"a": 1.5}},
+        ip_address="::1",
+    )
+    FormSubmission.objects.create(form_template=templates, submission_data={})
+
+
+def both_ways(client, settings, url, params=None):
+    responses = []
+    for fast in (False, True):
+        settings.FORMSBUILDER_FAST_SERIALIZERS = fast
+        cache.clear()
+        response = client.get(url, params)
+        assert response.status_code == 200
+        responses.append(response.content)
+    return responses
+
+
+class TestFastSerializers:
+    def test_template_list(self, api_client, settings, templates):
+        slow, fast = both_ways(api_client, settings, reverse("form-template-list"))
+
+        assert fast == slow
+        assert b'"options":[{"id"' in fast
+
+    def test_template_detail(self, api_client, settings, templates):
+        url = reverse("form-template-detail", args=[templates.slug])
+
+        slow, fast = both_ways(api_client, settings, url)
+
+        assert fast == slow
+
+    def test_template_submissions(self, api_client, settings, submissions, templates):
+        url = reverse("form-template-submissions", args=[templates.slug])
+
+        slow, fast = both_ways(api_client, settings, url, {"page_size": 2})
+
+        assert fast == slow
+        assert b'"next":"http' in fast
+
+    def test_submission_list(self, authenticated_client, settings, submissions):
+        slow, fast = both_ways(
+            authenticated_client, settings, reverse("form-submission-list")
+        )
+
+        assert fast == slow
+
+    def test_local_time_zone(self, api_client, settings, submissions, templates):
+        settings.TIME_ZONE = "Africa/Nairobi"
+        url = reverse("form-template-submissions", args=[templates.slug])
+
+        slow, fast = both_ways(api_client, settings, url)
+
+        assert fast == slow
+        assert b"+03:00" in fast
+
+    def test_template_detail_queries(
+        self, api_client, templates, django_assert_num_queries
+    ):
+        for field_number in range(20):
+            FormField.objects.create(
+                form_template=templates,
+                field_name=f"extra_{field_number}",
+                label="Extra",
+                widget_type="text",
+            )
+        url = reverse("form-template-detail", args=[templates.slug])
+
+        # Lookup, version, template, fields and options.
+        with django_assert_num_queries(5):
+            api_client.get(url)
@@ -0,0 +1,122 @@
+import pytest
+from django.http import Http404
+
+from formsbuilder.models import FormField, FormFieldOption
+from formsbuilder.schema import (
+    FormSchema,
+    SchemaLRU,
+    get_form_schema,
+    local_schemas,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+class TestFormSchema:
+    def test_fields_are_ordered_and_required_set_built(self, form_template):
+        FormField.objects.create(
+            form_template=form_template,
+            field_name="second",
+            label="Second",
+            widget_type="text",
+            order=2,
+        )
+        FormField.objects.create(
+            form_template=form_template,
+            field_name="first",
+            label="First",
+            widget_type="text",
+            is_required=True,
+            order=1,
+        )
+
+        schema = get_form_schema(form_template.slug)
+
+        assert isinstance(schema, FormSchema)
+        assert schema.template_id == form_template.id
+        assert [field.field_name for field in schema.fields] == ["first", "second"]
+        assert schema.required_field_names == {"first"}
+
+    def test_missing_required_field_respects_conditions(self, form_template):
+        FormField.objects.create(
+            form_template=form_template,
+            field_name="reason",
+            label="Reason",
+            widget_type="text",
+            is_required=True,
+            conditional_logic={
+                "action": "show",
+                "conditions": [
+                    {"field": "attending", "operator": "equals", "value": "no"}
+                ],
+            },
+        )
+        schema = get_form_schema(form_template.id)
+
+        assert schema.missing_required_field({"attending": "yes"}) is None
+        assert schema.missing_required_field({"attending": "no"}).label == "Reason"
+
+    def test_lookup_by_slug_and_pk_share_schema(
+        self, form_template, django_assert_num_queries
+    ):
+        schema = get_form_schema(form_template.slug)
+
+        with django_assert_num_queries(0):
+            assert get_form_schema(form_template.slug) is schema
+
+        assert get_form_schema(form_template.id) is schema
+
+    def test_unknown_lookup_raises_404(self):
+        with pytest.raises(Http404):
+            get_form_schema("does-not-exist")
+
+    def test_field_change_invalidates_schema(self, form_template, form_field):
+        schema = get_form_schema(form_template.slug)
+        assert not schema.required_field_names
+
+        form_field.is_required = True
+        form_field.save()
+
+        updated = get_form_schema(form_template.slug)
+        assert updated is not schema
+        assert updated.version != schema.version
+        assert updated.required_field_names == {form_field.field_name}
+
+    def test_option_change_bumps_template_version(self, form_template, form_field):
+        schema = get_form_schema(form_template.slug)
+
+        FormFieldOption.objects.create(form_field=form_field, value="a", label="A")
+
+        assert get_form_schema(form_template.slug).version != schema.version
+
+    def test_template_delete_invalidates_schema(self, form_template):
+        get_form_schema(form_template.slug)
+        form_template.delete()
+
+        assert len(local_schemas) == 0
+        with pytest.raises(Http404):
+            get_form_schema(form_template.slug)
+
+
+class TestSchemaLRU:
+    def test_evicts_least_recently_used(self):
+        lru = SchemaLRU(maxsize=2)
+        lru.set((1, "a"), "one")
+        lru.set((2, "a"), "two")
+        lru.get((1, "a"))
+        lru.set((3, "a"), "three")
+
+        assert lru.get((2, "a")) is None
+        assert lru.get((1, "a")) == "one"
+        assert lru.get((3, "a")) == "three"
+
+    def test_evict_template_drops_all_versions(self):
+        lru = SchemaLRU(maxsize=4)
+        lru.set((1, "a"), "old")
+        lru.set((1, "b"), "new")
+        lru.set((2, "a"), "other")
+
+        lru.evict_template(1)
+
+        assert len(lru) == 1
+        assert lru.get((2, "a")) == "other"
@@ -1,6 +1,6 @@
 import pytest
 
-from formsbuilder.models import FormFieldOption
+from formsbuilder.models import FormField, FormFieldOption, FormTemplate
 from formsbuilder.serializers import (
     FormFieldOptionSerializer,
     FormFieldSerializer,
@@ -34,6 +34,169 @@ class TestFormTemplateSerializer:
         assert form_template.slug == "new-test-form"
 
 
+def _field_payload(name, order, **extra):
+    return {
+        "field_name": name,
+        "label": name.title(),
+        "widget_type": "text",
+        "order": order,
+        **extra,
+    }
+
+
+class TestFormTemplateFieldSync:
+    @pytest.fixture
+    def synced_template(self):
+        serializer = FormTemplateSerializer(
+            data={
+                "name": "Synced Form",
+                "fields_data": [
+                    _field_payload("first", 1),
+                    _field_payload(
+                        "colour",
+                        2,
+                        widget_type="select",
+                        options=[
+                            {"value": "red", "label": "Red", "order": 1},
+                            {"value": "blue", "label": "Blue", "order": 2},
+                        ],
+                    ),
+                    _field_payload("obsolete", 3),
+                ],
+            }
+        )
+        assert serializer.is_valid(), serializer.errors
+        return serializer.save()
+
+    def _update(self, template, fields_data):
+        serializer = FormTemplateSerializer(
+            template, data={"name": template.name, "fields_data": fields_data}
+        )
+        assert serializer.is_valid(), serializer.errors
+        return serializer.save()
+
+    def test_update_keeps_ids_of_matching_fields_and_options(self, synced_template):
+        first = synced_template.fields.get(field_name="first")
+        colour = synced_template.fields.get(field_name="colour")
+        red = colour.options.get(value="red")
+
+        self._update(
+            synced_template,
+            [
+                _field_payload("first", 1, label="First name"),
+                _field_payload(
+                    "colour",
+                    2,
+                    widget_type="select",
+                    options=[
+                        {"value": "red", "label": "Crimson", "order": 1},
+                        {"value": "green", "label": "Green", "order": 2},
+                    ],
+                ),
+                _field_payload("added", 3),
+            ],
+        )
+
+        fields = {field.field_name: field for field in synced_template.fields.all()}
+        assert set(fields) == {"first", "colour", "added"}
+        assert fields["first"].pk == first.pk
+        assert fields["first"].label == "First name"
+        assert fields["colour"].pk == colour.pk
+        options = {option.value: option for option in fields["colour"].options.all()}
+        assert set(options) == {"red", "green"}
+        assert options["red"].pk == red.pk
+        assert options["red"].label == "Crimson"
+
+    def test_field_matched_by_id_can_be_renamed(self, synced_template):
+        first = synced_template.fields.get(field_name="first")
+
+        self._update(synced_template, [_field_payload("renamed", 1, id=first.pk)])
+
+        assert list(synced_template.fields.values_list("pk", "field_name")) == [
+            (first.pk, "renamed")
+        ]
+
+    def test_unchanged_payload_issues_no_field_writes(
+        self, synced_template, django_assert_max_num_queries
+    ):
+        fields_data = FormTemplateSerializer(synced_template).data["fields"]
+        ids = sorted(FormField.objects.values_list("pk", flat=True))
+
+        # Template update (and its pre_save read of ``is_active``), field/option
+        # reads, one DELETE for the dropped field and the version bump; the two
+        # unchanged fields are never written.
+        with django_assert_max_num_queries(13):
+            self._update(synced_template, fields_data[:2])
+
+        assert sorted(FormField.objects.values_list("pk", flat=True)) == ids[:2]
+
+    def test_query_count_does_not_grow_with_field_count(
+        self, synced_template, django_assert_max_num_queries
+    ):
+        fields_data = [
+            _field_payload(
+                f"field_{i}",
+                i,
+                options=[
+                    {"value": f"v{j}", "label": f"V{j}", "order": j} for j in range(5)
+                ],
+            )
+            for i in range(200)
+        ]
+
+        # SQLite caps bound parameters, so bulk inserts are split in a few
+        # batches; still a handful of queries for 1200 rows.
+        with django_assert_max_num_queries(25):
+            self._update(synced_template, fields_data)
+
+        assert synced_template.fields.count() == 200
+        assert (
+            FormFieldOption.objects.filter(
+                form_field__form_template=synced_template
+            ).count()
+            == 1000
+        )
+
+    def test_duplicate_field_names_are_rejected(self):
+        serializer = FormTemplateSerializer(
+            data={
+                "name": "Duplicates",
+                "fields_data": [_field_payload("a", 1), _field_payload("a", 2)],
+            }
+        )
+        assert not serializer.is_valid()
+        assert "fields_data" in serializer.errors
+        assert not FormTemplate.objects.filter(name="Duplicates").exists()
+
+    @pytest.mark.parametrize(
+        "field_data",
+        [{"label": "B"}, {"field_name": "first", "label": "B"}],
+    )
+    def test_patch_requires_complete_fields(self, synced_template, field_data):
+        first = synced_template.fields.get(field_name="first")
+        serializer = FormTemplateSerializer(
+            synced_template, data={"fields_data": [field_data]}, partial=True
+        )
+
+        assert not serializer.is_valid()
+        assert "widget_type" in serializer.errors["fields_data"][0]
+        first.refresh_from_db()
+        assert (first.label, first.widget_type) == ("First", "text")
+
+    def test_patch_with_complete_fields(self, synced_template):
+        serializer = FormTemplateSerializer(
+            synced_template,
+            data={"fields_data": [_field_payload("first", 1, label="B")]},
+            partial=True,
+        )
+
+        assert serializer.is_valid(), serializer.errors
+        serializer.save()
+        assert list(synced_template.fields.values_list("field_name", "label")) == [
+            ("first", "B")
+        ]
+
+
 class TestFormFieldSerializer:
     def test_serialize_form_field(self, form_field):
         serializer = FormFieldSerializer(form_field)
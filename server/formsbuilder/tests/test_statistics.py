@@ -0,0 +1,201 @@
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder.models import (
+    FormStatistics,
+    FormSubmission,
+    FormTemplate,
+    FormTemplateStatistics,
+)
+from formsbuilder.statistics import (
+    get_site_statistics,
+    reconcile_statistics,
+    record_submissions,
+)
+from formsbuilder.tasks import reconcile_form_statistics
+
+pytestmark = pytest.mark.django_db
+
+seed_statistics = import_module(
+    "formsbuilder.migrations.0005_form_statistics"
+).seed_statistics
+
+
+def site_counters():
+    statistics = get_site_statistics()
+    return (
+        statistics.total_forms,
+        statistics.active_forms,
+        statistics.total_submissions,
+    )
+
+
+class TestCounters:
+    def test_template_lifecycle(self, test_user):
+        template = FormTemplate.objects.create(name="Survey", created_by=test_user)
+        assert site_counters() == (1, 1, 0)
+
+        template.is_active = False
+        template.save()
+        assert site_counters() == (1, 0, 0)
+
+        template.name = "Renamed survey"
+        template.save()
+        assert site_counters() == (1, 0, 0)
+
+        template.delete()
+        assert site_counters() == (0, 0, 0)
+
+    def test_submissions_are_counted_per_template(self, form_template, test_user):
+        for _ in range(3):
+            FormSubmission.objects.create(
+                form_template=form_template, submission_data={}
+            )
+
+        statistics = FormTemplateStatistics.objects.get(pk=form_template.pk)
+        assert statistics.submission_count == 3
+        assert statistics.last_submitted_at == (
+            FormSubmission.objects.latest("submitted_at").submitted_at
+        )
+        assert site_counters() == (1, 1, 3)
+
+    def test_deleting_a_template_drops_its_submissions(
+        self, form_template, form_submission
+    ):
+        form_template.delete()
+
+        assert site_counters() == (0, 0, 0)
+
+    def test_deleting_a_submission_through_the_api(
+        self, authenticated_client, form_submission
+    ):
+        url = reverse("form-submission-detail", args=[form_submission.pk])
+
+        response = authenticated_client.delete(url)
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert site_counters() == (1, 1, 0)
+
+    def test_batch_submissions_are_counted(self, api_client, form_template):
+        url = reverse("form-template-submit-batch", args=[form_template.slug])
+
+        response = api_client.post(url, [{}, {}, {}], format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert site_counters() == (1, 1, 3)
+
+
+class TestReconcile:
+    def test_repairs_drift(self, form_template, form_submission):
+        FormStatistics.objects.update(total_submissions=42, active_forms=0)
+        FormTemplateStatistics.objects.all().delete()
+
+        reconcile_statistics()
+
+        assert site_counters() == (1, 1, 1)
+        statistics = FormTemplateStatistics.objects.get(pk=form_template.pk)
+        assert statistics.submission_count == 1
+        assert statistics.last_submitted_at == form_submission.submitted_at
+
+    def test_keeps_submissions_made_while_counting(
+        self, form_template, form_submission, monkeypatch
+    ):
+        FormStatistics.objects.update(total_submissions=42)
+        snapshot = import_module("formsbuilder.statistics")._snapshot
+
+        def snapshot_then_submit():
+            taken = snapshot()
+            FormSubmission.objects.create(
+                form_template=form_template, submission_data={}
+            )
+            return taken
+
+        monkeypatch.setattr("formsbuilder.statistics._snapshot", snapshot_then_submit)
+
+        reconcile_statistics()
+
+        assert site_counters() == (1, 1, 2)
+        statistics = FormTemplateStatistics.objects.get(pk=form_template.pk)
+        assert statistics.submission_count == 2
+        assert statistics.last_submitted_at == (
+            FormSubmission.objects.latest("submitted_at").submitted_at
+        )
+
+    def test_builds_missing_rows(self, form_template, form_submission):
+        FormStatistics.objects.all().delete()
+
+        assert site_counters() == (1, 1, 1)
+
+    def test_first_write_does_not_reconcile(self, form_template):
+        FormStatistics.objects.all().delete()
+        FormTemplateStatistics.objects.all().delete()
+
+        record_submissions(form_template.pk, 2)
+
+        statistics = FormStatistics.objects.get()
+        assert (statistics.total_submissions, statistics.reconciled_at) == (2, None)
+        assert FormTemplateStatistics.objects.get().submission_count == 2
+
+    def test_migration_seeds_the_counters(self, form_template, form_submission):
+        FormStatistics.objects.all().delete()
+        FormTemplateStatistics.objects.all().delete()
+
+        seed_statistics(apps, None)
+
+        assert site_counters() == (1, 1, 1)
+        statistics = FormTemplateStatistics.objects.get(pk=form_template.pk)
+        assert statistics.submission_count == 1
+        assert statistics.last_submitted_at == form_submission.submitted_at
+
+    def test_task(self, form_template):
+        FormStatistics.objects.update(total_forms=7)
+
+        assert reconcile_form_statistics() == {
+            "total_forms": 1,
+            "active_forms": 1,
+            "total_submissions": 0,
+        }
+
+
+class TestStatisticsEndpoints:
+    def test_list_reads_only_the_counters_row(
+        self, authenticated_client, form_submission, django_assert_num_queries
+    ):
+        url = reverse("form-statistics-list")
+
+        # One lookup for the authenticated user, one for the counters.
+        with django_assert_num_queries(2):
+            response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {
+            "total_forms": 1,
+            "active_forms": 1,
+            "total_submissions": 1,
+        }
+
+    def test_retrieve(self, authenticated_client, form_template, form_submission):
+        url = reverse("form-statistics-detail", args=[form_template.pk])
+
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["slug"] == form_template.slug
+        assert response.data["submission_count"] == 1
+
+    def test_forms(self, authenticated_client, form_template, form_submission):
+        url = reverse("form-statistics-forms")
+
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row["form_template"] for row in response.data] == [form_template.pk]
+
+    def test_requires_authentication(self, api_client):
+        response = api_client.get(reverse("form-statistics-list"))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,176 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder.models import FormField, FormFieldOption, FormSubmission
+from formsbuilder.serializers import FormFieldSerializer
+from formsbuilder.validators import (
+    REQUIRED_MESSAGE,
+    VALIDATORS,
+    FieldValidator,
+    parse_rules,
+    register,
+)
+
+
+def _validator(widget_type, rules=None, options=None, is_required=False):
+    return FieldValidator(
+        {
+            "widget_type": widget_type,
+            "validation_rules": rules or {},
+            "is_required": is_required,
+            "options": [
+                {"value": value, "label": str(value)} for value in options or []
+            ],
+        }
+    )
+
+
+class TestParseRules:
+    def test_builder_keys_are_normalised(self):
+        rules, errors = parse_rules(
+            {"minLength": "2", "maxValue": 10, "pattern": "^a", "custom": 1}
+        )
+        assert not errors
+        assert rules["min_length"] == 2
+        assert rules["max_value"] == 10.0
+        assert rules["pattern"].pattern == "^a"
+        assert rules["custom"] == 1
+
+    def test_invalid_rules_are_reported(self):
+        _, errors = parse_rules(
+            {"maxLength": "many", "pattern": "(", "minValue": 10**400}
+        )
+        assert set(errors) == {"maxLength", "pattern", "minValue"}
+
+
+class TestFieldValidator:
+    @pytest.mark.parametrize(
+        "widget_type, rules, options, value, valid",
+        [
+            ("text", {"minLength": 2, "maxLength": 4}, None, "abc", True),
+            ("text", {"minLength": 2}, None, "a", False),
+            ("text", {"maxLength": 4}, None, "abcde", False),
+            ("text", {}, None, {"nested": 1}, False),
+            ("text", {"pattern": "[A-Z]{3}"}, None, "ABC", True),
+            ("text", {"pattern": "[A-Z]{3}"}, None, "ABCD", False),
+            ("email", {}, None, "a@example.com", True),
+            ("email", {}, None, "not-an-email", False),
+            ("url", {}, None, "https://example.com/x", True),
+            ("url", {}, None, "example", False),
+            ("phone", {}, None, "+254 706 567 060", True),
+            ("phone", {}, None, "call me", False),
+            ("number", {"minValue": 1, "maxValue": 10}, None, "5", True),
+            ("number", {"minValue": 1}, None, 0, False),
+            ("number", {}, None, "nan", False),
+            ("number", {}, None, True, False),
+            ("number", {}, None, 10**400, False),
+            ("date", {"minValue": "2024-01-01"}, None, "2024-06-01", True),
+            ("date", {"minValue": "2024-01-01"}, None, "2023-12-31", False),
+            ("date", {}, None, "2024-13-01", False),
+            ("datetime", {}, None, "2024-06-01T10:00:00Z", True),
+            ("select", {}, ["a", "b"], "a", True),
+            ("select", {}, ["a", "b"], "c", False),
+            ("radio", {}, ["a"], ["a"], False),
+            ("multi_select", {}, ["a", "b"], ["a", "b"], True),
+            ("multi_select", {}, ["a", "b"], ["a", "z"], False),
+            ("checkbox", {}, None, True, True),
+            ("checkbox", {}, None, "maybe", False),
+            ("checkbox", {}, ["x", "y"], ["y"], True),
+            ("file", {"maxFiles": 1}, None, ["a.png", "b.png"], False),
+        ],
+    )
+    def test_widget_validation(self, widget_type, rules, options, value, valid):
+        assert (_validator(widget_type, rules, options)(value) is None) is valid
+
+    def test_empty_values(self):
+        assert _validator("number")("") is None
+        assert _validator("number", is_required=True)("") == REQUIRED_MESSAGE
+
+    def test_registry_is_extensible(self, monkeypatch):
+        monkeypatch.setitem(VALIDATORS, "colour", None)
+        register("colour")(
+            lambda spec, rules: [
+                lambda value: None if value.startswith("#") else "Enter a hex colour."
+            ]
+        )
+        assert _validator("colour")("#fff") is None
+        assert _validator("colour")("red") == "Enter a hex colour."
+
+
+@pytest.mark.django_db
+class TestSubmitValidation:
+    @pytest.fixture
+    def url(self, form_template):
+        FormField.objects.create(
+            form_template=form_template,
+            field_name="age",
+            label="Age",
+            widget_type="number",
+            validation_rules={"minValue": 18},
+        )
+        colour = FormField.objects.create(
+            form_template=form_template,
+            field_name="colour",
+            label="Colour",
+            widget_type="select",
+        )
+        FormFieldOption.objects.create(form_field=colour, value="red", label="Red")
+        return reverse("form-template-submit-form", args=[form_template.id])
+
+    def test_valid_submission_is_stored(self, api_client, url):
+        response = api_client.post(url, {"age": "30", "colour": "red"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_invalid_values_are_rejected(self, api_client, url):
+        response = api_client.post(
+            url, {"age": "12", "colour": "blue", "extra": 1}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.data["errors"]) == {"age", "colour", "extra"}
+        assert not FormSubmission.objects.exists()
+
+    @pytest.mark.parametrize(
+        "name", ["form-template-submit-form", "form-template-submit-async"]
+    )
+    def test_huge_integer_is_not_a_number(self, api_client, form_template, url, name):
+        url = reverse(name, args=[form_template.id])
+        response = api_client.post(
+            url,
+            b'{"age": 1%s, "colour": "red"}' % (b"0" * 400),
+            content_type="application/json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["errors"] == {"age": ["Enter a number."]}
+
+    def test_undeclared_fields_can_be_allowed(self, api_client, url, settings):
+        settings.FORMSBUILDER_REJECT_UNDECLARED_FIELDS = False
+        response = api_client.post(url, {"extra": 1}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_non_object_payload_is_rejected(self, api_client, url):
+        response = api_client.post(url, ["age"], format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_oversize_payload_is_rejected_before_lookup(
+        self, api_client, settings, django_assert_num_queries
+    ):
+        settings.FORMSBUILDER_MAX_SUBMISSION_BYTES = 10
+        url = reverse("form-template-submit-form", args=["any-form"])
+        with django_assert_num_queries(0):
+            response = api_client.post(url, {"age": "x" * 20}, format="json")
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    def test_invalid_rules_are_rejected_when_saving_fields(self):
+        serializer = FormFieldSerializer(
+            data={
+                "field_name": "a",
+                "label": "A",
+                "widget_type": "text",
+                "validation_rules": {"pattern": "("},
+            }
+        )
+        assert not serializer.is_valid()
+        assert "validation_rules" in serializer.errors
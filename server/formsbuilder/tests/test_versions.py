@@ -0,0 +1,129 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder.models import (
+    FormField,
+    FormFieldOption,
+    FormSubmission,
+    FormTemplateVersion,
+)
+from formsbuilder.schema import get_form_schema
+from formsbuilder.versions import freeze_template_version
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def colour_field(form_template):
+    field = FormField.objects.create(
+        form_template=form_template,
+        field_name="colour",
+        label="Colour",
+        widget_type="select",
+    )
+    FormFieldOption.objects.create(form_field=field, value="red", label="Red")
+    return field
+
+
+def submit(api_client, form_template, data):
+    url = reverse("form-template-submit-form", args=[form_template.slug])
+    response = api_client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    return FormSubmission.objects.get(pk=response.data["submission_id"])
+
+
+class TestFreeze:
+    def test_same_content_is_frozen_once(self, form_template):
+        fields = [{"field_name": "a"}]
+
+        first = freeze_template_version(form_template.pk, fields)
+        again = freeze_template_version(form_template.pk, fields)
+        other = freeze_template_version(form_template.pk, [{"field_name": "b"}])
+
+        assert first == again
+        assert first[1] == 1
+        assert other[1] == 2
+
+    def test_versions_are_immutable(self, form_template):
+        version_id, _ = freeze_template_version(form_template.pk, [])
+        version = FormTemplateVersion.objects.get(pk=version_id)
+
+        version.schema = {"fields": [{"field_name": "forged"}]}
+        with pytest.raises(ValueError):
+            version.save()
+
+    def test_schema_names_its_version(self, form_template, colour_field):
+        schema = get_form_schema(form_template.slug)
+
+        version = FormTemplateVersion.objects.get(pk=schema.template_version_id)
+        [field] = version.schema["fields"]
+        assert field["field_name"] == "colour"
+        assert field["options"] == [{"value": "red", "label": "Red"}]
+
+
+class TestSubmissionsRecordTheirVersion:
+    def test_edits_start_a_new_version(self, api_client, form_template, colour_field):
+        before = submit(api_client, form_template, {"colour": "red"})
+
+        FormFieldOption.objects.create(
+            form_field=colour_field, value="blue", label="Blue"
+        )
+        after = submit(api_client, form_template, {"colour": "blue"})
+
+        assert before.template_version.number == 1
+        assert after.template_version.number == 2
+        old_options = before.template_version.schema["fields"][0]["options"]
+        assert [option["value"] for option in old_options] == ["red"]
+
+    def test_listing_shows_the_version_number(
+        self, api_client, form_template, colour_field
+    ):
+        submit(api_client, form_template, {"colour": "red"})
+
+        url = reverse("form-template-submissions", args=[form_template.slug])
+        response = api_client.get(url)
+
+        assert response.data["results"][0]["template_version"] == 1
+
+    def test_template_with_versioned_submissions_can_be_deleted(
+        self, api_client, form_template, colour_field
+    ):
+        submit(api_client, form_template, {"colour": "red"})
+
+        form_template.delete()
+
+        assert not FormTemplateVersion.objects.exists()
+        assert not FormSubmission.objects.exists()
+
+
+class TestVersionEndpoints:
+    def test_list_and_detail(self, api_client, form_template, colour_field):
+        get_form_schema(form_template.slug)
+
+        versions = api_client.get(
+            reverse("form-template-versions", args=[form_template.slug])
+        )
+        detail = api_client.get(
+            reverse("form-template-version", args=[form_template.slug, 1])
+        )
+
+        assert [version["number"] for version in versions.data] == [1]
+        assert detail.status_code == status.HTTP_200_OK
+        assert detail.data["schema"]["fields"][0]["field_name"] == "colour"
+        assert "immutable" in detail["Cache-Control"]
+
+    def test_detail_is_cached(
+        self, api_client, form_template, colour_field, django_assert_num_queries
+    ):
+        get_form_schema(form_template.slug)
+        url = reverse("form-template-version", args=[form_template.slug, 1])
+        api_client.get(url)
+
+        with django_assert_num_queries(0):
+            assert api_client.get(url).status_code == status.HTTP_200_OK
+
+    def test_unknown_version(self, api_client, form_template):
+        url = reverse("form-template-version", args=[form_template.slug, 9])
+
+        assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
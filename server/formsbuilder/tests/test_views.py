@@ -1,12 +1,20 @@
+from base64 import b64decode
+from urllib.parse import parse_qs, urlparse
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
 
-from formsbuilder.models import FormField, FormSubmission, FormTemplate
+from formsbuilder.models import FormField, FormFieldOption, FormSubmission, FormTemplate
 
 pytestmark = pytest.mark.django_db
 
 
+def cursor_tokens(link):
+    cursor = parse_qs(urlparse(link).query)["cursor"][0]
+    return parse_qs(b64decode(cursor).decode())
+
+
 class TestFormTemplateViewSet:
     def test_list_forms_unauthenticated(self, api_client, form_template):
         url = reverse("form-template-list")
@@ -23,7 +31,7 @@ class TestFormTemplateViewSet:
         url = reverse("form-template-detail", args=[form_template.id])
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert response.data["name"] == form_template.name
+        assert response.json()["name"] == form_template.name
 
     def test_retrieve_form_by_slug(self, api_client, form_template):
         # The view needs to support lookup by slug in get_object
@@ -55,6 +63,191 @@ class TestFormTemplateViewSet:
         # This will fail until we add the submissions action to the viewset
         assert response.status_code in [status.HTTP_200_OK, status.HTTP_404_NOT_FOUND]
 
+    def test_submit_form_by_slug(self, api_client, form_template, form_field):
+        url = reverse("form-template-submit-form", args=[form_template.slug])
+        response = api_client.post(url, {"test_field": "hello"}, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        submission = FormSubmission.objects.get(pk=response.data["submission_id"])
+        assert submission.form_template == form_template
+        assert submission.submission_data == {"test_field": "hello"}
+
+    def test_submit_form_missing_required_field(
+        self, api_client, form_template, form_field
+    ):
+        form_field.is_required = True
+        form_field.save()
+
+        url = reverse("form-template-submit-form", args=[form_template.id])
+        response = api_client.post(url, {}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["field_name"] == form_field.field_name
+        assert not FormSubmission.objects.exists()
+
+    def test_submit_unknown_form_returns_404(self, api_client):
+        url = reverse("form-template-submit-form", args=["missing-form"])
+        response = api_client.post(url, {}, format="json")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestSubmissionPagination:
+    @pytest.fixture
+    def submissions(self, form_template):
+        return [
+            FormSubmission.objects.create(
+                form_template=form_template, submission_data={"n": i}
+            )
+            for i in range(5)
+        ]
+
+    def test_pages_follow_the_cursor_newest_first(
+        self, api_client, form_template, submissions
+    ):
+        url = reverse("form-template-submissions", args=[form_template.id])
+
+        seen = []
+        response = api_client.get(url, {"page_size": 2})
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data["results"]) <= 2
+            seen.extend(item["id"] for item in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = api_client.get(response.data["next"])
+
+        assert seen == [submission.id for submission in reversed(submissions)]
+
+    def test_page_size_is_capped(
+        self, api_client, form_template, submissions, settings
+    ):
+        settings.FORMSBUILDER_SUBMISSIONS_MAX_PAGE_SIZE = 3
+        url = reverse("form-template-submissions", args=[form_template.id])
+        response = api_client.get(url, {"page_size": 10_000})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 3
+        assert response.data["next"] is not None
+
+    def test_default_page_size_follows_the_settings(
+        self, api_client, form_template, submissions, settings
+    ):
+        settings.FORMSBUILDER_SUBMISSIONS_PAGE_SIZE = 2
+        url = reverse("form-template-submissions", args=[form_template.id])
+
+        response = api_client.get(url)
+
+        assert len(response.data["results"]) == 2
+
+    def test_ties_on_submitted_at_page_without_offsets(
+        self, api_client, form_template, submissions
+    ):
+        FormSubmission.objects.update(submitted_at=submissions[0].submitted_at)
+        url = reverse("form-template-submissions", args=[form_template.id])
+
+        seen, links = [], []
+        response = api_client.get(url, {"page_size": 2})
+        while response.data["next"]:
+            seen.extend(item["id"] for item in response.data["results"])
+            links.append(response.data["next"])
+            response = api_client.get(response.data["next"])
+        seen.extend(item["id"] for item in response.data["results"])
+        previous = api_client.get(response.data["previous"])
+
+        assert seen == sorted(
+            (submission.id for submission in submissions), reverse=True
+        )
+        assert not any("o" in cursor_tokens(link) for link in links)
+        assert [item["id"] for item in previous.data["results"]] == seen[2:4]
+
+    def test_invalid_cursor(self, api_client, form_template, submissions):
+        url = reverse("form-template-submissions", args=[form_template.id])
+
+        response = api_client.get(url, {"cursor": "cD1ub3QtYS1kYXRl"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_submission_list_is_paginated(
+        self, api_client, test_user, submissions, django_assert_num_queries
+    ):
+        api_client.force_authenticate(user=test_user)
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse("form-submission-list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in response.data["results"]] == [
+            submission.id for submission in reversed(submissions)
+        ]
+
+
+class TestFormTemplateQueryCounts:
+    @pytest.fixture
+    def templates(self, test_user):
+        templates = []
+        for i in range(3):
+            template = FormTemplate.objects.create(
+                name=f"Form {i}", created_by=test_user
+            )
+            for j in range(3):
+                field = FormField.objects.create(
+                    form_template=template,
+                    field_name=f"field_{j}",
+                    label=f"Field {j}",
+                    widget_type="select",
+                    order=j,
+                )
+                for k in range(2):
+                    FormFieldOption.objects.create(
+                        form_field=field, value=f"v{k}", label=f"V{k}", order=k
+                    )
+            templates.append(template)
+        return templates
+
+    def test_list_query_count_is_constant(
+        self, api_client, templates, django_assert_num_queries
+    ):
+        # Templates (joined with created_by), fields, options.
+        with django_assert_num_queries(3):
+            response = api_client.get(reverse("form-template-list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 3
+        assert all(len(item["fields"]) == 3 for item in response.data)
+        assert response.data[0]["fields"][0]["options"][1]["value"] == "v1"
+        assert response.data[0]["created_by"] == "testuser2"
+
+    def test_retrieve_query_count_is_constant(
+        self, api_client, templates, django_assert_num_queries
+    ):
+        url = reverse("form-template-detail", args=[templates[0].slug])
+        # Cold cache: slug lookup and version, then the template with its
+        # fields and options.
+        with django_assert_num_queries(5):
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["fields"]) == 3
+
+        # Warm cache: served without touching the database.
+        with django_assert_num_queries(0):
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["fields"]) == 3
+
+    def test_summary_view_skips_nested_fields(
+        self, api_client, templates, django_assert_num_queries
+    ):
+        with django_assert_num_queries(1):
+            response = api_client.get(
+                reverse("form-template-list"), {"view": "summary"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 3
+        assert "fields" not in response.data[0]
+        assert response.data[0]["created_by"] == "testuser2"
+
 
 class TestFormSubmissionViewSet:
     def test_submit_form(self, api_client, form_template):
@@ -0,0 +1,169 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework import status
+
+from formsbuilder.models import (
+    FlushedSubmission,
+    FormSubmission,
+    FormTemplate,
+    FormTemplateStatistics,
+)
+from formsbuilder.schema import get_form_schema
+from formsbuilder.writebehind import (
+    FLUSHING_SUFFIX,
+    BrokerBuffer,
+    SpoolBuffer,
+    make_record,
+)
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.fixture
+def spool(settings, tmp_path):
+    settings.FORMSBUILDER_WRITE_BEHIND = "spool"
+    settings.FORMSBUILDER_WRITE_BEHIND_SPOOL_DIR = str(tmp_path)
+    return SpoolBuffer()
+
+
+def records(form_template, count):
+    schema = get_form_schema(form_template.slug)
+    return [make_record(schema, {"n": n}, None, "10.0.0.1") for n in range(count)]
+
+
+def stored():
+    return sorted(FormSubmission.objects.values_list("submission_data__n", flat=True))
+
+
+class TestSpoolBuffer:
+    def test_flush_writes_in_groups(self, spool, form_template):
+        for record in records(form_template, 5):
+            spool.put(record)
+
+        assert spool.flush(batch_size=2) == 5
+        assert stored() == [0, 1, 2, 3, 4]
+        assert (
+            FormTemplateStatistics.objects.get(
+                form_template=form_template
+            ).submission_count
+            == 5
+        )
+        assert not list(spool.directory.iterdir())
+
+    def test_redelivery_is_written_once(self, spool, form_template):
+        for record in records(form_template, 3):
+            spool.put(record)
+        spool.path.with_name("copy").write_bytes(spool.path.read_bytes())
+        spool.flush(batch_size=10)
+
+        spool.path.with_name("copy").rename(
+            spool.path.with_name(f"{spool.path.name}.0{FLUSHING_SUFFIX}")
+        )
+
+        assert spool.flush(batch_size=10) == 0
+        assert stored() == [0, 1, 2]
+
+    def test_torn_last_line_is_skipped(self, spool, form_template):
+        spool.put(records(form_template, 1)[0])
+        with spool.path.open("ab") as file:
+            file.write(b'{"provisional_id": "half')
+
+        assert spool.flush(batch_size=10) == 1
+
+    def test_deleted_form_does_not_block_the_spool(
+        self, spool, test_user, form_template
+    ):
+        doomed = FormTemplate.objects.create(name="Doomed", created_by=test_user)
+        spool.put(records(doomed, 1)[0])
+        for record in records(form_template, 2):
+            spool.put(record)
+        doomed.delete()
+
+        assert spool.flush(batch_size=10) == 2
+        assert stored() == [0, 1]
+        assert not list(spool.directory.iterdir())
+
+    def test_deleted_user_is_anonymised(self, spool, form_template):
+        user = User.objects.create_user(username="leaver", password="pass12345")
+        record = records(form_template, 1)[0]
+        spool.put({**record, "submitted_by_id": user.pk})
+        user.delete()
+
+        assert spool.flush(batch_size=10) == 1
+        assert FormSubmission.objects.get().submitted_by is None
+
+    def test_flushed_ids_are_written_once(self, spool, form_template):
+        record = records(form_template, 1)[0]
+        spool.put(record)
+        spool.flush(batch_size=10)
+        FormSubmission.objects.all().delete()
+
+        spool.put(record)
+
+        assert spool.flush(batch_size=10) == 0
+        assert FlushedSubmission.objects.filter(
+            provisional_id=record["provisional_id"]
+        ).exists()
+
+
+class TestBrokerBuffer:
+    def test_put_and_flush(self, form_template):
+        buffer = BrokerBuffer(url="memory://", queue_name="test.submissions")
+        for record in records(form_template, 3):
+            buffer.put(record)
+
+        assert buffer.flush(batch_size=2, max_latency=0.1) == 2
+        assert buffer.flush(batch_size=2, max_latency=0.1) == 1
+        assert buffer.flush(batch_size=2, max_latency=0.1) == 0
+        assert stored() == [0, 1, 2]
+
+    def test_deleted_form_is_acknowledged(self, test_user, form_template):
+        buffer = BrokerBuffer(url="memory://", queue_name="test.orphans")
+        doomed = FormTemplate.objects.create(name="Doomed", created_by=test_user)
+        buffer.put(records(doomed, 1)[0])
+        buffer.put(records(form_template, 1)[0])
+        doomed.delete()
+
+        assert buffer.flush(batch_size=10, max_latency=0.1) == 1
+        assert buffer.flush(batch_size=10, max_latency=0.1) == 0
+
+
+class TestWriteBehindSubmit:
+    def test_returns_a_provisional_id(self, api_client, spool, form_template):
+        url = reverse("form-template-submit-form", args=[form_template.slug])
+
+        response = api_client.post(url, {}, format="json")
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert not FormSubmission.objects.exists()
+        call_command("flush_submissions", "--once")
+        submission = FormSubmission.objects.get()
+        assert str(submission.provisional_id) == response.data["provisional_id"]
+        assert submission.ip_address == "127.0.0.1"
+
+    def test_async_endpoint_buffers_too(self, api_client, spool, form_template):
+        url = reverse("form-template-submit-async", args=[form_template.slug])
+
+        response = api_client.post(url, {}, format="json")
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert spool.flush(batch_size=10) == 1
+
+    def test_invalid_submissions_are_not_buffered(
+        self, api_client, spool, form_template
+    ):
+        url = reverse("form-template-submit-form", args=[form_template.slug])
+
+        response = api_client.post(url, [1], format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not spool.path.exists()
+
+    def test_flush_command_needs_write_behind(self):
+        with pytest.raises(CommandError):
+            call_command("flush_submissions", "--once")
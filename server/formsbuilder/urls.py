@@ -1,6 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from .async_views import submit_form
 from .views import (
     FormFieldOptionViewSet,
     FormFieldViewSet,
@@ -19,5 +20,10 @@ router.register(
 router.register(r"statistics", FormStatisticsViewSet, basename="form-statistics")
 
 urlpatterns = [
+    path(
+        "form-templates/<str:pk>/submit-async/",
+        submit_form,
+        name="form-template-submit-async",
+    ),
     path("", include(router.urls)),
 ]
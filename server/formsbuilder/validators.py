@@ -0,0 +1,341 @@
+"""Server-side validation of submitted values.
+
+Validators are registered per ``FormField.widget_type`` and built once per
+compiled schema: regexes are precompiled and option values frozen into sets,
+so validating a submission is a handful of dictionary lookups and compares.
+
+``validation_rules`` use the keys written by the form builder (``minLength``,
+``maxLength``, ``minValue``, ``maxValue``, ``maxFiles``) or their snake_case
+equivalents, plus ``pattern`` for a regular expression the whole value must
+match.
+"""
+
+import math
+import operator
+import re
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator, validate_email
+from django.utils.dateparse import parse_date, parse_datetime
+
+REQUIRED_MESSAGE = "This field is required."
+UNDECLARED_MESSAGE = "Unknown field."
+
+RULE_ALIASES = {
+    "minLength": "min_length",
+    "maxLength": "max_length",
+    "minValue": "min_value",
+    "maxValue": "max_value",
+    "maxFiles": "max_files",
+}
+
+INTEGER_RULES = ("min_length", "max_length", "max_files")
+NUMBER_RULES = ("min_value", "max_value")
+
+PHONE_RE = re.compile(r"^\+?[0-9][0-9 ().-]{5,19}$")
+TRUE_VALUES = (True, "true", "True", "on", "1", 1)
+FALSE_VALUES = (False, "false", "False", "off", "0", 0)
+
+VALIDATORS = {}
+
+_validate_url = URLValidator()
+
+
+def register(*widget_types):
+    """Register a validator factory for one or more widget types.
+
+    A factory takes the field spec and its parsed rules and returns a list of
+    checks. Each check takes a non-empty value and returns an error message,
+    or ``None`` when the value is valid. Checks run in order and stop at the
+    first error, so later checks can rely on the value's type.
+    """
+
+    def decorator(factory):
+        for widget_type in widget_types:
+            VALIDATORS[widget_type] = factory
+        return factory
+
+    return decorator
+
+
+def is_empty(value):
+    return value is None or value == "" or value == [] or value == {}
+
+
+def parse_rules(validation_rules):
+    """Normalise ``validation_rules``.
+
+    Returns ``(rules, errors)``. Invalid entries are left out of ``rules`` and
+    described in ``errors``; unknown keys are kept for custom validators.
+    """
+    rules, errors = {}, {}
+    for key, value in (validation_rules or {}).items():
+        name = RULE_ALIASES.get(key, key)
+        if value in (None, ""):
+            continue
+        if name in INTEGER_RULES:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                errors[key] = "Must be an integer."
+                continue
+            if value < 0:
+                errors[key] = "Must not be negative."
+                continue
+        elif name in NUMBER_RULES:
+            try:
+                value = float(value)
+            except OverflowError:
+                errors[key] = "Must be a number."
+                continue
+            except (TypeError, ValueError):
+                # Dates and datetimes are compared by their own validators.
+                value = str(value)
+        elif name == "pattern":
+            try:
+                value = re.compile(str(value))
+            except re.error as exc:
+                errors[key] = f"Invalid regular expression: {exc}"
+                continue
+        rules[name] = value
+    return rules, errors
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _string_check(value):
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        return "Must be a string."
+    return None
+
+
+def _length_checks(rules):
+    checks = []
+    min_length = rules.get("min_length")
+    max_length = rules.get("max_length")
+    if min_length is not None:
+        checks.append(
+            lambda value: (
+                f"Ensure this value has at least {min_length} characters."
+                if len(str(value)) < min_length
+                else None
+            )
+        )
+    if max_length is not None:
+        checks.append(
+            lambda value: (
+                f"Ensure this value has at most {max_length} characters."
+                if len(str(value)) > max_length
+                else None
+            )
+        )
+    return checks
+
+
+def _pattern_checks(rules):
+    pattern = rules.get("pattern")
+    if pattern is None:
+        return []
+    return [
+        lambda value: (
+            None
+            if pattern.fullmatch(str(value))
+            else "Enter a value in the expected format."
+        )
+    ]
+
+
+def _range_checks(rules, coerce):
+    checks = []
+    for rule, compare, message in (
+        ("min_value", operator.lt, "greater than or equal to"),
+        ("max_value", operator.gt, "less than or equal to"),
+    ):
+        limit = coerce(rules[rule]) if rule in rules else None
+        if limit is not None:
+            checks.append(
+                _range_check(coerce, compare, limit, f"{message} {rules[rule]}")
+            )
+    return checks
+
+
+def _range_check(coerce, compare, limit, description):
+    def check(value):
+        try:
+            out_of_range = compare(coerce(value), limit)
+        except TypeError:
+            # e.g. a naive datetime against a timezone-aware limit.
+            return "Enter a value comparable to the allowed range."
+        if out_of_range:
+            return f"Ensure this value is {description}."
+        return None
+
+    return check
+
+
+def _django_check(validator, message):
+    def check(value):
+        if not isinstance(value, str):
+            return message
+        try:
+            validator(value)
+        except ValidationError:
+            return message
+        return None
+
+    return check
+
+
+def _option_values(spec):
+    return frozenset(str(option["value"]) for option in spec.get("options") or ())
+
+
+@register("text", "textarea", "password")
+def text_validator(spec, rules):
+    return [_string_check, *_length_checks(rules), *_pattern_checks(rules)]
+
+
+@register("email")
+def email_validator(spec, rules):
+    return [
+        _django_check(validate_email, "Enter a valid email address."),
+        *_length_checks(rules),
+        *_pattern_checks(rules),
+    ]
+
+
+@register("url")
+def url_validator(spec, rules):
+    return [
+        _django_check(_validate_url, "Enter a valid URL."),
+        *_length_checks(rules),
+        *_pattern_checks(rules),
+    ]
+
+
+@register("phone")
+def phone_validator(spec, rules):
+    def check(value):
+        if not isinstance(value, str) or not PHONE_RE.match(value):
+            return "Enter a valid phone number."
+        return None
+
+    return [check, *_pattern_checks(rules)]
+
+
+@register("number")
+def number_validator(spec, rules):
+    def check(value):
+        return "Enter a number." if _to_number(value) is None else None
+
+    return [check, *_range_checks(rules, _to_number)]
+
+
+def _temporal_validator(parse, message):
+    def coerce(value):
+        try:
+            return parse(str(value))
+        except ValueError:
+            return None
+
+    def factory(spec, rules):
+        def check(value):
+            return (
+                message if not isinstance(value, str) or coerce(value) is None else None
+            )
+
+        return [check, *_range_checks(rules, coerce)]
+
+    return factory
+
+
+register("date")(_temporal_validator(parse_date, "Enter a valid date."))
+register("datetime")(_temporal_validator(parse_datetime, "Enter a valid date/time."))
+
+
+@register("select", "radio")
+def choice_validator(spec, rules):
+    choices = _option_values(spec)
+
+    def check(value):
+        if isinstance(value, (list, dict)):
+            return "Select a single option."
+        if choices and str(value) not in choices:
+            return (
+                f"Select a valid choice. {value} is not one of the available choices."
+            )
+        return None
+
+    return [check]
+
+
+@register("multi_select")
+def multi_choice_validator(spec, rules):
+    choices = _option_values(spec)
+
+    def check(value):
+        values = value if isinstance(value, list) else [value]
+        invalid = [item for item in values if choices and str(item) not in choices]
+        if invalid:
+            return f"Select valid choices. {invalid[0]} is not one of the available choices."
+        return None
+
+    return [check]
+
+
+@register("checkbox")
+def checkbox_validator(spec, rules):
+    if spec.get("options"):
+        return multi_choice_validator(spec, rules)
+
+    def check(value):
+        if value in TRUE_VALUES or value in FALSE_VALUES:
+            return None
+        return "Must be true or false."
+
+    return [check]
+
+
+@register("file")
+def file_validator(spec, rules):
+    max_files = rules.get("max_files")
+    if max_files is None:
+        return []
+
+    def check(value):
+        count = len(value) if isinstance(value, list) else 1
+        if count > max_files:
+            return f"Upload at most {max_files} files."
+        return None
+
+    return [check]
+
+
+class FieldValidator:
+    """All checks for one field, built once per compiled schema."""
+
+    __slots__ = ("is_required", "checks")
+
+    def __init__(self, spec):
+        rules, _ = parse_rules(spec.get("validation_rules"))
+        factory = VALIDATORS.get(spec["widget_type"], text_validator)
+        self.is_required = spec["is_required"]
+        self.checks = tuple(factory(spec, rules))
+
+    def __call__(self, value):
+        """Return the first error for ``value``, or ``None`` if it is valid."""
+        if is_empty(value):
+            return REQUIRED_MESSAGE if self.is_required else None
+        for check in self.checks:
+            error = check(value)
+            if error:
+                return error
+        return None
@@ -0,0 +1,97 @@
+"""Immutable ``FormTemplateVersion`` snapshots.
+
+Whenever a template's schema is compiled for a version of the template that
+has not been seen before, its field specs are frozen into a
+``FormTemplateVersion`` (or matched to an existing one with the same
+content), and every submission validated against that schema records it.
+Old submissions can therefore always be rendered against the fields they
+were submitted with, even after the live ``FormField`` rows have changed.
+
+Versions never change once written, so their blobs are cached without a
+timeout.
+"""
+
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from rest_framework.generics import get_object_or_404
+
+from formsbuilder.metrics import record_cache
+from formsbuilder.models import FormTemplateVersion
+
+CACHE_PREFIX = "formsbuilder:version"
+FREEZE_ATTEMPTS = 3
+
+
+def _blob_key(template_id, number):
+    return f"{CACHE_PREFIX}:{template_id}:{number}"
+
+
+def schema_digest(fields):
+    content = json.dumps(fields, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _create_version(template_id, digest, fields):
+    with transaction.atomic():
+        latest = FormTemplateVersion.objects.filter(
+            form_template_id=template_id
+        ).aggregate(number=Max("number"))["number"]
+        return FormTemplateVersion.objects.create(
+            form_template_id=template_id,
+            number=(latest or 0) + 1,
+            digest=digest,
+            schema={"fields": fields},
+        )
+
+
+def freeze_template_version(template_id, fields):
+    """Return the ``(id, number)`` of the version holding ``fields``.
+
+    Creates the version if no version of the template has this content yet.
+    """
+    digest = schema_digest(fields)
+    for _ in range(FREEZE_ATTEMPTS):
+        version = (
+            FormTemplateVersion.objects.filter(
+                form_template_id=template_id, digest=digest
+            )
+            .values_list("pk", "number")
+            .first()
+        )
+        if version is not None:
+            return version
+        try:
+            version = _create_version(template_id, digest, fields)
+        except IntegrityError:
+            # A concurrent request froze the same content or took the number.
+            continue
+        return version.pk, version.number
+    raise RuntimeError(f"Could not freeze a version of template {template_id}")
+
+
+def get_version_blob(template_id, number):
+    """The frozen ``{"number", "created_at", "schema"}`` of a template version.
+
+    Raises ``Http404`` when the version does not exist.
+    """
+    key = _blob_key(template_id, number)
+    blob = cache.get(key)
+    record_cache("version_blob", blob is not None)
+    if blob is None:
+        version = get_object_or_404(
+            FormTemplateVersion.objects.only("number", "created_at", "schema"),
+            form_template_id=template_id,
+            number=number,
+        )
+        blob = {
+            "number": version.number,
+            "created_at": version.created_at,
+            "schema": version.schema,
+        }
+        cache.set(key, blob, None)
+    return blob
@@ -1,45 +1,354 @@
-from django.contrib.auth import get_user_model
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from formsbuilder.models import FormField, FormFieldOption, FormSubmission, FormTemplate
+from formsbuilder.analytics import get_template_analytics
+from formsbuilder.definitions import (
+    cache_definition,
+    definition_etag,
+    definition_last_modified,
+    get_cached_definition,
+    set_definition_headers,
+)
+from formsbuilder.exports import EXPORT_CONTENT_TYPES, stream_submissions
+from formsbuilder.filters import FilterError, filter_submissions, parse_filter
+from formsbuilder.idempotency import (
+    REPLAYED_HEADER,
+    KeyReused,
+    cache_response,
+    find_response,
+    has_cached_response,
+    invalid_key_body,
+    key_reused_body,
+    keyed_provisional_id,
+    remember_response,
+    request_digest,
+    request_key,
+)
+from formsbuilder.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from formsbuilder.metrics import render as render_metrics
+from formsbuilder.metrics import timed
+from formsbuilder.models import (
+    FormField,
+    FormFieldOption,
+    FormSubmission,
+    FormTemplate,
+    FormTemplateStatistics,
+    FormTemplateVersion,
+    SubmissionRollup,
+)
+from formsbuilder.pagination import SubmissionCursorPagination
+from formsbuilder.parsers import FastJSONParser, NDJSONParser
+from formsbuilder.ratelimits import batch_capacity, check_submission_rate
+from formsbuilder.renderers import FastJSONRenderer, StreamingListMixin
+from formsbuilder.replicas import ReplicaReadsMixin
+from formsbuilder.representations import (
+    fast_serializers_enabled,
+    represent_submissions,
+    represent_templates,
+    submission_rows,
+    template_rows,
+)
+from formsbuilder.schema import get_form_schema, get_template_version, version_token
 from formsbuilder.serializers import (
     FormFieldOptionSerializer,
     FormFieldSerializer,
     FormSubmissionSerializer,
     FormTemplateSerializer,
+    FormTemplateStatisticsSerializer,
+    FormTemplateSummarySerializer,
 )
-from formsbuilder.tasks import form_submission_notification
-
-User = get_user_model()
-
-
-class FormTemplateViewSet(viewsets.ModelViewSet):
-    queryset = FormTemplate.objects.all()
+from formsbuilder.statistics import (
+    get_site_statistics,
+    record_submissions,
+    remove_submissions,
+)
+from formsbuilder.tasks import notify_form_submissions
+from formsbuilder.versions import get_version_blob
+from formsbuilder.writebehind import buffer_submission, write_behind_enabled
+
+
+def payload_too_large(request, max_bytes):
+    try:
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return False
+    return content_length > max_bytes
+
+
+def submission_error(schema, form_data):
+    """The 400 response body for an invalid submission, or ``None``."""
+    if not isinstance(form_data, dict):
+        return {"message": "Submission must be an object"}
+
+    missing_field = schema.missing_required_field(form_data)
+    if missing_field is not None:
+        return {
+            "message": "Missing required field",
+            "field_name": missing_field.field_name,
+            "label": missing_field.label,
+        }
+
+    errors = schema.validate(form_data)
+    if errors:
+        return {"message": "Invalid submission", "errors": errors}
+    return None
+
+
+def accepted_body(provisional_id):
+    """The 202 response body for a buffered (write-behind) submission."""
+    return {
+        "message": "Form submission accepted",
+        "provisional_id": provisional_id,
+    }
+
+
+def _parse_moment(value):
+    """Parse an ISO 8601 date/time query parameter; naive values are UTC."""
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        return None
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+class FormTemplateViewSet(StreamingListMixin, ReplicaReadsMixin, viewsets.ModelViewSet):
+    queryset = FormTemplate.objects.select_related("created_by")
     serializer_class = FormTemplateSerializer
+    replica_actions = frozenset(
+        {"list", "retrieve", "submissions", "export", "analytics"}
+    )
 
     def get_permissions(self):
-        if self.action in ["submit_form", "list", "retrieve", "submissions"]:
+        if self.action in [
+            "submit_form",
+            "submit_batch",
+            "list",
+            "retrieve",
+            "submissions",
+            "versions",
+            "version",
+        ]:
             return [AllowAny()]
         return [IsAuthenticated()]
 
+    def _is_summary_view(self):
+        return (
+            self.action == "list"
+            and self.request is not None
+            and self.request.query_params.get("view") == "summary"
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ["list", "retrieve"] and not self._is_summary_view():
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "fields__options",
+                    queryset=FormFieldOption.objects.order_by("order", "id"),
+                )
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self._is_summary_view():
+            return FormTemplateSummarySerializer
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        if self._is_summary_view() or not fast_serializers_enabled():
+            return super().list(request, *args, **kwargs)
+        rows = template_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(represent_templates(page))
+        return Response(represent_templates(list(rows)))
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Public form definition, with ETag / Last-Modified validators.
+
+        Conditional requests for an unchanged template are answered with a
+        304, and the rendered JSON is cached per template version, so a warm
+        cache serves most loads without a database query.
+        """
+        if not isinstance(request.accepted_renderer, FastJSONRenderer):
+            return super().retrieve(request, *args, **kwargs)
+
+        template_id, version = get_template_version(kwargs["pk"])
+        response = get_conditional_response(
+            request,
+            etag=definition_etag(template_id, version),
+            last_modified=definition_last_modified(version),
+        )
+        if response is None:
+            content = get_cached_definition(template_id, version)
+            if content is None:
+                if fast_serializers_enabled():
+                    rows = list(
+                        template_rows(self.get_queryset().filter(pk=template_id))
+                    )
+                    if not rows:
+                        raise Http404
+                    updated_at = rows[0]["updated_at"]
+                    data = represent_templates(rows)[0]
+                else:
+                    instance = self.get_object()
+                    updated_at = instance.updated_at
+                    data = self.get_serializer(instance).data
+                # Describe what was actually rendered, even if the template
+                # changed since the version was read.
+                version = version_token(updated_at)
+                content = FastJSONRenderer().render(data)
+                cache_definition(template_id, version, content)
+            response = HttpResponse(content, content_type="application/json")
+        return set_definition_headers(response, template_id, version)
+
     @action(detail=True, methods=["get"])
     def submissions(self, request, pk=None):
         """
         Retrieve all submissions for a specific form template.
+
+        Narrow them by answer with ``?filter=``, a JSON conditions document
+        in the conditional-logic format (or a list of conditions, all of
+        which must match), e.g.
+        ``[{"field": "age", "operator": "greater_than", "value": 30}]``.
         """
         form_template = self.get_object()
-        submissions = FormSubmission.objects.filter(form_template=form_template)
-        page = self.paginate_queryset(submissions)
-        if page is not None:
-            serializer = FormSubmissionSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        submissions = (
+            FormSubmission.objects.filter(form_template=form_template)
+            .select_related("submitted_by", "template_version")
+            .defer("template_version__schema")
+        )
+        raw_filter = request.query_params.get("filter")
+        if raw_filter:
+            try:
+                submissions = filter_submissions(
+                    submissions,
+                    parse_filter(raw_filter),
+                    settings.FORMSBUILDER_SUBMISSION_FILTER_MAX_CONDITIONS,
+                    form_template.pk,
+                )
+            except FilterError as exc:
+                return Response({"message": str(exc)}, status=400)
+        paginator = SubmissionCursorPagination()
+        if fast_serializers_enabled():
+            page = paginator.paginate_queryset(
+                submission_rows(submissions), request, view=self
+            )
+            return paginator.get_paginated_response(represent_submissions(page))
+        page = paginator.paginate_queryset(submissions, request, view=self)
+        serializer = FormSubmissionSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"])
+    def versions(self, request, pk=None):
+        """
+        List the frozen versions of a form template, oldest first.
+        """
+        template_id, _ = get_template_version(pk)
+        versions = FormTemplateVersion.objects.filter(
+            form_template_id=template_id
+        ).values("number", "created_at")
+        return Response(list(versions))
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path=r"versions/(?P<number>[0-9]+)",
+        url_name="version",
+    )
+    def version(self, request, pk=None, number=None):
+        """
+        The fields of a form template exactly as frozen in one version.
 
-        serializer = FormSubmissionSerializer(submissions, many=True)
-        return Response(serializer.data)
+        Versions never change, so the response may be cached indefinitely.
+        """
+        template_id, _ = get_template_version(pk)
+        response = Response(get_version_blob(template_id, int(number)))
+        patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60)
+        response["Cache-Control"] += ", immutable"
+        return response
+
+    @action(detail=True, methods=["get"])
+    def export(self, request, pk=None):
+        """
+        Stream every submission of a form template as CSV or NDJSON.
+
+        Pick the format with ``?export_format=csv`` (default) or
+        ``?export_format=ndjson``.
+        """
+        form_template = self.get_object()
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return Response(
+                {
+                    "message": "Unsupported export format",
+                    "supported_formats": sorted(EXPORT_CONTENT_TYPES),
+                },
+                status=400,
+            )
+
+        response = StreamingHttpResponse(
+            stream_submissions(form_template, export_format),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{form_template.slug}-submissions.{export_format}"'
+        )
+        return response
+
+    @action(detail=True, methods=["get"])
+    def analytics(self, request, pk=None):
+        """
+        Submission counts and per-field aggregates in hourly or daily buckets.
+
+        Served from the rollup tables maintained by the
+        ``fold_submission_rollups`` task, so the newest few minutes of
+        submissions may not be included yet. Query parameters:
+        ``granularity`` (``hour`` or ``day``, default ``day``) and optional
+        ISO 8601 ``since``/``until`` bounds.
+        """
+        form_template = self.get_object()
+        granularity = request.query_params.get("granularity", SubmissionRollup.DAY)
+        granularities = [value for value, _ in SubmissionRollup.GRANULARITIES]
+        if granularity not in granularities:
+            return Response(
+                {
+                    "message": "Unsupported granularity",
+                    "supported_granularities": granularities,
+                },
+                status=400,
+            )
+
+        bounds = {}
+        for name in ("since", "until"):
+            value = request.query_params.get(name)
+            if value is None:
+                continue
+            bounds[name] = _parse_moment(value)
+            if bounds[name] is None:
+                return Response(
+                    {"message": f"Invalid {name}: expected an ISO 8601 date/time"},
+                    status=400,
+                )
+
+        return Response(get_template_analytics(form_template, granularity, **bounds))
 
     def get_object(self):
         lookup_value = self.kwargs.get("pk")
@@ -75,7 +384,7 @@ class FormTemplateViewSet(viewsets.ModelViewSet):
         try:
             num_field = float(field_value)
             num_value = float(value) if value is not None else 0
-        except (ValueError, TypeError):
+        except (ValueError, TypeError, OverflowError):
             num_field = num_value = None
 
         if operator == "equals":
@@ -142,75 +451,318 @@ class FormTemplateViewSet(viewsets.ModelViewSet):
 
         return True
 
+    def _check_submission_rate(self, request, schema, cost=1, batch=False):
+        """Answer ``429`` with ``Retry-After`` if ``cost`` submissions exceed a limit.
+
+        Only the cache is consulted, before the body is parsed or the
+        database is queried.
+        """
+        user = request.user
+        wait = check_submission_rate(
+            schema,
+            request.META.get("REMOTE_ADDR"),
+            user.pk if user.is_authenticated else None,
+            cost,
+            batch,
+        )
+        if wait is not None:
+            self.throttled(request, wait)
+
+    def _replay(self, schema, key, digest):
+        """The response to replay for a retried keyed request, or ``None``."""
+        try:
+            replay = find_response(schema.template_id, key, digest)
+        except KeyReused:
+            return Response(key_reused_body(), status=422)
+        if replay is None:
+            return None
+        status_code, body = replay
+        return Response(body, status=status_code, headers={REPLAYED_HEADER: "true"})
+
     @action(
         detail=True,
         methods=["post"],
         url_path="submit",
     )
     def submit_form(self, request, pk):
-        form_template = self.get_object()
-        form_data = request.data
-
-        for field in form_template.fields.all():
-            if field.is_required and field.field_name not in form_data:
-                if self._should_validate_field(field, form_data):
-                    data = {
-                        "message": "Missing required field",
-                        "field_name": field.field_name,
-                        "label": field.label,
-                    }
-                    return Response(data=data, status=400)
-
-        form_submission = FormSubmission.objects.create(
-            form_template=form_template,
-            submission_data=form_data,
-            submitted_by=request.user if request.user.is_authenticated else None,
-            ip_address=request.META.get("REMOTE_ADDR"),
-        )
+        # Checked before anything touches the cache, the database or the body.
+        if payload_too_large(request, settings.FORMSBUILDER_MAX_SUBMISSION_BYTES):
+            return Response(
+                {
+                    "message": "Submission too large",
+                    "max_bytes": settings.FORMSBUILDER_MAX_SUBMISSION_BYTES,
+                },
+                status=413,
+            )
+        try:
+            key = request_key(request)
+        except ValueError as exc:
+            return Response(invalid_key_body(exc), status=400)
+
+        with timed("schema"):
+            schema = get_form_schema(pk)
+        # A retry whose response is cached stores nothing, so it takes no
+        # tokens; any other keyed request is rate-limited like the rest.
+        if key is None or not has_cached_response(schema.template_id, key):
+            self._check_submission_rate(request, schema)
+        with timed("validate"):
+            form_data = request.data
+            if key is not None:
+                digest = request_digest(form_data)
+                replay = self._replay(schema, key, digest)
+                if replay is not None:
+                    return replay
+            error = submission_error(schema, form_data)
+        if error is not None:
+            return Response(error, status=400)
+
+        if write_behind_enabled():
+            with timed("buffer"):
+                provisional_id = buffer_submission(
+                    schema,
+                    form_data,
+                    request.user.pk if request.user.is_authenticated else None,
+                    request.META.get("REMOTE_ADDR"),
+                    key and keyed_provisional_id(schema.template_id, key),
+                )
+            body = accepted_body(provisional_id)
+            if key is not None:
+                cache_response(schema.template_id, key, digest, 202, body)
+            return Response(body, status=202)
+
+        # The submission, its counters (see formsbuilder.signals) and its
+        # idempotency key commit together.
+        try:
+            with timed("insert"), transaction.atomic():
+                form_submission = FormSubmission.objects.create(
+                    form_template_id=schema.template_id,
+                    template_version_id=schema.template_version_id,
+                    submission_data=form_data,
+                    submitted_by=(
+                        request.user if request.user.is_authenticated else None
+                    ),
+                    ip_address=request.META.get("REMOTE_ADDR"),
+                )
+                body = {
+                    "message": "Form submitted successfully",
+                    "submission_id": form_submission.id,
+                }
+                if key is not None:
+                    remember_response(schema.template_id, key, digest, 201, body)
+        except IntegrityError:
+            # A concurrent attempt with the same key committed first.
+            replay = None if key is None else self._replay(schema, key, digest)
+            if replay is None:
+                raise
+            return replay
+
+        with timed("notify"):
+            notify_form_submissions(schema.template_id, [form_submission.id])
+
+        return Response(body, status=201)
 
-        admins = User.objects.filter(is_superuser=True)
-        form_submission_notification(admins)
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="submit-batch",
+        parser_classes=[FastJSONParser, NDJSONParser],
+    )
+    def submit_batch(self, request, pk):
+        """
+        Submit many entries for one form in a single request.
+
+        The body is a JSON array of submission objects, or NDJSON with one
+        object per line. Every item is validated against the same compiled
+        schema, valid items are stored with one bulk INSERT and the response
+        reports the outcome of each item by index. With an
+        ``Idempotency-Key``, a retried batch gets the first response back
+        and stores nothing.
+        """
+        max_bytes = settings.FORMSBUILDER_MAX_BATCH_BYTES
+        if payload_too_large(request, max_bytes):
+            return Response(
+                {"message": "Batch too large", "max_bytes": max_bytes}, status=413
+            )
+        try:
+            key = request_key(request)
+        except ValueError as exc:
+            return Response(invalid_key_body(exc), status=400)
+
+        schema = get_form_schema(pk)
+        replayable = key is not None and has_cached_response(schema.template_id, key)
+        items = request.data
+        if replayable:
+            digest = request_digest(items)
+            replay = self._replay(schema, key, digest)
+            if replay is not None:
+                return replay
+        if not isinstance(items, list):
+            return Response(
+                {"message": "Batch must be a list of submissions"}, status=400
+            )
+        submitted_by = request.user if request.user.is_authenticated else None
+        ip_address = request.META.get("REMOTE_ADDR")
+        max_items = settings.FORMSBUILDER_MAX_BATCH_SUBMISSIONS
+        # No more items than the smallest batch bucket holds, or the batch
+        # could never be let through.
+        capacity = batch_capacity(schema, ip_address, submitted_by and submitted_by.pk)
+        if capacity is not None:
+            max_items = min(max_items, capacity)
+        if len(items) > max_items:
+            return Response(
+                {"message": "Too many submissions in batch", "max_items": max_items},
+                status=413,
+            )
+        # Every item is charged, so batching does not multiply the limits.
+        self._check_submission_rate(request, schema, max(len(items), 1), batch=True)
+        if key is not None and not replayable:
+            # Past the cache, only once the request has paid for the query.
+            digest = request_digest(items)
+            replay = self._replay(schema, key, digest)
+            if replay is not None:
+                return replay
+
+        results, valid = [], []
+        for index, form_data in enumerate(items):
+            if not isinstance(form_data, dict):
+                errors = {"non_field_errors": ["Submission must be an object"]}
+            else:
+                errors = schema.validate(form_data)
+            if errors:
+                results.append({"index": index, "status": "invalid", "errors": errors})
+                continue
+            result = {"index": index, "status": "created"}
+            results.append(result)
+            valid.append(
+                (
+                    result,
+                    FormSubmission(
+                        form_template_id=schema.template_id,
+                        template_version_id=schema.template_version_id,
+                        submission_data=form_data,
+                        submitted_by=submitted_by,
+                        ip_address=ip_address,
+                    ),
+                )
+            )
 
-        return Response(    
-            {
-                "message": "Form submitted successfully",
-                "submission_id": form_submission.id,
-            },
-            status=201,
+        body = {
+            "created": len(valid),
+            "failed": len(items) - len(valid),
+            "results": results,
+        }
+        if not valid:
+            return Response(body, status=400)
+
+        try:
+            with transaction.atomic():
+                created = FormSubmission.objects.bulk_create(
+                    [submission for _, submission in valid]
+                )
+                record_submissions(schema.template_id, len(created))
+                for (result, _), submission in zip(valid, created):
+                    result["submission_id"] = submission.id
+                if key is not None:
+                    remember_response(schema.template_id, key, digest, 201, body)
+        except IntegrityError:
+            replay = None if key is None else self._replay(schema, key, digest)
+            if replay is None:
+                raise
+            return replay
+        notify_form_submissions(
+            schema.template_id, [submission.id for submission in created]
         )
+        return Response(body, status=201)
 
 
-class FormFieldViewSet(viewsets.ModelViewSet):
+class FormFieldViewSet(StreamingListMixin, ReplicaReadsMixin, viewsets.ModelViewSet):
     queryset = FormField.objects.all()
     serializer_class = FormFieldSerializer
 
 
-class FormSubmissionViewSet(viewsets.ModelViewSet):
-    queryset = FormSubmission.objects.all()
+class FormSubmissionViewSet(
+    StreamingListMixin, ReplicaReadsMixin, viewsets.ModelViewSet
+):
+    queryset = FormSubmission.objects.select_related(
+        "submitted_by", "template_version"
+    ).defer("template_version__schema")
     serializer_class = FormSubmissionSerializer
+    pagination_class = SubmissionCursorPagination
+    replica_actions = frozenset({"list", "retrieve"})
+
+    def list(self, request, *args, **kwargs):
+        if not fast_serializers_enabled():
+            return super().list(request, *args, **kwargs)
+        rows = submission_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(represent_submissions(page))
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        remove_submissions(instance.form_template_id, 1)
 
 
-class FormFieldOptionViewSet(viewsets.ModelViewSet):
+class FormFieldOptionViewSet(
+    StreamingListMixin, ReplicaReadsMixin, viewsets.ModelViewSet
+):
     queryset = FormFieldOption.objects.all()
     serializer_class = FormFieldOptionSerializer
 
 
-class FormStatisticsViewSet(viewsets.ViewSet):
+class FormStatisticsViewSet(ReplicaReadsMixin, viewsets.ViewSet):
     """
     A simple ViewSet for retrieving form statistics.
+
+    Numbers come from incrementally maintained counters, so they are cheap to
+    read however many submissions exist.
     """
 
     permission_classes = [IsAuthenticated]
+    replica_actions = frozenset({"list", "retrieve", "forms"})
 
     def list(self, request):
-        total_forms = FormTemplate.objects.count()
-        active_forms = FormTemplate.objects.filter(is_active=True).count()
-        total_submissions = FormSubmission.objects.count()
+        statistics = get_site_statistics()
 
         return Response(
             {
-                "total_forms": total_forms,
-                "active_forms": active_forms,
-                "total_submissions": total_submissions,
+                "total_forms": statistics.total_forms,
+                "active_forms": statistics.active_forms,
+                "total_submissions": statistics.total_submissions,
             }
         )
+
+    def retrieve(self, request, pk=None):
+        statistics = get_object_or_404(
+            FormTemplateStatistics.objects.select_related("form_template"),
+            pk=pk,
+        )
+        return Response(FormTemplateStatisticsSerializer(statistics).data)
+
+    @action(detail=False, methods=["get"])
+    def forms(self, request):
+        """
+        Submission counters of every form template.
+        """
+        statistics = FormTemplateStatistics.objects.select_related(
+            "form_template"
+        ).order_by("-submission_count", "form_template_id")
+        return Response(FormTemplateStatisticsSerializer(statistics, many=True).data)
+
+
+@require_GET
+def metrics_view(request):
+    """
+    This process's request metrics in the Prometheus text format.
+
+    With ``FORMSBUILDER_METRICS_TOKEN`` set, scrapers must send it as a
+    bearer token.
+    """
+    if not settings.FORMSBUILDER_METRICS_ENABLED:
+        raise Http404
+    token = settings.FORMSBUILDER_METRICS_TOKEN
+    if token and not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,320 @@
+"""Write-behind buffering of submissions with group commit.
+
+With ``FORMSBUILDER_WRITE_BEHIND`` set, ``submit_form`` validates a
+submission, appends it to a durable buffer and answers ``202`` with a
+provisional id instead of inserting it. The ``flush_submissions`` command
+then writes buffered submissions with one ``bulk_create`` (and one set of
+counter updates) per group of ``FORMSBUILDER_WRITE_BEHIND_BATCH_SIZE``,
+waiting at most ``FORMSBUILDER_WRITE_BEHIND_MAX_LATENCY`` seconds to fill a
+group. Two buffers are available:
+
+* ``broker``: a durable queue on the Celery broker. Messages are
+  acknowledged only after their group has committed.
+* ``spool``: an append-only NDJSON file in
+  ``FORMSBUILDER_WRITE_BEHIND_SPOOL_DIR``, fsynced on every append, for
+  hosts without a broker. The web processes and the flusher must share it.
+
+Either way a submission can be delivered twice after a crash; the flush
+records every provisional id it writes in ``FlushedSubmission``, whose
+primary key makes sure it is written once. Submissions of forms deleted
+while they were buffered are dropped, so they cannot block the buffer.
+Buffered submissions are stamped ``submitted_at`` when they are written.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from queue import Empty
+
+from celery import current_app
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from kombu import Connection, Exchange, Queue, pools
+
+from formsbuilder.models import (
+    FlushedSubmission,
+    FormSubmission,
+    FormTemplate,
+    FormTemplateVersion,
+)
+from formsbuilder.statistics import record_submissions
+from formsbuilder.tasks import notify_form_submissions
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+BROKER = "broker"
+SPOOL = "spool"
+
+SPOOL_FILE = "submissions.ndjson"
+FLUSHING_SUFFIX = ".flushing"
+
+
+def write_behind_enabled():
+    return settings.FORMSBUILDER_WRITE_BEHIND in (BROKER, SPOOL)
+
+
+def make_record(schema, form_data, submitted_by_id, ip_address, provisional_id=None):
+    """The buffered form of a validated submission."""
+    return {
+        "provisional_id": provisional_id or str(uuid.uuid4()),
+        "template_id": schema.template_id,
+        "template_version_id": schema.template_version_id,
+        "submission_data": form_data,
+        "submitted_by_id": submitted_by_id,
+        "ip_address": ip_address,
+    }
+
+
+def _claim(provisional_ids):
+    """Record ``provisional_ids`` as written; returns those that were not.
+
+    Runs in the caller's transaction. A flusher that races us for one of the
+    ids fails on the primary key once we commit, and then sees our row.
+    """
+    while True:
+        flushed = {
+            str(provisional_id)
+            for provisional_id in FlushedSubmission.objects.filter(
+                provisional_id__in=provisional_ids
+            ).values_list("provisional_id", flat=True)
+        }
+        fresh = [pid for pid in provisional_ids if pid not in flushed]
+        try:
+            with transaction.atomic():
+                FlushedSubmission.objects.bulk_create(
+                    FlushedSubmission(provisional_id=pid) for pid in fresh
+                )
+        except IntegrityError:
+            continue
+        return fresh
+
+
+def _writable(records):
+    """Drop records whose form was deleted since they were buffered.
+
+    They would fail the foreign keys of the whole group, every time it is
+    retried. The remaining forms are locked until the group is written.
+    """
+    template_ids = set(
+        FormTemplate.objects.select_for_update()
+        .filter(pk__in={record["template_id"] for record in records.values()})
+        .values_list("pk", flat=True)
+    )
+    version_ids = set(
+        FormTemplateVersion.objects.filter(
+            pk__in={record["template_version_id"] for record in records.values()}
+        ).values_list("pk", flat=True)
+    )
+    user_ids = set(
+        User.objects.filter(
+            pk__in={record["submitted_by_id"] for record in records.values()}
+        ).values_list("pk", flat=True)
+    )
+    writable = {}
+    for provisional_id, record in records.items():
+        version_id = record["template_version_id"]
+        if record["template_id"] not in template_ids or (
+            version_id is not None and version_id not in version_ids
+        ):
+            continue
+        if record["submitted_by_id"] not in user_ids:
+            # The user was deleted: the submission stays, anonymised.
+            record = {**record, "submitted_by_id": None}
+        writable[provisional_id] = record
+    dropped = len(records) - len(writable)
+    if dropped:
+        logger.warning("Dropped %d buffered submissions of deleted forms", dropped)
+    return writable
+
+
+def write_submissions(records):
+    """Store buffered records in one transaction; returns how many were new."""
+    records = {record["provisional_id"]: record for record in records}
+    with transaction.atomic():
+        records = _writable(records)
+        fresh = set(_claim(list(records)))
+        submissions = [
+            FormSubmission(
+                provisional_id=provisional_id,
+                form_template_id=record["template_id"],
+                template_version_id=record["template_version_id"],
+                submission_data=record["submission_data"],
+                submitted_by_id=record["submitted_by_id"],
+                ip_address=record["ip_address"],
+            )
+            for provisional_id, record in records.items()
+            if provisional_id in fresh
+        ]
+        if not submissions:
+            return 0
+
+        created = FormSubmission.objects.bulk_create(submissions)
+        for template_id, count in Counter(
+            submission.form_template_id for submission in created
+        ).items():
+            record_submissions(template_id, count)
+        by_template = {}
+        for submission in created:
+            by_template.setdefault(submission.form_template_id, []).append(
+                submission.id
+            )
+        for template_id, submission_ids in by_template.items():
+            notify_form_submissions(template_id, submission_ids)
+    return len(created)
+
+
+class SpoolBuffer:
+    """An append-only NDJSON file shared by every process on the host.
+
+    Appends and the flusher's rotation hold an exclusive ``flock``, and a
+    writer that finds its file was rotated away retries on the new one, so
+    no record can land in a file the flusher has already taken.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or settings.FORMSBUILDER_WRITE_BEHIND_SPOOL_DIR)
+        self.path = self.directory / SPOOL_FILE
+
+    def put(self, record):
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        while True:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    if os.fstat(fd).st_ino != os.stat(self.path).st_ino:
+                        continue
+                except FileNotFoundError:
+                    continue
+                os.write(fd, line)
+                os.fsync(fd)
+                return
+            finally:
+                os.close(fd)
+
+    def _rotate(self):
+        """Hand the current spool file over to the flusher."""
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            if os.fstat(fd).st_size:
+                self.path.rename(
+                    self.path.with_name(
+                        f"{SPOOL_FILE}.{time.time_ns()}{FLUSHING_SUFFIX}"
+                    )
+                )
+        finally:
+            os.close(fd)
+
+    def flush(self, batch_size, max_latency=None):
+        """Write every spooled record, ``batch_size`` per transaction.
+
+        Files left over by an interrupted flush go first. Returns the
+        number of submissions written.
+        """
+        self._rotate()
+        written = 0
+        for path in sorted(self.directory.glob(f"{SPOOL_FILE}.*{FLUSHING_SUFFIX}")):
+            batch = []
+            with path.open("rb") as spool:
+                for line in spool:
+                    # A torn last line (the writer died mid-append) was never
+                    # acknowledged to the client.
+                    if not line.endswith(b"\n"):
+                        break
+                    batch.append(json.loads(line))
+                    if len(batch) == batch_size:
+                        written += write_submissions(batch)
+                        batch = []
+            if batch:
+                written += write_submissions(batch)
+            path.unlink()
+        return written
+
+
+class BrokerBuffer:
+    """A durable queue on the Celery broker (or ``url``)."""
+
+    def __init__(self, url=None, queue_name=None):
+        self.url = url or settings.FORMSBUILDER_WRITE_BEHIND_BROKER_URL
+        self.queue_name = queue_name or settings.FORMSBUILDER_WRITE_BEHIND_QUEUE
+        # The exchange and queue ``SimpleQueue`` declares for this name.
+        self.exchange = Exchange(self.queue_name, "direct", durable=True)
+        self.queue = Queue(
+            self.queue_name, self.exchange, routing_key=self.queue_name, durable=True
+        )
+
+    def _connection(self):
+        return Connection(self.url or current_app.conf.broker_url)
+
+    def put(self, record):
+        # Pooled producers keep one broker connection per process busy
+        # instead of connecting for every submission.
+        with pools.producers[self._connection()].acquire(block=True) as producer:
+            producer.publish(
+                record,
+                serializer="json",
+                exchange=self.exchange,
+                routing_key=self.queue_name,
+                declare=[self.queue],
+                delivery_mode="persistent",
+                retry=True,
+            )
+
+    def flush(self, batch_size, max_latency):
+        """Write one group: up to ``batch_size`` messages or ``max_latency``.
+
+        Returns the number of submissions written.
+        """
+        messages = []
+        with self._connection() as connection:
+            queue = connection.SimpleQueue(self.queue)
+            try:
+                deadline = None
+                while len(messages) < batch_size:
+                    timeout = 1 if deadline is None else deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        messages.append(queue.get(timeout=timeout))
+                    except Empty:
+                        break
+                    if deadline is None:
+                        deadline = time.monotonic() + max_latency
+                if not messages:
+                    return 0
+                written = write_submissions([message.payload for message in messages])
+                for message in messages:
+                    message.ack()
+                return written
+            finally:
+                queue.close()
+
+
+def get_submission_buffer():
+    if settings.FORMSBUILDER_WRITE_BEHIND == SPOOL:
+        return SpoolBuffer()
+    return BrokerBuffer()
+
+
+def buffer_submission(
+    schema, form_data, submitted_by_id, ip_address, provisional_id=None
+):
+    """Buffer a validated submission; returns its provisional id.
+
+    A retry buffered under the same ``provisional_id`` is written only once.
+    """
+    record = make_record(schema, form_data, submitted_by_id, ip_address, provisional_id)
+    get_submission_buffer().put(record)
+    return record["provisional_id"]